@@ -0,0 +1,55 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+import slitflow as sf
+
+
+def make_req(n_img, n_trj, n_frm):
+    """Return a trajectory table with an index of 100 frames per trajectory.
+    """
+    D = sf.tbl.table.Table()
+    for depth, name in enumerate(["img_no", "trj_no", "frm_no"], 1):
+        D.info.add_column(depth, name, "int32", "num", name)
+    D.info.set_split_depth(2)
+    D.info.index = pd.DataFrame({
+        "img_no": np.repeat(np.arange(1, n_img + 1), n_trj * n_frm),
+        "trj_no": np.tile(np.repeat(np.arange(1, n_trj + 1), n_frm), n_img),
+        "frm_no": np.tile(np.arange(1, n_frm + 1), n_img * n_trj)})\
+        .astype(np.int32)
+    D.info.set_index_file_no()
+    # load and process each trajectory file in each cycle
+    D.info.load_split_depth = 2
+    D.info.data_split_depth = 2
+    return D
+
+
+def plan_cycles(reqs):
+    plan = sf.setreqs.make_cycle_plan(reqs, {"split_depth": 1}, [2, 2],
+                                      [2, 2])
+    for i in range(len(plan)):
+        for req_no in range(len(reqs)):
+            plan.get_index(i, req_no)
+            plan.file_nos[req_no][i]
+    return plan
+
+
+if __name__ == '__main__':
+
+    # 10k cycles: 10 images x 1,000 trajectories
+    reqs = [make_req(10, 1000, 100), make_req(10, 1000, 100)]
+    print("Index rows: {:,} x {}".format(len(reqs[0].info.index), len(reqs)))
+
+    sf.setreqs.PLAN_CACHE.clear()
+    start = time.perf_counter()
+    plan = plan_cycles(reqs)
+    print("Cycles: {:,}".format(len(plan)))
+    print("{:<24s}{:>10.3f} s".format("plan", time.perf_counter() - start))
+
+    # the same index shape of another observation
+    reqs = [make_req(10, 1000, 100), make_req(10, 1000, 100)]
+    start = time.perf_counter()
+    plan_cycles(reqs)
+    print("{:<24s}{:>10.3f} s".format("cached plan",
+                                      time.perf_counter() - start))
@@ -0,0 +1,64 @@
+import os
+import time
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import slitflow as sf
+
+
+def make_index(n_img, n_trj, n_frm):
+    """Return a sorted index table of img_no, trj_no and frm_no."""
+    n_row = n_img * n_trj * n_frm
+    return pd.DataFrame({
+        "img_no": np.repeat(np.arange(1, n_img + 1), n_trj * n_frm),
+        "trj_no": np.tile(np.repeat(np.arange(1, n_trj + 1), n_frm), n_img),
+        "frm_no": np.tile(np.arange(1, n_frm + 1), n_img * n_trj)})\
+        .astype(np.int32).iloc[:n_row]
+
+
+def make_data(index, split_depth, root_dir):
+    D = sf.tbl.table.Table(sf.name.make_info_path(
+        root_dir, 1, 1, "bench", "index", "grp"))
+    for depth, name in enumerate(index.columns, 1):
+        D.info.add_column(depth, name, "int32", "num", name)
+    D.info.set_split_depth(split_depth)
+    D.info.index = index.copy()
+    return D
+
+
+def measure(name, func, n_repeat=3):
+    times = []
+    for _ in range(n_repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    print("{:<24s}{:>10.3f} s".format(name, min(times)))
+
+
+if __name__ == '__main__':
+
+    # 10M rows: 100 images x 1,000 trajectories x 100 frames
+    index = make_index(100, 1000, 100)
+    root_dir = tempfile.mkdtemp()
+    print("Index rows: {:,}".format(len(index)))
+
+    for split_depth in [1, 2]:
+        print("split_depth = {}".format(split_depth))
+        D = make_data(index, split_depth, root_dir)
+
+        def set_index_file_no():
+            D.info.index = index.copy()
+            D.info.set_index_file_no()
+        measure("set_index_file_no", set_index_file_no, 1)
+        D.info.set_file_nos(None)
+        measure("split", lambda: D.info.split(split_depth))
+        measure("file_index", D.info.file_index)
+        measure("make_data_paths",
+                lambda: sf.name.make_data_paths(D.info, D.EXT))
+        print("Data paths: {:,}".format(
+            len(sf.name.make_data_paths(D.info, D.EXT))))
+    os.rmdir(os.path.join(root_dir, "g1_grp", "a1_index"))
+    os.rmdir(os.path.join(root_dir, "g1_grp"))
+    os.rmdir(root_dir)
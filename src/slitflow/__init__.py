@@ -6,6 +6,13 @@ from . import data
 from . import info
 from . import setreqs
 from . import setindex
+from . import shmem
+from . import pool
+from . import budget
+from . import metrics
+from . import hindex
+from . import catalog
+from . import chunk
 from . import trj
 from . import loc
 from . import fig
@@ -18,4 +25,6 @@ from . import fun
 from . import user
 
 __all__ = ["data", "info", "trj", "loc", "fig", "create", "img", "tbl",
-           "setreqs", "load", "setindex", "manager", "name", "fun", "user"]
+           "setreqs", "load", "setindex", "manager", "name", "fun", "user",
+           "shmem", "pool", "budget", "metrics", "hindex", "catalog",
+           "chunk"]
@@ -0,0 +1,151 @@
+"""
+This module estimates the memory size of data and throttles loading and
+processing so that the memory usage stays under a byte budget.
+
+The budget is the free memory until the usage reaches
+:data:`slitflow.data.Data.MEMORY_LIMIT`. It can be further limited by
+:data:`slitflow.data.Data.MEMORY_BUDGET` in bytes. Data that are already in
+memory are measured by :mod:`psutil`, and data that are being loaded or
+processed are counted by their estimated size. Data that have been loaded
+are held against :data:`slitflow.data.Data.MEMORY_BUDGET` until they are
+released. Loading and processing wait for running processes instead of
+stopping the analysis. An exception is raised only when a single split
+cannot fit in the budget with the held data.
+
+.. code-block:: python
+
+    budget = sf.budget.MemoryBudget()
+    nbytes = sf.budget.get_nbytes(req_data) * Data.PROCESS_MEMORY_RATE
+    budget.check(nbytes)  # raise if nbytes can never fit
+    if budget.fits(nbytes):
+        budget.acquire(nbytes)
+        ...  # start process
+        budget.release(nbytes)
+    budget.acquire(nbytes, held=True)  # loaded data kept in memory
+
+"""
+import numpy as np
+import pandas as pd
+import psutil
+
+
+class MemoryBudget():
+    """Byte budget of data being loaded or processed.
+
+    Args:
+        limit (float, optional): Max usage rate of memory. Defaults to
+            :data:`slitflow.data.Data.MEMORY_LIMIT`.
+        nbytes (int, optional): Max bytes of data being processed at once.
+            Defaults to :data:`slitflow.data.Data.MEMORY_BUDGET`.
+
+    Attributes:
+        in_flight (int): Total estimated bytes of running processes.
+        held (int): Total estimated bytes of loaded data. Held data are
+            already measured by :mod:`psutil`, so they are counted only
+            against ``nbytes``.
+    """
+
+    def __init__(self, limit=None, nbytes=None):
+        from .data import Data
+        if limit is None:
+            limit = Data.MEMORY_LIMIT
+        if nbytes is None:
+            nbytes = Data.MEMORY_BUDGET
+        self.limit = limit
+        self.nbytes = nbytes
+        self.in_flight = 0
+        self.held = 0
+
+    def get_headroom(self):
+        """Return bytes that can be used until the limit is reached.
+
+        The held data are subtracted from ``nbytes``.
+
+        Returns:
+            int: Available bytes. Negative if the limit is already exceeded.
+        """
+        vm = psutil.virtual_memory()
+        headroom = int(vm.available - vm.total * (1 - self.limit))
+        if self.nbytes is not None:
+            headroom = min(headroom, int(self.nbytes) - self.held)
+        return headroom
+
+    def fits(self, nbytes):
+        """Return whether new data can be started now.
+
+        Args:
+            nbytes (int): Estimated bytes of the new data.
+
+        Returns:
+            bool: True if the data fit in the budget with running processes
+        """
+        return self.in_flight + nbytes <= self.get_headroom()
+
+    def check(self, nbytes):
+        """Raise an exception if data do not fit without running processes.
+
+        The held data are not released by waiting, so data that fit alone
+        can raise the exception if the held data are too large.
+
+        Args:
+            nbytes (int): Estimated bytes of the new data.
+        """
+        if self.in_flight == 0 and not self.fits(nbytes):
+            raise Exception("Memory usage limit reached.")
+
+    def acquire(self, nbytes, held=False):
+        """Count bytes of a started process or loaded data.
+
+        Args:
+            nbytes (int): Estimated bytes of the process or data.
+            held (bool, optional): Whether the bytes are loaded data that
+                are kept in memory.
+        """
+        if held:
+            self.held += nbytes
+        else:
+            self.in_flight += nbytes
+
+    def release(self, nbytes, held=False):
+        """Uncount bytes of a finished process or released data.
+
+        Args:
+            nbytes (int): Estimated bytes of the process or data.
+            held (bool, optional): Whether the bytes are loaded data.
+        """
+        if held:
+            self.held = max(self.held - nbytes, 0)
+        else:
+            self.in_flight = max(self.in_flight - nbytes, 0)
+
+
+def get_nbytes(obj):
+    """Estimate memory size of data.
+
+    Args:
+        obj (any): :class:`numpy.ndarray`, :class:`pandas.DataFrame` or a list
+            of them.
+
+    Returns:
+        int: Estimated bytes. Other objects are counted as zero.
+    """
+    if isinstance(obj, (list, tuple)):
+        return int(np.sum([get_nbytes(x) for x in obj]))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=False).sum())
+    return 0
+
+
+def get_array_nbytes(shape, dtype):
+    """Return bytes of an array from its shape and data type.
+
+    Args:
+        shape (tuple of int): Shape of the array.
+        dtype (str or numpy.dtype): Data type of the array.
+
+    Returns:
+        int: Bytes of the array
+    """
+    return int(np.prod(shape)) * np.dtype(dtype).itemsize
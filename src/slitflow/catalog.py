@@ -0,0 +1,405 @@
+"""
+This module provides a project catalog that caches the folder tree of a
+project directory.
+
+Functions in :mod:`slitflow.name` find group folders, analysis folders,
+information files and data files with :func:`glob.glob`. A pipeline with
+thousands of observations and split files repeats these searches for every
+task, which is slow on network file systems. If a catalog is opened for the
+project directory, :func:`glob` returns the paths from the cached tree
+instead of listing folders.
+
+The catalog is opened by :class:`slitflow.manager.Pipeline` and saved as a
+manifest in the ``g0_config`` folder. Files saved, deleted and copied by
+slitflow update the catalog. When the catalog is opened again, only the
+folders whose modification time is different from the manifest are listed.
+If files are changed by other programs during a session, call
+:func:`rebuild`.
+
+.. code-block:: python
+
+    sf.catalog.start(root_dir)
+    sf.name.get_obs_names(root_dir, (1, 2))  # served from the catalog
+    sf.catalog.rebuild(root_dir)  # list all folders again
+    sf.catalog.shutdown(root_dir)  # save the manifest
+
+.. caution::
+
+    The catalog is used only in the process that opened it. Worker
+    processes search folders as usual, and the catalog of the main process
+    is refreshed after the workers finish.
+
+"""
+import os
+import json
+import glob as _glob
+import fnmatch
+
+MANIFEST_NAME = "catalog.json"
+"""str: File name of the manifest saved in the g0_config folder."""
+
+MAX_DEPTH = 3
+"""int: Depth of the cached tree. Group folders, analysis folders and files
+in the analysis folders are cached."""
+
+catalogs = {}
+
+
+class Catalog():
+    """Cached folder tree of a project directory.
+
+    Args:
+        root_dir (str): Path to the project directory.
+
+    Attributes:
+        root_dir (str): Absolute path to the project directory.
+        tree (dict): Nested dictionary of folder names. Files are None.
+        mtimes (dict): Modification time in nanoseconds of each folder
+            relative to the project directory.
+        pid (int): Process ID that opened this catalog.
+        is_changed (bool): Whether the tree is changed after saving the
+            manifest.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = os.path.abspath(root_dir)
+        self.tree = {}
+        self.mtimes = {}
+        self.pid = os.getpid()
+        self.is_changed = False
+
+    def manifest_path(self):
+        """Return the path to the manifest file.
+
+        Returns:
+            str: Path to the manifest JSON file
+        """
+        return os.path.join(self.root_dir, "g0_config", MANIFEST_NAME)
+
+    def load(self):
+        """Load the manifest and list folders changed after saving it.
+        """
+        path = self.manifest_path()
+        if not os.path.exists(path):
+            self.rebuild()
+            return
+        try:
+            with open(path) as f:
+                manifest = json.load(f)
+            self.tree = manifest["tree"]
+            self.mtimes = manifest["mtimes"]
+        except (ValueError, KeyError):
+            self.rebuild()
+            return
+        self.refresh()
+
+    def save(self):
+        """Save the manifest if the tree is changed.
+        """
+        if not self.is_changed:
+            return
+        path = self.manifest_path()
+        if not os.path.exists(os.path.dirname(path)):
+            return
+        with open(path, "w") as f:
+            json.dump({"tree": self.tree, "mtimes": self.mtimes}, f)
+        self.is_changed = False
+
+    def rebuild(self):
+        """List all folders of the project directory.
+        """
+        self.tree = {}
+        self.mtimes = {}
+        self.scan("", self.tree, 1)
+        self.is_changed = True
+
+    def refresh(self):
+        """List folders whose modification time has changed.
+        """
+        self.refresh_node("", self.tree, 1)
+
+    def refresh_node(self, rel_dir, node, depth):
+        abs_dir = os.path.join(self.root_dir, rel_dir)
+        mtime = get_mtime(abs_dir)
+        if mtime is None:
+            node.clear()
+            return
+        if self.mtimes.get(rel_dir) != mtime:
+            self.scan(rel_dir, node, depth)
+            self.is_changed = True
+            return
+        if depth >= MAX_DEPTH:
+            return
+        for name, child in list(node.items()):
+            if child is not None:
+                self.refresh_node(os.path.join(rel_dir, name), child,
+                                  depth + 1)
+
+    def scan(self, rel_dir, node, depth):
+        """List a folder and its sub folders.
+
+        Args:
+            rel_dir (str): Folder path relative to the project directory.
+            node (dict): Dictionary to store the folder tree.
+            depth (int): Depth of the folder. The project directory is 1.
+        """
+        abs_dir = os.path.join(self.root_dir, rel_dir)
+        node.clear()
+        mtime = get_mtime(abs_dir)
+        if mtime is None:
+            return
+        self.mtimes[rel_dir] = mtime
+        with os.scandir(abs_dir) as entries:
+            for entry in entries:
+                if entry.is_dir() and depth < MAX_DEPTH:
+                    node[entry.name] = {}
+                    self.scan(os.path.join(rel_dir, entry.name),
+                              node[entry.name], depth + 1)
+                elif entry.is_dir():
+                    node[entry.name] = {}
+                else:
+                    node[entry.name] = None
+
+    def get_rel_parts(self, path):
+        """Return path components relative to the project directory.
+
+        Args:
+            path (str): Path in the project directory.
+
+        Returns:
+            list of str: Path components. None if the path is not in the
+            project directory.
+        """
+        rel = os.path.relpath(os.path.abspath(path), self.root_dir)
+        if rel == os.curdir:
+            return []
+        parts = rel.split(os.sep)
+        if parts[0] == os.pardir:
+            return None
+        return parts
+
+    def glob(self, pattern):
+        """Return paths matching a pattern in the same way as
+        :func:`glob.glob`.
+
+        Args:
+            pattern (str): Path pattern with shell-style wildcards.
+
+        Returns:
+            list of str: Sorted list of matching paths. None if the pattern
+            is out of the cached tree.
+        """
+        parts = self.get_rel_parts(pattern)
+        if parts is None or len(parts) == 0 or len(parts) > MAX_DEPTH:
+            return None
+        head = os.path.normpath(pattern)
+        for _ in parts:
+            head = os.path.dirname(head)
+        matches = [([], self.tree)]
+        for part in parts:
+            new_matches = []
+            for match, node in matches:
+                if node is None:
+                    continue
+                if _glob.has_magic(part):
+                    names = fnmatch.filter(list(node), part)
+                    if not part.startswith("."):
+                        names = [name for name in names
+                                 if not name.startswith(".")]
+                elif part in node:
+                    names = [part]
+                else:
+                    names = []
+                for name in sorted(names):
+                    new_matches.append((match + [name], node[name]))
+            matches = new_matches
+        return [os.path.join(head, *match) for match, _ in matches]
+
+    def add(self, path):
+        """Add a file or a folder to the tree.
+
+        Args:
+            path (str): Path to the created file or folder.
+        """
+        parts = self.get_rel_parts(path)
+        if parts is None or len(parts) == 0 or len(parts) > MAX_DEPTH:
+            return
+        node = self.tree
+        for part in parts[:-1]:
+            if node.get(part) is None:
+                node[part] = {}
+            node = node[part]
+        if os.path.isdir(path):
+            if node.get(parts[-1]) is None:
+                node[parts[-1]] = {}
+        else:
+            node[parts[-1]] = None
+        self.is_changed = True
+
+    def remove(self, path):
+        """Remove a file or a folder from the tree.
+
+        Args:
+            path (str): Path to the deleted file or folder.
+        """
+        parts = self.get_rel_parts(path)
+        if parts is None or len(parts) == 0 or len(parts) > MAX_DEPTH:
+            return
+        node = self.tree
+        for part in parts[:-1]:
+            node = node.get(part)
+            if node is None:
+                return
+        if parts[-1] in node:
+            del node[parts[-1]]
+            self.is_changed = True
+
+
+def get_mtime(path):
+    """Return the modification time of a folder.
+
+    Args:
+        path (str): Path to the folder.
+
+    Returns:
+        int: Modification time in nanoseconds. None if the folder does not
+        exist.
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def start(root_dir):
+    """Open the catalog of a project directory.
+
+    If the catalog is already opened, it is refreshed.
+
+    Args:
+        root_dir (str): Path to the project directory.
+
+    Returns:
+        Catalog: Catalog of the project directory
+    """
+    catalog = get(root_dir)
+    if catalog is not None:
+        catalog.refresh()
+        return catalog
+    catalog = Catalog(root_dir)
+    catalog.load()
+    catalogs[catalog.root_dir] = catalog
+    return catalog
+
+
+def shutdown(root_dir):
+    """Save the manifest and close the catalog.
+
+    Args:
+        root_dir (str): Path to the project directory.
+    """
+    catalog = get(root_dir)
+    if catalog is not None:
+        catalog.save()
+        del catalogs[catalog.root_dir]
+
+
+def get(path):
+    """Return the catalog of the project directory containing a path.
+
+    Args:
+        path (str): Path in the project directory.
+
+    Returns:
+        Catalog: Catalog opened in this process. None if not found.
+    """
+    if len(catalogs) == 0:
+        return None
+    abs_path = os.path.abspath(path)
+    for root_dir, catalog in catalogs.items():
+        if catalog.pid != os.getpid():
+            continue
+        if abs_path == root_dir or abs_path.startswith(root_dir + os.sep):
+            return catalog
+    return None
+
+
+def rebuild(root_dir):
+    """List all folders of an opened catalog again.
+
+    Args:
+        root_dir (str): Path to the project directory.
+    """
+    catalog = get(root_dir)
+    if catalog is not None:
+        catalog.rebuild()
+
+
+def refresh(root_dir):
+    """List folders of an opened catalog changed by other processes.
+
+    Args:
+        root_dir (str): Path to the project directory.
+    """
+    catalog = get(root_dir)
+    if catalog is not None:
+        catalog.refresh()
+
+
+def save(root_dir):
+    """Save the manifest of an opened catalog.
+
+    Args:
+        root_dir (str): Path to the project directory.
+    """
+    catalog = get(root_dir)
+    if catalog is not None:
+        catalog.save()
+
+
+def glob(pattern):
+    """Return paths matching a pattern from the catalog.
+
+    :func:`glob.glob` is used if no catalog is opened for the pattern. If no
+    path is found in the catalog, the folders are searched and the catalog
+    is refreshed when the result is different.
+
+    Args:
+        pattern (str): Path pattern with shell-style wildcards.
+
+    Returns:
+        list of str: List of matching paths
+    """
+    catalog = get(pattern)
+    if catalog is None:
+        return _glob.glob(pattern)
+    paths = catalog.glob(pattern)
+    if paths is None:
+        return _glob.glob(pattern)
+    if len(paths) == 0:
+        paths = _glob.glob(pattern)
+        if len(paths) > 0:  # changed by other programs
+            catalog.refresh()
+    return paths
+
+
+def add(path):
+    """Add a created file or folder to the opened catalog.
+
+    Args:
+        path (str): Path to the created file or folder.
+    """
+    catalog = get(path)
+    if catalog is not None:
+        catalog.add(path)
+
+
+def remove(path):
+    """Remove a deleted file or folder from the opened catalog.
+
+    Args:
+        path (str): Path to the deleted file or folder.
+    """
+    catalog = get(path)
+    if catalog is not None:
+        catalog.remove(path)
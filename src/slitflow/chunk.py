@@ -0,0 +1,214 @@
+"""
+This module provides a chunked on-disk storage of image stacks.
+
+A stack is saved as a folder containing ``.npy`` files of chunks and a JSON
+manifest. The stack is chunked along frames and optionally along rows and
+columns of images. Because each chunk is loaded as a memory-mapped array,
+only the chunks overlapping with the requested frames and tiles are read.
+This storage is used by :class:`slitflow.img.image.Image` when
+``param["image_format"]`` is "chunk".
+
+.. code-block:: python
+
+    sf.chunk.save_chunks(path, stack, [64, 512, 512])
+    store = sf.chunk.ChunkStore(path)
+    store.shape  # (frame, height, width)
+    img = store[10]  # read one frame
+    tile = store[100:200, 0:512, 0:512]  # read only one tile of frames
+
+Images are saved in the same orientation as :attr:`slitflow.data.Data.data`,
+that is, upside down compared with tiff files.
+
+"""
+import os
+import json
+import shutil
+
+import numpy as np
+
+MANIFEST_NAME = "manifest.json"
+"""str: File name of the manifest in the chunk folder."""
+
+CHUNK_FRAMES = 64
+"""int: Default number of frames of each chunk."""
+
+
+class ChunkStore():
+    """Chunked image stack saved in a folder.
+
+    Args:
+        path (str): Path to the chunk folder.
+
+    Attributes:
+        path (str): Path to the chunk folder.
+        shape (tuple of int): Shape of the whole stack as (frame, height,
+            width).
+        dtype (numpy.dtype): Data type of the stack.
+        chunk_shape (tuple of int): Shape of each chunk.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+        self.shape = tuple(manifest["shape"])
+        self.dtype = np.dtype(manifest["dtype"])
+        self.chunk_shape = tuple(manifest["chunk_shape"])
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if len(key) > 3:
+            raise Exception("Too many indices for a 3D stack.")
+        key = key + (slice(None),) * (3 - len(key))
+        frames = np.arange(self.shape[0])[key[0]]
+        tile = []
+        for k, n in zip(key[1:], self.shape[1:]):
+            if isinstance(k, slice):
+                tile.append(k)
+            else:
+                k = range(n)[k]
+                tile.append(slice(k, k + 1))
+        stack = self.read(np.atleast_1d(frames), *tile)
+        # integer indices drop the axes as numpy does
+        squeeze = tuple(i for i, k in enumerate(key)
+                        if not isinstance(k, slice) and np.ndim(k) == 0)
+        return stack.reshape([n for i, n in enumerate(stack.shape)
+                              if i not in squeeze])
+
+    def get_nbytes(self, n_frame=None):
+        """Return bytes of frames loaded into memory.
+
+        Args:
+            n_frame (int, optional): Number of frames. Defaults to all
+                frames.
+
+        Returns:
+            int: Bytes of the frames
+        """
+        if n_frame is None:
+            n_frame = self.shape[0]
+        return int(n_frame * self.shape[1] * self.shape[2]
+                   * self.dtype.itemsize)
+
+    def read(self, frames=None, rows=None, cols=None):
+        """Read frames and a tile from the chunks.
+
+        Args:
+            frames (array-like of int, optional): Frame numbers starting
+                from 0. Defaults to all frames.
+            rows (slice, optional): Row range of images. Defaults to all
+                rows.
+            cols (slice, optional): Column range of images. Defaults to all
+                columns.
+
+        Returns:
+            numpy.ndarray: Stack with the shape of (frame, row, column) in
+            the order of ``frames``
+        """
+        if frames is None:
+            frames = np.arange(self.shape[0])
+        frames = np.asarray(frames, dtype=np.int64)
+        frames = np.where(frames < 0, frames + self.shape[0], frames)
+        rows = range(self.shape[1])[rows or slice(None)]
+        cols = range(self.shape[2])[cols or slice(None)]
+        if rows.step != 1 or cols.step != 1:
+            raise Exception("Step of rows and columns should be 1.")
+        stack = np.empty([len(frames), len(rows), len(cols)],
+                         dtype=self.dtype)
+        if stack.size == 0:
+            return stack
+        cf, ch, cw = self.chunk_shape
+        frame_chunks = frames // cf
+        for fc in np.unique(frame_chunks):
+            is_chunk = frame_chunks == fc
+            chunk_frames = frames[is_chunk] - fc * cf
+            for rc in range(rows.start // ch, (rows.stop - 1) // ch + 1):
+                r0 = max(rows.start, rc * ch)
+                r1 = min(rows.stop, (rc + 1) * ch)
+                for cc in range(cols.start // cw, (cols.stop - 1) // cw + 1):
+                    c0 = max(cols.start, cc * cw)
+                    c1 = min(cols.stop, (cc + 1) * cw)
+                    chunk = np.load(self.get_chunk_path(fc, rc, cc),
+                                    mmap_mode="r")
+                    stack[is_chunk, r0 - rows.start:r1 - rows.start,
+                          c0 - cols.start:c1 - cols.start] = \
+                        chunk[chunk_frames, r0 - rc * ch:r1 - rc * ch,
+                              c0 - cc * cw:c1 - cc * cw]
+        return stack
+
+    def get_chunk_path(self, frame_chunk, row_chunk, col_chunk):
+        """Return the path to a chunk file.
+
+        Args:
+            frame_chunk (int): Chunk number along frames.
+            row_chunk (int): Chunk number along rows.
+            col_chunk (int): Chunk number along columns.
+
+        Returns:
+            str: Path to the ``.npy`` file
+        """
+        return os.path.join(self.path, "c{}_{}_{}.npy".format(
+            frame_chunk, row_chunk, col_chunk))
+
+
+def get_chunk_shape(shape, chunk_shape=None):
+    """Return the full chunk shape of a stack.
+
+    Args:
+        shape (tuple of int): Shape of the stack as (frame, height, width).
+        chunk_shape (list of int, optional): Number of frames of each chunk,
+            or [frame, height, width] of each chunk. Defaults to
+            :data:`CHUNK_FRAMES` frames of whole images.
+
+    Returns:
+        tuple of int: Chunk shape as (frame, height, width)
+    """
+    if chunk_shape is None:
+        chunk_shape = [CHUNK_FRAMES]
+    chunk_shape = list(np.atleast_1d(chunk_shape))
+    if len(chunk_shape) == 1:
+        chunk_shape = chunk_shape + [shape[1], shape[2]]
+    if len(chunk_shape) != 3:
+        raise Exception("chunk_shape should be [frame] or "
+                        "[frame, height, width].")
+    return tuple(max(int(n), 1) for n in chunk_shape)
+
+
+def save_chunks(path, stack, chunk_shape=None):
+    """Save an image stack into a chunk folder.
+
+    The existing folder is replaced.
+
+    Args:
+        path (str): Path to the chunk folder.
+        stack (numpy.ndarray): 3D array with the shape of (frame, height,
+            width).
+        chunk_shape (list of int, optional): See :func:`get_chunk_shape`.
+
+    Returns:
+        ChunkStore: Saved chunk store
+    """
+    if stack.ndim != 3:
+        raise Exception("Stack should be a 3D array.")
+    chunk_shape = get_chunk_shape(stack.shape, chunk_shape)
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.makedirs(path)
+    cf, ch, cw = chunk_shape
+    for fc in range(-(-stack.shape[0] // cf)):
+        for rc in range(-(-stack.shape[1] // ch)):
+            for cc in range(-(-stack.shape[2] // cw)):
+                np.save(os.path.join(path, "c{}_{}_{}.npy".format(
+                    fc, rc, cc)), np.ascontiguousarray(
+                    stack[fc * cf:(fc + 1) * cf, rc * ch:(rc + 1) * ch,
+                          cc * cw:(cc + 1) * cw]))
+    # the manifest is saved at last so that incomplete folders are not read
+    manifest = {"shape": list(stack.shape), "dtype": stack.dtype.str,
+                "chunk_shape": list(chunk_shape)}
+    with open(os.path.join(path, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return ChunkStore(path)
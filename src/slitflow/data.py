@@ -1,18 +1,26 @@
 import numpy as np
+import pandas as pd
 import concurrent.futures
-import psutil
 import os
 import sys
 import pickle
 import copy
+import functools
+import contextlib
 
 from .info import Info
 from . import name as nm
+from . import shmem
+from . import pool
+from . import budget
+from . import metrics
+from . import catalog
 if 'ipykernel' in sys.modules:
     from tqdm.notebook import tqdm
 else:
     from tqdm import tqdm
 from . import setindex
+from .hindex import HierIndex
 
 
 class Data():
@@ -35,10 +43,40 @@ class Data():
         memory_limit (int): Max usage of memory. This value is defined by
             :data:`slitflow.MEMORY_LIMIT`. This attribute prevents
             crashing memory during loading data and calculation.
+            See :mod:`slitflow.budget`.
         EXT (str): Extension of data file with ".". Implement in subclass.
+        SHARED_MEMORY (bool): Whether :meth:`run_mp` transfers arrays and
+            tables through shared memory. The inputs are copied into shared
+            memory, so they are held twice during :meth:`run_mp`. See
+            :mod:`slitflow.shmem`.
+        MEMORY_BUDGET (int): Max bytes of data being loaded or processed at
+            once. If None, only :data:`MEMORY_LIMIT` is used.
+        PROCESS_MEMORY_RATE (float): Ratio of memory used by
+            :meth:`process` to the size of its input data. This ratio is used
+            to estimate the memory of each process. Shared memory copies of
+            the inputs are counted separately.
+        BATCH_SIZE (int): Max number of splits passed to
+            :meth:`process_batch` at once.
+        INDEX_FORMAT (str): Format of the index file saved by
+            :meth:`slitflow.info.Info.save_index`. "csv" for the text
+            format or "npy" for the binary format. Binary index files can
+            not be read by earlier versions of slitflow. Both formats can be
+            loaded regardless of this value.
+        MUTATES_INPUTS (bool): Whether :meth:`process` changes values of
+            the required data. If False, arrays and tables are passed to
+            :meth:`process` as read-only views by :func:`freeze`, so that
+            they should not be copied in :meth:`process` only to protect
+            the required data. If True, each call of :meth:`process` gets
+            writable copies.
     """
     MEMORY_LIMIT = 0.9
     CPU_RATE = 0.7
+    SHARED_MEMORY = False
+    MEMORY_BUDGET = None
+    PROCESS_MEMORY_RATE = 2
+    BATCH_SIZE = 256
+    INDEX_FORMAT = "csv"
+    MUTATES_INPUTS = False
 
     def __init__(self, info_path=None):
         self.reqs = None
@@ -53,6 +91,12 @@ class Data():
     def load(self, file_nos=None):
         """Load and split data files.
         """
+        with metrics.measure(self, "load"):
+            self.load_files(file_nos)
+
+    def load_files(self, file_nos=None):
+        """Load and split data files from the files or the kept data.
+        """
         if self.info.load_split_depth is None:
             self.info.load_split_depth = self.info.split_depth()
 
@@ -74,18 +118,26 @@ class Data():
     def load_from_file(self):
         self.data = []
         if not hasattr(self.info, "data_paths"):
-            self.info.data_paths = nm.load_data_paths(self.info, self.EXT)
+            self.info.data_paths = nm.load_data_paths(self.info,
+                                                      self.get_ext())
+        mem = budget.MemoryBudget(self.memory_limit / 100)
+        file_nos = self.info.file_nos()
         for i, path in enumerate(self.info.data_paths, 1):
-            if psutil.virtual_memory().percent > self.memory_limit:
-                raise Exception("Memory usage limit reached.")
-            if i in self.info.file_nos():
+            if i in file_nos:
+                nbytes = self.get_file_nbytes(path)
+                mem.check(nbytes)
+                mem.acquire(nbytes)
                 self.data.append(self.load_data(path))
+                mem.release(nbytes)
+                mem.acquire(nbytes, held=True)
+                self.info.metrics["bytes_read"] += \
+                    metrics.get_file_size([path])
         self.split(self.info.load_split_depth)
         self.keep_data()
 
     def load_from_keep(self):
         index = self.info.index.copy()
-        self.data = copy.deepcopy(self.keep)
+        self.data = [freeze(x, True) for x in self.keep]
         if len(index) == 0:
             return
         index["_dest"] = index["_split"]
@@ -98,13 +150,84 @@ class Data():
         """
         pass
 
+    def get_ext(self):
+        """Return the extension of data files.
+
+        Override in subclass if the extension depends on the file format.
+
+        Returns:
+            str: Extension of data files with "."
+        """
+        return self.EXT
+
+    def set_format(self, param):
+        """Set the file format of data from the parameters.
+
+        This method is called after :meth:`set_info`. Implement in subclass
+        if the data can be saved in different formats.
+
+        Args:
+            param (dict): Parameters of the task.
+        """
+        pass
+
+    def get_req_columns(self, req_no, req_info):
+        """Return column names to load from a required data.
+
+        This method is used by :class:`~slitflow.manager.Pipeline` to set
+        :attr:`slitflow.info.Info.load_columns` of the required data before
+        loading. Override in subclass to load only the columns used in
+        :meth:`process`. Index columns should be included.
+
+        Args:
+            req_no (int): Number of the required data.
+            req_info (Info): Information object of the required data.
+
+        Returns:
+            list of str: Column names to load. None to load all columns.
+        """
+        return None
+
+    def make_data_paths(self):
+        """Return paths to the data files of the splits in the index.
+
+        Override in subclass if the data are not saved as one file for each
+        split.
+
+        Returns:
+            list of str: List of paths to the data files
+        """
+        return nm.make_data_paths(self.info, self.get_ext())
+
+    def get_file_nbytes(self, path):
+        """Estimate memory size of data loaded from a file.
+
+        The file size is used by default. Override in subclass if the size
+        can be calculated from the array shape and data type.
+
+        Args:
+            path (str): Path to the data file.
+
+        Returns:
+            int: Estimated bytes of the loaded data
+        """
+        if os.path.exists(path):
+            return os.path.getsize(path)
+        return 0
+
     def save(self, clear=True):
         if len(self.data) == 0:
             return
-        self.info.data_paths = nm.make_data_paths(self.info, self.EXT)
-        for data, path in zip(self.data, self.info.data_paths):
-            if data is not None:
-                self.save_data(data, path)
+        self.info.data_paths = self.make_data_paths()
+        with metrics.measure(self, "save"):
+            paths = []
+            for data, path in zip(self.data, self.info.data_paths):
+                if data is not None:
+                    self.save_data(data, path)
+                    paths.append(path)
+        for path in paths:
+            catalog.add(path)
+        self.info.metrics["bytes_written"] += metrics.get_file_size(paths)
         self.info.save()
         if clear:
             self.clear_data()
@@ -120,7 +243,15 @@ class Data():
         self.info.index["_split"] = 0
 
     def keep_data(self):
-        self.keep = copy.deepcopy(self.data)
+        """Keep the loaded data to be restored by :meth:`load_from_keep`.
+
+        Arrays and tables are not copied. Both :attr:`data` and the kept
+        data become read-only views of the same memory by :func:`freeze`,
+        so that the kept data are never changed through :attr:`data`.
+        Writable data have to be copied before changing values.
+        """
+        self.data = [freeze(x) for x in self.data]
+        self.keep = [freeze(x, True) for x in self.data]
         self.info.index["_keep"] = self.info.index["_split"]
 
     def split(self, split_depth=None, index=None):
@@ -135,7 +266,8 @@ class Data():
                 # _dest containing minus value, filled with None
                 self.split_data()
         else:
-            if not all(self.info.index["_split"] == self.info.index["_dest"]):
+            if not np.array_equal(self.info.index["_split"].to_numpy(),
+                                  self.info.index["_dest"].to_numpy()):
                 self.split_data()
         self.info.index["_split"] = self.info.index["_dest"]
         self.info.index.drop("_dest", axis=1, inplace=True)
@@ -207,69 +339,242 @@ class Data():
         if "split_depth" not in param:
             param["split_depth"] = reqs[0].info.data_split_depth
 
-        if self.reqs_are_ready:
-            self.reqs = reqs
-        else:
-            self.set_reqs(reqs, param)
+        with metrics.measure(self, "set_reqs"):
+            if self.reqs_are_ready:
+                self.reqs = reqs
+            else:
+                self.set_reqs(reqs, param)
         if param is not None:
             self.set_info(param)
         self.info.add_user_param(param)
+        self.set_format(param)
 
-        reqs_data = []
-        for req in self.reqs:
-            reqs_data.append(req.data)
-        reqs_data = list(zip(*reqs_data))
+        reqs_data = self.get_reqs_data()
         param = self.info.get_param_dict()
-        for req_data in tqdm(reqs_data, desc="Prc", leave=False):
-            if psutil.virtual_memory().percent > self.memory_limit:
-                raise Exception("Memory usage limit reached.")
-            self.data.append(self.process(list(req_data), param))
-        self.post_run()
+        func, items, is_batch = self.get_process_items(reqs_data)
+        mem = budget.MemoryBudget(self.memory_limit / 100)
+        with metrics.measure(self, "process"):
+            for item in tqdm(items, desc="Prc", leave=False):
+                nbytes = budget.get_nbytes(item) * self.PROCESS_MEMORY_RATE
+                mem.check(nbytes)
+                mem.acquire(nbytes)
+                self.add_result(func(item, param), is_batch)
+                mem.release(nbytes)
+        self.info.metrics["n_split"] += len(reqs_data)
+        with metrics.measure(self, "post_run"):
+            self.post_run()
         self.info.set_meta()
-        self.set_index()
-        self.split(self.info.split_depth())
+        with metrics.measure(self, "set_index"):
+            self.set_index()
+        with metrics.measure(self, "split"):
+            self.split(self.info.split_depth())
         self.reqs_are_ready = False
 
     def run_mp(self, reqs=None, param=None):
         """Execute run method using multiple CPU.
 
         This method uses :class:`~concurrent.futures.ProcessPoolExecutor`.
+        If the shared pool is started by :func:`slitflow.pool.start`, the pool
+        is used instead of creating a new one.
+        If :attr:`SHARED_MEMORY` is True, required data and results are
+        transferred through shared memory blocks instead of pickling.
+        New processes are submitted only while the estimated memory of
+        running processes fits in :class:`~slitflow.budget.MemoryBudget`.
+        The shared memory copies of the inputs are held in the budget until
+        all processes finish.
 
         """
 
         if "split_depth" not in param:
             param["split_depth"] = reqs[0].info.data_split_depth
 
-        if self.reqs_are_ready:
-            self.reqs = reqs
+        with metrics.measure(self, "set_reqs"):
+            if self.reqs_are_ready:
+                self.reqs = reqs
+            else:
+                self.set_reqs(reqs, param)
+        if param is not None:
+            self.set_info(param)
+        self.info.add_user_param(param)
+        self.set_format(param)
+
+        reqs_data = self.get_reqs_data()
+        param = self.info.get_param_dict()
+        func, items, is_batch = self.get_process_items(
+            reqs_data, self.n_worker)
+        futures = []
+        blocks = []
+        cache = {}
+        mem = budget.MemoryBudget(self.memory_limit / 100)
+        running = {}
+        if pool.get() is None:
+            context = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.n_worker,
+                initializer=pool.set_native_threads,
+                initargs=(pool.get_native_threads(self.n_worker),))
         else:
-            self.set_reqs(reqs, param)
+            context = contextlib.nullcontext(pool.get())
+        try:
+            with metrics.measure(self, "process"), context as executor:
+                for item in items:
+                    nbytes = budget.get_nbytes(item) \
+                        * self.PROCESS_MEMORY_RATE
+                    shared_nbytes = 0
+                    if self.SHARED_MEMORY:
+                        shared_nbytes = shmem.get_nbytes(item, cache)
+                    while not mem.fits(nbytes + shared_nbytes) and \
+                            len(running) > 0:
+                        finished, _ = concurrent.futures.wait(
+                            running,
+                            return_when=concurrent.futures.FIRST_COMPLETED)
+                        for future in finished:
+                            mem.release(running.pop(future))
+                    mem.check(nbytes + shared_nbytes)
+                    if self.SHARED_MEMORY:
+                        future = executor.submit(
+                            shmem.run_process, func,
+                            shmem.to_shared(item, blocks, cache), param)
+                        mem.acquire(shared_nbytes, held=True)
+                    else:
+                        future = executor.submit(func, item, param)
+                    mem.acquire(nbytes)
+                    running[future] = nbytes
+                    futures.append(future)
+                for x in tqdm(futures, desc="Prc", leave=False):
+                    if self.SHARED_MEMORY:
+                        self.add_result(shmem.receive(x.result()), is_batch)
+                    else:
+                        self.add_result(x.result(), is_batch)
+        finally:
+            shmem.release(blocks, unlink=True)
+        self.info.metrics["n_split"] += len(reqs_data)
+        with metrics.measure(self, "post_run"):
+            self.post_run()
+        self.info.set_meta()
+        with metrics.measure(self, "set_index"):
+            self.set_index()
+        with metrics.measure(self, "split"):
+            self.split(self.info.split_depth())
+        self.reqs_are_ready = False
+
+    def run_thread(self, reqs=None, param=None):
+        """Execute run method using multiple threads.
+
+        This method uses :class:`~concurrent.futures.ThreadPoolExecutor`.
+        It is faster than :meth:`run_mp` if :meth:`process` spends most of
+        its time in functions releasing the GIL such as OpenCV and
+        :mod:`scipy.ndimage`, because the data are not pickled. The threads
+        of OpenCV and BLAS are limited during the run so that the total
+        number of threads does not exceed the number of CPU cores.
+        New threads are submitted only while the estimated memory of
+        running threads fits in :class:`~slitflow.budget.MemoryBudget`.
+
+        """
+
+        if "split_depth" not in param:
+            param["split_depth"] = reqs[0].info.data_split_depth
+
+        with metrics.measure(self, "set_reqs"):
+            if self.reqs_are_ready:
+                self.reqs = reqs
+            else:
+                self.set_reqs(reqs, param)
         if param is not None:
             self.set_info(param)
         self.info.add_user_param(param)
+        self.set_format(param)
 
-        reqs_data = []
-        for req in self.reqs:
-            reqs_data.append(req.data)
-        reqs_data = list(zip(*reqs_data))
+        reqs_data = self.get_reqs_data()
         param = self.info.get_param_dict()
+        func, items, is_batch = self.get_process_items(
+            reqs_data, self.n_worker)
         futures = []
-        with concurrent.futures.ProcessPoolExecutor(
-                max_workers=self.n_worker) as executor:
-            for req_data in reqs_data:
-                future = executor.submit(
-                    self.process, list(req_data), param)
+        mem = budget.MemoryBudget(self.memory_limit / 100)
+        running = {}
+        with metrics.measure(self, "process"), pool.limit_native_threads(
+                pool.get_native_threads(self.n_worker)), \
+                concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.n_worker) as executor:
+            for item in items:
+                nbytes = budget.get_nbytes(item) * self.PROCESS_MEMORY_RATE
+                while not mem.fits(nbytes) and len(running) > 0:
+                    finished, _ = concurrent.futures.wait(
+                        running,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in finished:
+                        mem.release(running.pop(future))
+                mem.check(nbytes)
+                future = executor.submit(func, item, param)
+                mem.acquire(nbytes)
+                running[future] = nbytes
                 futures.append(future)
-            data_list = []
             for x in tqdm(futures, desc="Prc", leave=False):
-                data_list.append(x.result())
-            self.data.extend(data_list)
-        self.post_run()
+                self.add_result(x.result(), is_batch)
+        self.info.metrics["n_split"] += len(reqs_data)
+        with metrics.measure(self, "post_run"):
+            self.post_run()
         self.info.set_meta()
-        self.set_index()
-        self.split(self.info.split_depth())
+        with metrics.measure(self, "set_index"):
+            self.set_index()
+        with metrics.measure(self, "split"):
+            self.split(self.info.split_depth())
         self.reqs_are_ready = False
 
+    def run_stream(self, reqs=None, param=None):
+        """Execute run method and save each result as soon as possible.
+
+        The required data splits are grouped by the save file of the result
+        and passed to :meth:`run` one group at a time in the same way as
+        :func:`slitflow.setreqs.run_cycle`. Each result is saved and released
+        before the next group is processed. Therefore, the memory usage of
+        results is bounded by one save file instead of all results. The save
+        files are decided from the index of the first required data up to
+        ``split_depth``.
+
+        .. caution::
+
+            :attr:`info` should have the path to save the results.
+
+        Args:
+            reqs (list of any): List of required data.
+            param (dict): Dictionary of parameters.
+        """
+        if self.info.path is None:
+            raise Exception("Info path is required to save results.")
+        if "split_depth" not in param:
+            param["split_depth"] = reqs[0].info.data_split_depth
+
+        if self.reqs_are_ready:
+            self.reqs = reqs
+        else:
+            self.set_reqs(reqs, param)
+        reqs = self.reqs
+        reqs_data = [req.data for req in reqs]
+        reqs_index = [req.info.index for req in reqs]
+        n_split = np.min([len(req_data) for req_data in reqs_data])
+        groups = get_save_groups(reqs[0], param["split_depth"], n_split)
+        mem = budget.MemoryBudget(self.memory_limit / 100)
+        try:
+            for group in tqdm(groups, desc="Str", leave=False):
+                for req, req_data, req_index in zip(
+                        reqs, reqs_data, reqs_index):
+                    req.data = [req_data[i - 1] for i in group]
+                    req.info.index = select_splits(req_index, group)
+                nbytes = budget.get_nbytes([req.data for req in reqs]) \
+                    * self.PROCESS_MEMORY_RATE
+                mem.check(nbytes)
+                mem.acquire(nbytes)
+                self.reqs_are_ready = True
+                self.run(reqs, param)
+                self.split(param["split_depth"])
+                self.save()
+                mem.release(nbytes)
+        finally:
+            for req, req_data, req_index in zip(reqs, reqs_data, reqs_index):
+                req.data = req_data
+                req.info.index = req_index
+            self.reqs_are_ready = False
+
     def post_run(self):
         """Implement in each subclass.
 
@@ -286,6 +591,223 @@ class Data():
         """
         return reqs[0]
 
+    @classmethod
+    def process_batch(cls, reqs_list, param={}):
+        """Calculation code for multiple splits at once.
+
+        Override this method in subclass if the calculation can be
+        vectorized over splits. This method is used by :meth:`run`,
+        :meth:`run_mp` and :meth:`run_thread` instead of :meth:`process` if
+        it is overridden. The default implementation calls :meth:`process`
+        for each split.
+
+        Args:
+            reqs_list (list of list): List of ``reqs`` of :meth:`process`.
+            param (dict): Parameters of :meth:`process`.
+
+        Returns:
+            list: Result of :meth:`process` for each element of reqs_list
+        """
+        return [cls.process(reqs, param) for reqs in reqs_list]
+
+    def get_reqs_data(self):
+        """Return the required data of each split for :meth:`process`.
+
+        Arrays and tables are read-only views of the data of :attr:`reqs`.
+        See :attr:`MUTATES_INPUTS`.
+
+        Returns:
+            list of tuple: Data of all required data of each split
+        """
+        reqs_data = []
+        for req in self.reqs:
+            reqs_data.append([freeze(x) for x in req.data])
+        return list(zip(*reqs_data))
+
+    def get_process_items(self, reqs_data, n_worker=1):
+        """Return the function and its inputs to calculate all splits.
+
+        Args:
+            reqs_data (list of tuple): Required data of each split.
+            n_worker (int, optional): Number of workers to share the splits.
+
+        Returns:
+            Tuple containing
+
+            - func (function): :meth:`process` or :meth:`process_batch`.
+              If :attr:`MUTATES_INPUTS` is True, the function is wrapped by
+              :func:`process_copy`.
+            - items (list): List of the first argument of func. If func is
+              :meth:`process_batch`, splits are grouped into batches of at
+              most :attr:`BATCH_SIZE`.
+            - is_batch (bool): Whether func is :meth:`process_batch`
+        """
+        func = getattr(self.process_batch, "__func__", self.process_batch)
+        if func is Data.process_batch.__func__:
+            func = self.process
+            if self.MUTATES_INPUTS:
+                func = functools.partial(process_copy, func)
+            return func, [list(req_data) for req_data in reqs_data], False
+        batch_size = int(np.ceil(len(reqs_data) / max(n_worker, 1)))
+        batch_size = max(min(batch_size, self.BATCH_SIZE), 1)
+        items = []
+        for i in range(0, len(reqs_data), batch_size):
+            items.append([list(req_data)
+                          for req_data in reqs_data[i:i + batch_size]])
+        func = self.process_batch
+        if self.MUTATES_INPUTS:
+            func = functools.partial(process_copy, func)
+        return func, items, True
+
+    def add_result(self, result, is_batch=False):
+        """Add a result of the function from :meth:`get_process_items`.
+
+        Args:
+            result (any): Result of :meth:`process` or list of results of
+                :meth:`process_batch`.
+            is_batch (bool, optional): Whether result is from
+                :meth:`process_batch`.
+        """
+        if is_batch:
+            self.data.extend(result)
+        else:
+            self.data.append(result)
+
+
+def freeze(obj, copy_objects=False):
+    """Return a read-only view of data.
+
+    :class:`numpy.ndarray` is returned as a new view that can not be
+    written. :class:`pandas.DataFrame` is returned as a new table of such
+    views of the columns. Columns of extension types such as categorical
+    are copied because they are not backed by one array. Adding, deleting
+    and replacing columns of the table do not change the original table.
+    The original data remain writable.
+
+    Args:
+        obj (any): Data such as an element of :attr:`Data.data`.
+        copy_objects (bool, optional): Whether other objects are
+            deep-copied. Other objects are returned as they are if False.
+
+    Returns:
+        any: Read-only view of the data
+    """
+    if isinstance(obj, np.ndarray):
+        view = obj.view()
+        view.flags.writeable = False
+        return view
+    if isinstance(obj, pd.DataFrame):
+        columns = {}
+        for i, dtype in enumerate(obj.dtypes):
+            if isinstance(dtype, np.dtype):
+                columns[i] = freeze(obj.iloc[:, i].to_numpy(copy=False))
+            else:
+                columns[i] = obj.iloc[:, i].copy()
+        view = pd.DataFrame(columns, index=obj.index, copy=False)
+        view.columns = obj.columns
+        return view
+    if copy_objects:
+        return copy.deepcopy(obj)
+    return obj
+
+
+def thaw(obj):
+    """Return writable copies of arrays and tables.
+
+    Args:
+        obj (any): Data or list of data.
+
+    Returns:
+        any: Copy of arrays and tables. Lists are copied recursively and
+        other objects are returned as they are.
+    """
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(thaw(x) for x in obj)
+    if isinstance(obj, (np.ndarray, pd.DataFrame)):
+        return obj.copy()
+    return obj
+
+
+def process_copy(func, reqs, param):
+    """Call a process function with writable copies of required data.
+
+    This function is used for :attr:`Data.MUTATES_INPUTS` classes.
+
+    Args:
+        func (function): :meth:`Data.process` or :meth:`Data.process_batch`.
+        reqs (list): Required data or list of required data.
+        param (dict): Parameters of func.
+
+    Returns:
+        any: Result of func
+    """
+    return func(thaw(reqs), param)
+
+
+def select_splits(index, split_nos):
+    """Return index table that only the selected splits are loaded.
+
+    Args:
+        index (pandas.DataFrame): Index table with ``_split`` column.
+        split_nos (list of int): Split numbers to select.
+
+    Returns:
+        pandas.DataFrame: Index table whose ``_split`` is renumbered from 1
+        in the order of ``split_nos`` and 0 for other splits. The sign of
+        ``_split`` for empty data is kept.
+    """
+    if len(index) == 0 or "_split" not in index.columns:
+        return index
+    index = index.copy()
+    split = index["_split"].values
+    new_nos = np.zeros(np.max(np.abs(split)) + 1, dtype=split.dtype)
+    new_nos[split_nos] = np.arange(1, len(split_nos) + 1)
+    index["_split"] = (new_nos[np.abs(split)] * np.sign(split))\
+        .astype(split.dtype)
+    return index
+
+
+def get_save_groups(req, split_depth, n_split):
+    """Group data splits of required data by save files of the result.
+
+    Consecutive splits sharing index values up to ``split_depth`` are
+    grouped because they are saved to the same file.
+
+    Args:
+        req (Data): Required data whose data property is split.
+        split_depth (int): Split depth of the result data.
+        n_split (int): Number of splits.
+
+    Returns:
+        list of list of int: Split numbers starting from 1 of each group.
+    """
+    index = req.info.index
+    index_cols = req.info.get_column_name("index")
+    if split_depth == 0 or len(index) == 0 or "_split" not in index.columns:
+        return [list(range(1, n_split + 1))]
+    if split_depth > len(index_cols):
+        return [[i] for i in range(1, n_split + 1)]
+    index = index[index["_split"] != 0]
+    key_nos = HierIndex.from_frame(
+        index, index_cols[:split_depth]).group_no(split_depth)
+    split = np.abs(index["_split"].to_numpy()).astype(np.int64)
+    is_valid = key_nos >= 0
+    n_key = int(key_nos.max()) + 1 if np.any(is_valid) else 1
+    pairs = np.unique(split[is_valid] * n_key + key_nos[is_valid])
+    pair_splits = pairs // n_key
+    pair_keys = pairs % n_key
+    bounds = np.searchsorted(pair_splits, np.arange(1, n_split + 2))
+    key_groups = np.full(n_key, -1, dtype=np.int64)
+    groups = []
+    for i in range(1, n_split + 1):
+        keys = pair_keys[bounds[i - 1]:bounds[i]]
+        if len(groups) == 0 or not np.any(
+                key_groups[keys] == len(groups) - 1):
+            groups.append([])
+        groups[-1].append(i)
+        key_groups[keys] = len(groups) - 1
+    return groups
+
 
 class Pickle(Data):
     """Pickle Data class.
@@ -59,7 +59,7 @@ class Simple(Figure):
         Returns:
             matplotlib.figure.Figure:  matplotlib Figure containing bar plot
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         fig, ax = plt.subplots()
         if len(param["index_cols"]) == 0:
             x = df[param["calc_cols"][0]].values
@@ -149,8 +149,8 @@ class WithModel(Figure):
             matplotlib.figure.Figure: matplotlib Figure containing bar plot
             with model
         """
-        df = reqs[0].copy()
-        df_model = reqs[1].copy()
+        df = reqs[0]
+        df_model = reqs[1]
         fig, ax = plt.subplots()
         zorder = 1
         if len(param["index_cols"]) > 0:
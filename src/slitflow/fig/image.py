@@ -65,7 +65,7 @@ class Gray(Figure):
             matplotlib.figure.Figure: matplotlib Figure containing pseudo color
             image.
         """
-        img = reqs[0].copy()
+        img = reqs[0]
         if img.shape[0] != 1:
             raise ValueError(
                 "Image should be split into a single frame image.")
@@ -46,7 +46,7 @@ class Simple(Figure):
         Returns:
             matplotlib.figure.Figure: matplotlib Figure containing scatter plot
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         fig, ax = plt.subplots()
         if len(param["index_cols"]) == 0:
             x = df[param["calc_cols"][0]].values
@@ -313,7 +313,7 @@ class ParamTable(Basic):
             matplotlib.figure.Figure: Styled Figure object
         """
         fig = Basic.process(reqs, param)
-        df = reqs[1].copy()
+        df = reqs[1]
         col_names = list(df.columns)
 
         if "limit" in col_names:
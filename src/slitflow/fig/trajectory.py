@@ -51,7 +51,7 @@ class All(Figure):
             matplotlib.figure.Figure: matplotlib Figure containing trajectory
             plot
         """
-        df = reqs[0].copy()
+        df = reqs[0]
 
         if ("centered", True) in param.items():
             xc = (np.max(df[param["calc_cols"][0]].values)
@@ -0,0 +1,391 @@
+"""
+This module provides an array-backed hierarchical index.
+
+:attr:`slitflow.info.Info.index` is a :class:`pandas.DataFrame` of index
+columns such as ``img_no``, ``trj_no`` and ``frm_no`` with helper columns
+such as ``_split`` and ``_dest``. Grouping and joining the table by
+:mod:`pandas` costs hashing and copying of all rows for every task.
+:class:`HierIndex` keeps the index columns as int32 arrays and caches the
+row boundaries of each depth in the CSR style, so that the operations used
+by slitflow are done with :mod:`numpy` without merging tables.
+
+.. code-block:: python
+
+    hindex = sf.hindex.HierIndex.from_frame(D.info.index,
+                                            ["img_no", "trj_no"])
+    hindex.group_no(1)  # img group number of each row
+    hindex.offsets(2)  # row boundaries of trajectories
+    hindex.keys(1)  # unique img_no values
+
+Index tables are usually sorted by the index columns from the top depth.
+Methods also work for unsorted tables and missing values in the same way as
+:meth:`pandas.core.groupby.GroupBy.ngroup`, but they are slower.
+
+"""
+import numpy as np
+import pandas as pd
+
+
+class HierIndex():
+    """Hierarchical index of int32 column arrays.
+
+    Args:
+        names (list of str): Index column names from the top depth.
+        columns (list of numpy.ndarray): Values of the index columns.
+            Integer columns are converted into int32. Columns with missing
+            values are kept as float.
+
+    Attributes:
+        names (list of str): Index column names from the top depth.
+        columns (list of numpy.ndarray): Values of the index columns.
+    """
+
+    def __init__(self, names, columns):
+        if len(names) != len(columns):
+            raise Exception("Number of names and columns must be the same.")
+        self.names = list(names)
+        self.columns = [to_index_array(col) for col in columns]
+        lens = set([len(col) for col in self.columns])
+        if len(lens) > 1:
+            raise Exception("All columns must have the same length.")
+        self.n_row = lens.pop() if len(lens) == 1 else 0
+        self._cache = {}
+
+    @classmethod
+    def from_frame(cls, df, names=None):
+        """Create an object from an index table.
+
+        Args:
+            df (pandas.DataFrame): Index table.
+            names (list of str, optional): Index column names. Defaults to
+                the columns without the ``_`` prefix.
+
+        Returns:
+            HierIndex: Hierarchical index of the table
+        """
+        if names is None:
+            names = [col for col in df.columns if not str(col).startswith("_")]
+        return cls(names, [df[name].to_numpy() for name in names])
+
+    def to_frame(self):
+        """Return the index columns as a table.
+
+        Returns:
+            pandas.DataFrame: Index table without helper columns
+        """
+        return pd.DataFrame(dict(zip(self.names, self.columns)),
+                            columns=self.names)
+
+    def __len__(self):
+        return self.n_row
+
+    def values(self, depth=None):
+        """Return a 2D array of the index columns.
+
+        Args:
+            depth (int, optional): Number of columns from the top depth.
+                Defaults to all columns.
+
+        Returns:
+            numpy.ndarray: Array with the shape of (row number, depth)
+        """
+        if depth is None:
+            depth = len(self.names)
+        if depth == 0:
+            return np.zeros((self.n_row, 0), dtype=np.int32)
+        return np.column_stack(self.columns[:depth])
+
+    def is_sorted(self, depth=None):
+        """Return whether rows are sorted by the columns.
+
+        Rows with missing values are not regarded as sorted.
+
+        Args:
+            depth (int, optional): Number of columns from the top depth.
+                Defaults to all columns.
+
+        Returns:
+            bool: True if rows are sorted in ascending order
+        """
+        if depth is None:
+            depth = len(self.names)
+        key = ("is_sorted", depth)
+        if key not in self._cache:
+            self._cache[key] = check_sorted(self.columns[:depth], self.n_row)
+        return self._cache[key]
+
+    def group_no(self, depth):
+        """Return group numbers of rows grouped by the upper columns.
+
+        Args:
+            depth (int): Number of columns from the top depth to group rows.
+
+        Returns:
+            numpy.ndarray: Group number of each row starting from 0. Rows with
+            missing values are -1. The result is the same as
+            :meth:`pandas.core.groupby.GroupBy.ngroup`.
+        """
+        key = ("group_no", depth)
+        if key not in self._cache:
+            if depth == 0 or self.n_row == 0:
+                group_nos = np.zeros(self.n_row, dtype=np.int64)
+            elif self.is_sorted(depth):
+                starts = self.offsets(depth)[1:-1]
+                is_changed = np.zeros(self.n_row, dtype=np.int64)
+                is_changed[starts] = 1
+                group_nos = np.cumsum(is_changed)
+            else:
+                group_nos = ngroup(self.values(depth))
+            self._cache[key] = group_nos
+        return self._cache[key]
+
+    def offsets(self, depth):
+        """Return row boundaries of consecutive rows with the same values.
+
+        If rows are sorted, the rows of group ``i`` are
+        ``offsets[i]:offsets[i + 1]`` in the same way as the CSR format.
+        Boundaries of a depth include all boundaries of the upper depth.
+
+        Args:
+            depth (int): Number of columns from the top depth.
+
+        Returns:
+            numpy.ndarray: Start rows of runs and the row number at the end
+        """
+        key = ("offsets", depth)
+        if key not in self._cache:
+            if depth == 0 or self.n_row == 0:
+                starts = np.zeros(min(self.n_row, 1), dtype=np.int64)
+            else:
+                if depth == 1:
+                    is_changed = np.zeros(self.n_row - 1, dtype=bool)
+                else:
+                    upper = self.offsets(depth - 1)[1:-1]
+                    is_changed = np.zeros(self.n_row - 1, dtype=bool)
+                    is_changed[upper - 1] = True
+                col = self.columns[depth - 1]
+                is_changed |= col[1:] != col[:-1]
+                starts = np.concatenate(
+                    [[0], np.flatnonzero(is_changed) + 1]).astype(np.int64)
+            self._cache[key] = np.append(starts, self.n_row)
+        return self._cache[key]
+
+    def n_group(self, depth):
+        """Return the number of groups of a depth.
+
+        Args:
+            depth (int): Number of columns from the top depth.
+
+        Returns:
+            int: Number of groups without missing values
+        """
+        group_nos = self.group_no(depth)
+        if len(group_nos) == 0:
+            return 0
+        return int(group_nos.max()) + 1
+
+    def keys(self, depth):
+        """Return index values of each group.
+
+        Args:
+            depth (int): Number of columns from the top depth.
+
+        Returns:
+            numpy.ndarray: Array with the shape of (group number, depth) in
+            the order of group numbers
+        """
+        key = ("keys", depth)
+        if key not in self._cache:
+            if self.is_sorted(depth):
+                firsts = self.offsets(depth)[:-1]
+            else:
+                group_nos = self.group_no(depth)
+                uniques, firsts = np.unique(group_nos, return_index=True)
+                firsts = firsts[uniques >= 0]
+            self._cache[key] = self.values(depth)[firsts]
+        return self._cache[key]
+
+    def split(self, depth):
+        """Return destination numbers to split rows by a depth.
+
+        Args:
+            depth (int): Split depth number.
+
+        Returns:
+            numpy.ndarray: Destination number of each row starting from 1.
+            Rows with missing values are 0.
+        """
+        if depth == 0:
+            return np.ones(self.n_row, dtype=np.int64)
+        return self.group_no(depth) + 1
+
+    def remap(self, depth, dests):
+        """Map group numbers to new destination numbers.
+
+        Args:
+            depth (int): Number of columns from the top depth.
+            dests (array-like): New destination number of each group.
+
+        Returns:
+            numpy.ndarray: Destination number of each row. Rows with missing
+            values are 0.
+        """
+        dests = np.append(np.asarray(dests), 0)  # -1 is the last item
+        return dests[self.group_no(depth)]
+
+    def select(self, depth, group_nos):
+        """Return rows that belong to the selected groups.
+
+        Args:
+            depth (int): Number of columns from the top depth.
+            group_nos (list of int): Group numbers starting from 0.
+
+        Returns:
+            numpy.ndarray: Row positions in ascending order
+        """
+        group_nos = np.unique(np.asarray(group_nos, dtype=np.int64))
+        if self.is_sorted(depth):
+            offsets = self.offsets(depth)
+            group_nos = group_nos[(group_nos >= 0)
+                                  & (group_nos < len(offsets) - 1)]
+            starts = offsets[group_nos]
+            lens = offsets[group_nos + 1] - starts
+            if len(lens) == 0:
+                return np.zeros(0, dtype=np.int64)
+            pos = np.arange(lens.sum()) - np.repeat(np.cumsum(lens) - lens,
+                                                    lens)
+            return np.repeat(starts, lens) + pos
+        return np.flatnonzero(np.isin(self.group_no(depth), group_nos))
+
+    def join(self, other, depth):
+        """Find the group of another index with the same upper values.
+
+        Args:
+            other (HierIndex): Index to search.
+            depth (int): Number of columns from the top depth to compare.
+
+        Returns:
+            numpy.ndarray: Group number of ``other`` for each row. Rows that
+            are not found in ``other`` are -1.
+        """
+        if depth == 0:
+            return np.zeros(self.n_row, dtype=np.int64)
+        keys = other.keys(depth)
+        if len(keys) == 0:
+            return np.full(self.n_row, -1, dtype=np.int64)
+        codes, other_codes = encode(self.values(depth), keys)
+        order = np.argsort(other_codes, kind="stable")
+        sorted_codes = other_codes[order]
+        pos = np.searchsorted(sorted_codes, codes)
+        pos = np.minimum(pos, len(sorted_codes) - 1)
+        return np.where(sorted_codes[pos] == codes, order[pos], -1)
+
+
+def to_index_array(col):
+    """Convert an index column into an int32 array if possible.
+
+    Args:
+        col (array-like): Index column values.
+
+    Returns:
+        numpy.ndarray: int32 array or float array containing missing values
+    """
+    col = np.asarray(col)
+    if col.dtype.kind in "biu":
+        return col.astype(np.int32, copy=False)
+    col = col.astype(float)
+    if np.isnan(col).any() or np.any(col != np.round(col)):
+        return col
+    return col.astype(np.int32)
+
+
+def check_sorted(columns, n_row):
+    """Return whether rows are lexicographically sorted by columns.
+
+    Args:
+        columns (list of numpy.ndarray): Column arrays from the top depth.
+        n_row (int): Number of rows.
+
+    Returns:
+        bool: True if rows are sorted in ascending order without missing
+        values
+    """
+    for col in columns:
+        if col.dtype.kind == "f" and np.isnan(col).any():
+            return False
+    if n_row < 2 or len(columns) == 0:
+        return True
+    # rows are sorted if the first different column increases
+    is_decided = np.zeros(n_row - 1, dtype=bool)
+    for col in columns:
+        diff = col[1:] - col[:-1] if col.dtype.kind == "f" else \
+            col[1:].astype(np.int64) - col[:-1]
+        if np.any((diff < 0) & ~is_decided):
+            return False
+        is_decided |= diff > 0
+    return True
+
+
+def make_group_no(values):
+    """Return group numbers of rows grouped by all columns.
+
+    The result is the same as :meth:`pandas.core.groupby.GroupBy.ngroup`.
+    If rows are sorted by the columns as usual for index tables, groups are
+    found from changes between adjacent rows without sorting.
+
+    Args:
+        values (numpy.ndarray): 2D array of index values.
+
+    Returns:
+        numpy.ndarray: Group number of each row starting from 0. Rows with
+        missing values are -1.
+    """
+    n_col = values.shape[1]
+    return HierIndex(list(range(n_col)),
+                     [values[:, i] for i in range(n_col)]).group_no(n_col)
+
+
+def ngroup(values):
+    """Return group numbers of rows using :mod:`pandas` groupby.
+
+    Args:
+        values (numpy.ndarray): 2D array of index values.
+
+    Returns:
+        numpy.ndarray: Group number of each row starting from 0. Rows with
+        missing values are -1.
+    """
+    df = pd.DataFrame(values)
+    group_nos = df.groupby(list(df.columns)).ngroup()
+    return group_nos.fillna(-1).to_numpy(dtype=np.int64)
+
+
+def encode(values, other_values):
+    """Encode rows of two arrays into comparable int64 codes.
+
+    Args:
+        values (numpy.ndarray): 2D array of index values.
+        other_values (numpy.ndarray): 2D array with the same columns.
+
+    Returns:
+        tuple of numpy.ndarray: Codes of rows of each array. The same rows
+        have the same code.
+    """
+    both = np.concatenate([values, other_values], axis=0)
+    if len(both) == 0:
+        codes = np.zeros(0, dtype=np.int64)
+    elif both.dtype.kind in "iu":
+        mins = both.min(axis=0).astype(np.int64)
+        spans = both.max(axis=0).astype(np.int64) - mins + 1
+        if np.prod(spans.astype(float)) < 2 ** 62:
+            # mixed radix number of each row
+            codes = np.zeros(len(both), dtype=np.int64)
+            for i in range(both.shape[1]):
+                codes = codes * spans[i] + (both[:, i] - mins[i])
+        else:
+            codes = ngroup(both)
+    else:
+        codes = ngroup(both)
+        missing = codes < 0
+        codes[missing] = -1 - np.flatnonzero(missing)  # never match
+    return codes[:len(values)], codes[len(values):]
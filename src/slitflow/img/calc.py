@@ -40,7 +40,7 @@ class MaskArea(Table):
         Returns:
             pandas.DataFrame: Area table
         """
-        img = reqs[0].copy()
+        img = reqs[0]
         areas = []
         for i in range(img.shape[0]):
             areas.append(np.count_nonzero(img[i, :, :]))
@@ -58,7 +58,7 @@ class Black(Image):
         Returns:
             numpy.ndarray: The black image.
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         return np.zeros([len(df), param["img_size"][1],
                          param["img_size"][0]])
 
@@ -111,7 +111,7 @@ class RandomRGB(RGB):
         Returns:
             numpy.ndarray: RGB image
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         n_img = len(df) * 3
         return np.random.randint(0, 255, [n_img, param["img_size"][0],
                                           param["img_size"][1]])
@@ -183,7 +183,7 @@ class CheckerBoard(Image):
         Returns:
             Image: Checkerboard image stack.
         """
-        df = reqs[0].copy()
+        df = reqs[0]
 
         h_img, w_img = param["img_size"]
         h_box, w_box = param["box_size"]
@@ -43,9 +43,9 @@ class Gauss(Image):
         Returns:
             numpy.ndarray: Filtered image array
         """
-        img = reqs[0].copy()
+        img = np.empty_like(reqs[0])
         for i in range(img.shape[0]):
-            x = img[i, :, :]
+            x = reqs[0][i, :, :]
             img[i, :, :] = cv2.GaussianBlur(x, (param["kernel_size"],
                                                 param["kernel_size"]), 0)
         return img
@@ -132,7 +132,7 @@ class DifferenceOfGaussian(Image):
         Returns:
             numpy.ndarray: Filtered image
         """
-        img = reqs[0].copy().astype(np.float32)
+        img = reqs[0].astype(np.float32)
         for i in range(img.shape[0]):
             frm = img[i, :, :]
             blur1 = scipy.ndimage.gaussian_filter(frm, param["dog_sd1"])
@@ -189,7 +189,7 @@ class LocalMax(Image):
             numpy.ndarray: Filtered image
         """
         skimage = importlib.import_module("skimage")
-        img = reqs[0].copy().astype(np.float32)
+        img = reqs[0].astype(np.float32)
         for i in range(img.shape[0]):
             frm = img[i, :, :]
             max_img = scipy.ndimage.maximum_filter(
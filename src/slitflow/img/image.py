@@ -1,11 +1,27 @@
+import os
+import importlib  # for imagecodecs
+
 import numpy as np
 import pandas as pd
 import tifffile as tf
-import psutil
 import cv2
 
 from ..data import Data
 from .. import setindex
+from .. import budget
+from .. import metrics
+from .. import chunk
+from .. import name as nm
+from ..hindex import HierIndex
+
+IMAGE_EXTS = {"tif": ".tif", "chunk": ".chunk"}
+"""dict: File extension of each image format. Chunk folders have the
+``.chunk`` extension."""
+
+TIFF_COMPRESSIONS = {"zlib": 6, "lzw": None, "zstd": 5}
+"""dict: Default level of each lossless compression of tiff files. None
+if the compression has no level. "lzw" and "zstd" require the imagecodecs
+package."""
 
 
 class Image(Data):
@@ -15,27 +31,163 @@ class Image(Data):
     See also :class:`~slitflow.data.Data` for properties and methods.
     Concrete subclass is mainly in :mod:`slitflow.img`.
 
+    Stacks larger than memory can be saved as chunk folders of
+    :mod:`slitflow.chunk` by ``param["image_format"] = "chunk"`` of each
+    task or :attr:`IMAGE_FORMAT` for all tasks. ``param["chunk_shape"]``
+    sets the number of frames of each chunk or [frame, height, width] of
+    each chunk. Only the frames of the rows in
+    :attr:`slitflow.info.Info.load_rows` are read from chunk folders, so
+    that each cycle of :func:`slitflow.setreqs.run_cycle` loads only the
+    chunks required for the cycle.
+
+    Attributes:
+        MEMMAP (bool): Whether uncompressed contiguous tiff files are loaded
+            as memory-mapped arrays. Frames are read from the file when
+            they are used. The file is kept open while the data exist, so
+            that the file can not be overwritten or deleted on Windows
+            until the data are cleared. Defaults to False.
+        IMAGE_FORMAT (str): Default image format of tasks without
+            ``param["image_format"]``. "tif" or "chunk".
+        COMPRESSION (str): Default compression of tiff files of tasks
+            without ``param["compression"]``. One of
+            :data:`TIFF_COMPRESSIONS` or None for uncompressed files.
+            ``param["compression_level"]`` overwrites the default level.
+            Compressed files are not memory-mapped when loaded.
     """
     EXT = ".tif"
+    MEMMAP = False
+    IMAGE_FORMAT = "tif"
+    COMPRESSION = None
 
     def __init__(self, info_path=None):
         super().__init__(info_path)
 
+    def get_ext(self):
+        """Return the file extension of the image format of this data.
+
+        Returns:
+            str: Extension of data files with "."
+        """
+        image_format = self.info.get_param_value("image_format")
+        if image_format is None:
+            return self.EXT
+        return IMAGE_EXTS[image_format]
+
+    def set_format(self, param):
+        """Set the image format from ``param["image_format"]``.
+
+        The compression of tiff files is set from ``param["compression"]``
+        and ``param["compression_level"]``.
+
+        Args:
+            param (dict): Parameters of the task.
+        """
+        image_format = param.get("image_format", self.IMAGE_FORMAT)
+        if image_format not in IMAGE_EXTS:
+            raise Exception("image_format should be one of "
+                            + ", ".join(IMAGE_EXTS) + ".")
+        compression = param.get("compression", self.COMPRESSION)
+        if image_format != "tif" or compression is None:
+            self.info.delete_param("compression")
+            self.info.delete_param("compression_level")
+        elif compression not in TIFF_COMPRESSIONS:
+            raise Exception("compression should be one of "
+                            + ", ".join(TIFF_COMPRESSIONS) + ".")
+        else:
+            self.info.add_param("compression", compression, "str",
+                                "Lossless compression of tiff files")
+            level = param.get("compression_level",
+                              TIFF_COMPRESSIONS[compression])
+            if level is None:
+                self.info.delete_param("compression_level")
+            else:
+                self.info.add_param("compression_level", level, "int",
+                                    "Compression level of tiff files")
+        if image_format == "tif":
+            self.info.delete_param("image_format")
+            self.info.delete_param("chunk_shape")
+            return
+        self.info.add_param("image_format", image_format, "str",
+                            "File format of image stacks")
+        if "chunk_shape" in param:
+            self.info.add_param("chunk_shape", param["chunk_shape"],
+                                "list of int",
+                                "Frame number or shape of each chunk")
+
+    def save(self, clear=True):
+        if self.info.get_param_value("image_format") is None:
+            self.set_format(self.info.get_param_dict())
+        super().save(clear)
+
+    def load_from_file(self):
+        """Load frames of the rows in :attr:`slitflow.info.Info.load_rows`.
+
+        All frames of the selected files are loaded if the images are not
+        saved as chunk folders or ``load_rows`` is None. Otherwise only the
+        frames of the rows in ``load_rows`` are read, and ``_split`` of the
+        other rows in :attr:`slitflow.info.Info.index` is set to 0 in the
+        same way as rows of files that are not loaded. The next
+        :meth:`~slitflow.data.Data.load` resets ``_split`` of all rows.
+        """
+        if self.get_ext() != IMAGE_EXTS["chunk"] or \
+                self.info.load_rows is None or \
+                "_file" not in self.info.index.columns:
+            super().load_from_file()
+            return
+        if not hasattr(self.info, "data_paths"):
+            self.info.data_paths = nm.load_data_paths(self.info,
+                                                      self.get_ext())
+        index = self.info.index
+        is_load = index["_split"].to_numpy() != 0
+        cols = [col for col in self.info.get_column_name("index")
+                if col in self.info.load_rows.columns]
+        if len(cols) > 0:
+            found = HierIndex.from_frame(index, cols).join(
+                HierIndex.from_frame(self.info.load_rows, cols), len(cols))
+            is_load &= found >= 0
+        # frames of each file are in the order of index rows
+        file_nos = index["_file"].to_numpy().astype(int)
+        frame_nos = index.groupby("_file").cumcount().to_numpy()
+        mem = budget.MemoryBudget(self.memory_limit / 100)
+        self.data = []
+        for file_no in np.unique(file_nos[is_load]):
+            store = chunk.ChunkStore(self.info.data_paths[file_no - 1])
+            frames = frame_nos[is_load & (file_nos == file_no)]
+            nbytes = store.get_nbytes(len(frames))
+            mem.check(nbytes)
+            mem.acquire(nbytes)
+            self.data.append(store.read(frames))
+            mem.release(nbytes)
+            mem.acquire(nbytes, held=True)
+            self.info.metrics["bytes_read"] += nbytes
+        self.info.index["_split"] = np.where(is_load, index["_split"], 0)
+        self.split(self.info.load_split_depth)
+        self.keep_data()
+
     def load_data(self, path):
         """Load tiff file as :class:`numpy.ndarray`.
+
+        If :attr:`MEMMAP` is True and the image data are memory-mappable,
+        the stack is a read-only view of :class:`numpy.memmap` flipped
+        upside down without copying. Writing into the stack does not change
+        the file because the file is mapped in the copy-on-write mode.
         """
-        stacks = []
-        with tf.TiffFile(path, mode="r+b") as tif:
-            img = tif.pages[0].asarray()
-            total_page = len(tif.pages)
-            stack = np.zeros([total_page, img.shape[0], img.shape[1]],
-                             dtype=img.dtype)
-            for i in np.arange(0, total_page):
-                if psutil.virtual_memory().percent > self.memory_limit:
-                    raise Exception("Memory usage limit reached.")
-                stack[i, :, :] = np.flipud(tif.pages[i].asarray())
-            stacks.append(stack)
-        return np.concatenate(stacks, axis=0)
+        if os.path.splitext(path)[1] == IMAGE_EXTS["chunk"]:
+            store = chunk.ChunkStore(path)
+            budget.MemoryBudget(self.memory_limit / 100).check(
+                store.get_nbytes())
+            return store.read()
+        if self.MEMMAP:
+            stack = memmap_tiff(path)
+            if stack is not None:
+                return stack[:, ::-1, :]
+        with tf.TiffFile(path) as tif:
+            n_page = len(tif.pages)
+            shape = [n_page] + list(tif.pages[0].shape)
+            budget.MemoryBudget(self.memory_limit / 100).check(
+                budget.get_array_nbytes(shape, tif.pages[0].dtype))
+            stack = tif.asarray(key=range(n_page)).reshape(shape)
+        return stack[:, ::-1, :]
 
     def save_data(self, stack, path):
         """Save :class:`numpy.ndarray` data into tiff file.
@@ -47,50 +199,59 @@ class Image(Data):
         col_dict = self.info.get_column_type()
         stack = stack.astype(col_dict[col_name[0]])
 
-        with tf.TiffWriter(path) as tif:
-            for i in np.arange(0, stack.shape[0]):
-                tif.write(np.flipud(stack[i, :, :]),
-                          photometric="minisblack",
-                          contiguous=True, description="",
-                          resolution=(1, 1))
+        if os.path.splitext(path)[1] == IMAGE_EXTS["chunk"]:
+            chunk.save_chunks(path, stack,
+                              self.info.get_param_value("chunk_shape"))
+            return
+        write_tiff(path, stack[:, ::-1, :], "minisblack", (1, 1), "",
+                   self.info.get_param_value("compression"),
+                   self.info.get_param_value("compression_level"),
+                   self.n_worker)
 
     def split_data(self):
         """Splits the list of 3D np.array based on the index DataFrame.
-        """
-
-        index = self.info.index.copy()
-        data_concat = np.concatenate(self.data, axis=0)
 
-        # Adjust the data type of the data_concat
+        Stacks are not concatenated. Each destination is a view of the
+        source stack if its frames are continuous in one stack; otherwise
+        only the frames of the destination are copied by
+        :func:`take_frames`. The data type is converted only if it differs
+        from the column type.
+        """
+        index = self.info.index
         col_name = self.info.get_column_name(type="col")
         col_dict = self.info.get_column_type()
-        data_concat = data_concat.astype(col_dict[col_name[0]])
+        dtype = np.dtype(col_dict[col_name[0]])
 
-        # Transform the index DataFrame by creating and merging "_pos" column
+        # Frame position of each index row in the concatenated stacks.
+        # Rows of the same index values share the same frame.
         index_cols = [
             col for col in index.columns if col not in ["_split", "_dest"]]
-        index_concat = index.loc[index["_split"] != 0, index_cols + ["_split"]]
-        index_concat.drop_duplicates(inplace=True)
-        index_concat["_pos"] = np.arange(len(index_concat)) + 1
-        index = pd.merge(index, index_concat,
-                         on=index_cols + ["_split"], how="left")
-        index["_pos"] = index["_pos"].fillna(0).astype(int)
+        is_split = index["_split"].to_numpy() != 0
+        pos = np.zeros(len(index), dtype=np.int64)
+        if np.any(is_split):
+            pos[is_split] = index.loc[is_split].groupby(
+                index_cols + ["_split"], sort=False, dropna=False).ngroup()
+        offsets = np.cumsum([0] + [len(stack) for stack in self.data])
+
+        # Rows of each dest in the order of the index
+        dests = index["_dest"].to_numpy()
+        order = np.argsort(dests, kind="stable")
+        unique_dests, starts = np.unique(dests[order], return_index=True)
+        stops = np.append(starts[1:], len(order))
 
         # Sort unique dest values by absolute values and filter out zeros
-        unique_dests = sorted(
-            [dest for dest in index['_dest'].unique() if dest != 0], key=abs)
-
-        # Split the data based on the unique dest values
+        firsts = order[starts]
         data_list = []
-        for dest in unique_dests:
-            if dest < 0:
+        for i in sorted(np.flatnonzero(unique_dests != 0),
+                        key=lambda i: (abs(unique_dests[i]), firsts[i])):
+            if unique_dests[i] < 0:
                 data_list.append(None)
-            else:
-                dest_pos = index[index["_dest"] == dest]["_pos"].values
-                filtered_data = data_concat[dest_pos - 1]
-                combined_data = np.concatenate(
-                    [arr[np.newaxis] for arr in filtered_data], axis=0)
-                data_list.append(combined_data.astype(data_concat.dtype))
+                continue
+            stack = take_frames(self.data, offsets,
+                                pos[order[starts[i]:stops[i]]])
+            if stack.dtype != dtype:
+                stack = stack.astype(dtype)
+            data_list.append(stack)
 
         self.data = data_list
 
@@ -119,6 +280,100 @@ class Image(Data):
         return img.astype(stack.dtype)
 
 
+def memmap_tiff(path):
+    """Return a memory-mapped stack of a tiff file.
+
+    Args:
+        path (str): Path to the tiff file.
+
+    Returns:
+        numpy.memmap: Array with the shape of (page, height, width) as saved
+        in the file. None if the image data are compressed or not
+        contiguous.
+    """
+    with tf.TiffFile(path) as tif:
+        series = tif.series[0]
+        if series.dataoffset is None or \
+                len(series.pages) != len(tif.pages) or series.ndim > 3:
+            return None
+        offset = series.dataoffset
+        shape = series.shape
+        dtype = series.dtype
+    if len(shape) == 2:
+        shape = (1,) + shape
+    return np.memmap(path, dtype=dtype, mode="c", offset=offset,
+                     shape=shape)
+
+
+def write_tiff(path, stack, photometric, resolution, description,
+               compression=None, level=None, max_workers=None):
+    """Write a whole stack into a tiff file at once.
+
+    Each image of the stack is saved as a page. Pages of compressed files
+    are encoded by multiple threads.
+
+    Args:
+        path (str): Path to the tiff file.
+        stack (numpy.ndarray): Array with the shape of (page, height, width)
+            or (page, height, width, 3) for RGB images.
+        photometric (str): "minisblack" or "rgb".
+        resolution (tuple of float): Pixels per unit of x and y.
+        description (str): Image description of the file.
+        compression (str, optional): One of :data:`TIFF_COMPRESSIONS`.
+            Defaults to uncompressed.
+        level (int, optional): Compression level. Defaults to the default
+            level of the compression.
+        max_workers (int, optional): Number of encoding threads.
+    """
+    kwargs = {}
+    if compression is not None:
+        try:
+            importlib.import_module("imagecodecs")
+            kwargs["predictor"] = True
+        except ModuleNotFoundError:
+            if compression != "zlib":
+                raise
+            # the floating point predictor is implemented only in imagecodecs
+            kwargs["predictor"] = bool(np.issubdtype(stack.dtype, np.integer))
+        kwargs["compression"] = compression
+        if level is not None:
+            kwargs["compressionargs"] = {"level": int(level)}
+        kwargs["maxworkers"] = max_workers
+    with tf.TiffWriter(path) as tif:
+        tif.write(stack, photometric=photometric, contiguous=True,
+                  description=description, resolution=resolution,
+                  metadata=None, **kwargs)
+
+
+def take_frames(stacks, offsets, positions):
+    """Return frames of a list of stacks as one stack.
+
+    Args:
+        stacks (list of numpy.ndarray): Stacks with the shape of (frame,
+            height, width).
+        offsets (numpy.ndarray): Position of the first frame of each stack
+            in the concatenated stacks with the total frame number at last.
+        positions (numpy.ndarray): Frame positions to take in the
+            concatenated stacks.
+
+    Returns:
+        numpy.ndarray: View of a source stack if the frames are continuous
+        in one stack, otherwise a new stack of the frames
+    """
+    stack_nos = np.searchsorted(offsets, positions, side="right") - 1
+    # continuous frames of the same stack are taken as a slice
+    breaks = np.flatnonzero((np.diff(positions) != 1)
+                            | (np.diff(stack_nos) != 0)) + 1
+    slices = []
+    for run in np.split(np.arange(len(positions)), breaks):
+        stack_no = stack_nos[run[0]]
+        start = positions[run[0]] - offsets[stack_no]
+        slices.append(stacks[stack_no][start:start + len(run)])
+    if len(slices) == 1:
+        return slices[0]
+    return np.concatenate(slices, axis=0)
+
+
 def set_img_size(self):
     """Set the image size to the param info in pixel.
 
@@ -146,16 +401,18 @@ class RGB(Image):
     def load_data(self, path):
         """Load tiff file as :class:`numpy.ndarray`.
         """
+        if os.path.splitext(path)[1] == IMAGE_EXTS["chunk"]:
+            return super().load_data(path)
         stacks = []
         with tf.TiffFile(path, mode="r+b") as tif:
             img = tif.pages[0].asarray()
             total_page = len(tif.pages)
-            stack = np.zeros([total_page * 3, img.shape[0], img.shape[1]],
-                             dtype=img.dtype)
+            shape = [total_page * 3, img.shape[0], img.shape[1]]
+            budget.MemoryBudget(self.memory_limit / 100).check(
+                budget.get_array_nbytes(shape, img.dtype))
+            stack = np.zeros(shape, dtype=img.dtype)
             cnt = 0
             for i in np.arange(0, total_page):
-                if psutil.virtual_memory().percent > self.memory_limit:
-                    raise Exception("Memory usage limit reached.")
                 rgb = tif.pages[i].asarray()
                 stack[cnt, :, :] = np.flipud(rgb[:, :, 0])
                 cnt += 1
@@ -172,6 +429,10 @@ class RGB(Image):
         if stack.size == 0:
             return
 
+        if os.path.splitext(path)[1] == IMAGE_EXTS["chunk"]:
+            super().save_data(stack, path)
+            return
+
         col_name = self.info.get_column_name(type="col")
         col_dict = self.info.get_column_type()
         stack = stack.astype(col_dict[col_name[0]])
@@ -180,21 +441,13 @@ class RGB(Image):
             pitch = 1 / self.info.get_param_value("pitch")
         else:
             pitch = 1
-        with tf.TiffWriter(path) as tif:
-            for i in np.arange(0, stack.shape[0] / 3):
-                img_r = stack[int(3 * i), :, :]
-                img_g = stack[int(3 * i + 1), :, :]
-                img_b = stack[int(3 * i + 2), :, :]
-                rgb = np.zeros([img_r.shape[0], img_r.shape[1], 3])
-                rgb[:, :, 0] = np.flipud(img_r)
-                rgb[:, :, 1] = np.flipud(img_g)
-                rgb[:, :, 2] = np.flipud(img_b)
-                rgb = rgb.astype(stack.dtype)
-                tif.write(rgb,
-                          photometric="rgb",
-                          contiguous=True,
-                          description="Created by Slitflow",
-                          resolution=(pitch, pitch))
+        # (color * page, height, width) to (page, height, width, color)
+        rgb = stack.reshape(-1, 3, stack.shape[1], stack.shape[2])
+        rgb = rgb[:, :, ::-1, :].transpose(0, 2, 3, 1)
+        write_tiff(path, rgb, "rgb", (pitch, pitch), "Created by Slitflow",
+                   self.info.get_param_value("compression"),
+                   self.info.get_param_value("compression_level"),
+                   self.n_worker)
 
     def set_index(self):
         """How to get :attr:`slitflow.info.Info.index`.
@@ -57,9 +57,7 @@ class Gray(image.Image):
             numpy.ndarray: Montage image
         """
         util = importlib.import_module("skimage.util")
-        img = reqs[0].copy()
-        for i in range(img.shape[0]):
-            img[i, :, :] = np.flipud(img[i, :, :])
+        img = reqs[0][:, ::-1, :]
         mtg = util.montage(img, grid_shape=param["grid_shape"],
                            padding_width=param["padding_width"], fill=0)
         mtg = np.flipud(mtg)
@@ -130,7 +128,7 @@ class RGB(image.RGB):
             numpy.ndarray: Montage image
         """
         util = importlib.import_module("skimage.util")
-        img = reqs[0].copy()
+        img = reqs[0]
         rgbs = []
         for i in range(int(img.shape[0] / 3)):
             rgb = np.zeros((img.shape[1], img.shape[2], 3))
@@ -57,7 +57,7 @@ class Gauss(Image):
         Returns:
             numpy.ndarray: The image with Gaussian noise.
         """
-        img = reqs[0].copy()
+        img = reqs[0]
         noise = np.frompyfunc(gauss_noise, 3, 1)
         return noise(img, param["sigma"], param["baseline"]).\
             astype(param["type"])
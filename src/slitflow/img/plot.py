@@ -76,7 +76,7 @@ class Gauss2D(Image):
             numpy.ndarray: Reconstructed image stack
         """
 
-        df = reqs[0].copy()
+        df = reqs[0]
         width_unit = param["img_size"][0]
         width = np.floor(width_unit).astype(np.int32)
         height_unit = param["img_size"][1]
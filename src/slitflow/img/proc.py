@@ -75,8 +75,8 @@ class SelectParam(Image):
             Table: Selected Table.
         """
 
-        df_mask = MaskFromParam.process([reqs[1].copy()], param)
-        img = reqs[0].copy()
+        df_mask = MaskFromParam.process([reqs[1]], param)
+        img = reqs[0]
         to_sel = df_mask[param["mask_col"]].values.astype(bool)
         img = img[to_sel, :, :]
 
@@ -4,9 +4,20 @@ import pandas as pd
 import json
 import os
 import datetime
+import hashlib
 
-from .fun.misc import reduce_list as rl
 from . import __version__
+from . import metrics
+from . import hindex
+from . import catalog
+
+NPY_MAGIC = b"\x93NUMPY"
+"""bytes: Magic string at the head of binary index files."""
+
+FORMAT_PARAMS = ["table_format", "float_precision", "image_format",
+                 "chunk_shape", "compression", "compression_level"]
+"""list of str: Parameters of the file format of each data. These parameters
+are not copied from required data unless the names are specified."""
 
 
 class Info():
@@ -28,10 +39,25 @@ class Info():
             with an extension of ``.sf``,
             including column, param, and meta dictionaries.
         index (pandas.DataFrame): Index table to describe the data
-            hierarchy.
+            hierarchy. The index file is loaded when this property is
+            accessed for the first time.
         file_nos (list of int): List of split file numbers.
         load_split_depth (int): Split depth number for loading data.
         data_split_depth (int): Split depth number to split the data property.
+        load_columns (list of str): Column names to load from data files. All
+            columns are loaded if None. See
+            :meth:`slitflow.data.Data.get_req_columns`.
+        load_rows (pandas.DataFrame): Index rows to load. This table is
+            set by :func:`slitflow.setreqs.run_cycle` while loading each
+            cycle and reset to None after loading. Data classes that can
+            read a part of a file such as :class:`~slitflow.img.image.Image`
+            saved as chunk folders load only these rows. All rows of the
+            files are loaded if None.
+        fingerprint (str): Hash string of the task that created this data.
+            This value is saved in :attr:`meta` and used by
+            :class:`~slitflow.manager.Pipeline` to skip up-to-date tasks.
+        metrics (dict): Time and memory usage of each step measured by
+            :mod:`slitflow.metrics`. This value is saved in :attr:`meta`.
 
     """
 
@@ -52,6 +78,23 @@ class Info():
         self.load()
         self.load_split_depth = None
         self.data_split_depth = None
+        self.load_columns = None
+        self.load_rows = None
+        self.fingerprint = None
+        self.metrics = metrics.init_metrics()
+
+    @property
+    def index(self):
+        if self._index_to_load:
+            self._index_to_load = False
+            self.load_index()
+        return self._index
+
+    @index.setter
+    def index(self, index):
+        self._index_to_load = False
+        self._index = index
+        self._hindex_cache = (None, {})
 
     def __str__(self):
         info_str = "Data: " + fullname(self.Data)
@@ -94,7 +137,7 @@ class Info():
                 self.meta = info["meta"]
                 self.column = info["column"]
                 self.param = info["param"]
-                self.load_index()
+                self._index_to_load = True
         else:
             pass
 
@@ -103,28 +146,42 @@ class Info():
 
         Info object should have the :attr:`path` attribute. See
         :meth:`~slitflow.info.Info.save_index()` docstring for the
-        index file format.
+        index file format. Both binary and CSV index files can be loaded.
 
         """
         index_path = self.path + "x"
         if os.path.exists(index_path):
             if os.stat(index_path).st_size == 0:
                 return  # sfx of split_depth=0
-            df = pd.read_csv(index_path, header=None)\
-                .fillna(method="ffill").astype(np.int32)
-            df.columns = self.get_column_name("index")
-            if "_split" in self.index.columns:
-                self.index.drop(columns=["_split"], inplace=True)
-            if "_file" in self.index.columns:
-                self.index.drop(columns=["_file"], inplace=True)
-            self.index = pd.concat([self.index, df]).drop_duplicates()
+            with open(index_path, "rb") as f:
+                is_npy = f.read(len(NPY_MAGIC)) == NPY_MAGIC
+            if is_npy:
+                idx = np.load(index_path)
+                df = pd.DataFrame(idx, columns=self.get_column_name("index"))
+            else:
+                df = pd.read_csv(index_path, header=None)\
+                    .fillna(method="ffill").astype(np.int32)
+                df.columns = self.get_column_name("index")
+            index = self._index
+            if "_split" in index.columns:
+                index.drop(columns=["_split"], inplace=True)
+            if "_file" in index.columns:
+                index.drop(columns=["_file"], inplace=True)
+            if len(index) == 0:
+                self.index = df.drop_duplicates()
+            else:
+                self.index = pd.concat([index, df]).drop_duplicates()
             self.set_index_file_no()
 
     def save_index(self, load_index=True):
         """Update index information file.
 
-        The file size is reduced by excluding duplicate higher-level
-        hierarchical numbers as follows:
+        The index file is saved in the format of
+        :data:`slitflow.data.Data.INDEX_FORMAT`.
+
+        * ``csv`` : Text file. This is the default format. The file size is
+          reduced by excluding duplicate higher-level hierarchical numbers
+          as follows:
 
         .. code-block:: python
 
@@ -133,6 +190,11 @@ class Info():
                  1      2  ->  ,2
                  1      3      ,3
 
+        * ``npy`` : :mod:`numpy` binary file of an int32 array with the
+          shape of (row number, index column number). The file is read
+          without parsing text, but the whole index is loaded into memory in
+          the same way as the CSV format.
+
         .. caution::
 
             This method updates rather than overwrites existing index files.
@@ -143,13 +205,17 @@ class Info():
         if load_index:
             self.load_index()
         index_path = self.path + "x"
-        index = self.index.copy()
-        for col in index.columns:
-            if col not in self.get_column_name("index"):
-                index.drop(columns=[col], inplace=True)
+        index_names = [col for col in self.index.columns
+                       if col in self.get_column_name("index")]
+        idx = self.index[index_names].to_numpy()
+
+        if self.Data.INDEX_FORMAT == "npy":
+            with open(index_path, mode="wb") as f:
+                if idx.size > 0:  # empty file for split_depth=0
+                    np.save(f, np.ascontiguousarray(idx, dtype=np.int32))
+            return
 
         # size reducing code
-        idx = index.to_numpy()
         to_sel = idx[:-1, :] == idx[1:, :]
         to_sel = np.cumprod(to_sel.astype(np.int8), axis=1).astype(np.bool8)
         to_sel = np.insert(to_sel, 0, False, axis=0)
@@ -168,6 +234,9 @@ class Info():
 
     def set_index_file_no(self):
         """Add file number column to the index table according to split depth.
+
+        Rows are sorted by the file number in the same way as
+        :meth:`pandas.DataFrame.groupby`.
         """
         if "_file" in self.index.columns:
             if not self.index['_file'].isna().any():
@@ -176,14 +245,58 @@ class Info():
         if len(self.index) == 0:
             return
         elif self.split_depth() > 0:
-            grouped = self.index.groupby(rl(index_names[:self.split_depth()]))
-            dfs = list(list(zip(*grouped))[1])
-            for i, df in enumerate(dfs):
-                df["_file"] = i + 1
-            self.index = pd.concat(dfs)
+            file_nos = self.get_group_no(index_names[:self.split_depth()])
+            if np.any(file_nos[1:] < file_nos[:-1]) or file_nos[0] < 0:
+                order = np.argsort(file_nos, kind="stable")
+                order = order[file_nos[order] >= 0]
+                self.index = self.index.iloc[order].copy()
+                file_nos = file_nos[order]
+            self.index["_file"] = file_nos + 1
         else:
             self.index["_file"] = 1
 
+    def get_hindex(self, names=None):
+        """Return the index table as a :class:`~slitflow.hindex.HierIndex`.
+
+        The object is cached until a new index table is set to
+        :attr:`index`, so that group numbers and boundaries are computed only
+        once for the same table.
+
+        Args:
+            names (list of str, optional): Index column names from the top
+                depth. Defaults to all index columns in the table.
+
+        Returns:
+            HierIndex: Hierarchical index of the table
+        """
+        index = self.index
+        if names is None:
+            names = [name for name in self.get_column_name("index")
+                     if name in index.columns]
+        cache_index, cache = self._hindex_cache
+        if cache_index is not index:
+            cache = {}
+            self._hindex_cache = (index, cache)
+        key = (tuple(names), len(index))
+        if key not in cache:
+            cache[key] = hindex.HierIndex.from_frame(index, names)
+        return cache[key]
+
+    def get_group_no(self, names):
+        """Return group numbers of the index table rows.
+
+        The result is the same as :meth:`pandas.core.groupby.GroupBy.ngroup`
+        of the index table grouped by the columns.
+
+        Args:
+            names (list of str): Index column names to group rows.
+
+        Returns:
+            numpy.ndarray: Group number of each row starting from 0. Rows
+            with missing values are -1.
+        """
+        return self.get_hindex(names).group_no(len(names))
+
     def set_file_nos(self, file_nos):
         if file_nos is None:
             if "_file" not in self.index.columns:
@@ -197,23 +310,34 @@ class Info():
         if len(self.index) == 0:
             return [1]  # In case of no index
         else:
-            return self.index.loc[self.index["_split"] != 0, "_file"]\
-                .unique().tolist()
+            is_split = self.index["_split"].to_numpy() != 0
+            return pd.unique(
+                self.index["_file"].to_numpy()[is_split]).tolist()
 
     def file_index(self):
         """Return index table of current file number.
 
+        .. caution::
+
+            If all files are selected, :attr:`index` itself is returned
+            without copying. Please copy the table before modifying it.
+
         Returns:
             pandas.DataFrame: Index table of current split file
         """
         self.set_index_file_no()
-        index = self.index.copy()
+        index = self.index
         if not hasattr(self, "file_nos"):
             self.set_file_nos(None)
         file_nos = self.file_nos()
         if "_file" not in index.columns:
+            index = index.copy()
             index["_file"] = 1
-        return index[index["_file"].isin(file_nos)]
+            return index
+        mask = index["_file"].isin(file_nos).to_numpy()
+        if mask.all():
+            return index
+        return index[mask]
 
     def save(self, info_path=None):
         """Save data information as a JSON file.
@@ -227,6 +351,8 @@ class Info():
         self.save_index()
         with open(self.path, "w") as f:
             json.dump(self.get_dict(), f, indent=2)
+        catalog.add(self.path)
+        catalog.add(self.path + "x")
 
     def split(self, split_depth=None):
         """Add a _split column to the index table.
@@ -260,12 +386,11 @@ class Info():
 
         if split_depth == 0:
             self.index["_dest"] = 1
-        elif split_depth == 1:
-            self.index["_dest"] = self.index.groupby(
-                index_names[0]).ngroup() + 1
         else:
-            self.index["_dest"] = self.index.groupby(
-                index_names[:split_depth]).ngroup() + 1
+            dest = self.get_group_no(index_names[:split_depth]) + 1
+            if dest.min() == 0:
+                dest = np.where(dest == 0, np.nan, dest)  # missing values
+            self.index["_dest"] = dest
 
         self.index.loc[self.index["_split"] == 0, "_dest"] = 0
 
@@ -528,10 +653,13 @@ class Info():
         Args:
             req_no (int, optional): Index of required data list. Defaults to 0.
             names (list of str, optional): Parameter names to copy from req.
-                All parameters are copied if None. Defaults to None.
+                All parameters except :data:`FORMAT_PARAMS` are copied if
+                None. Defaults to None.
         """
         if names is None:
-            names = self.Data.reqs[req_no].info.get_param_names()
+            names = [name for name
+                     in self.Data.reqs[req_no].info.get_param_names()
+                     if name not in FORMAT_PARAMS]
         for name in names:
             param_dict = self.Data.reqs[req_no].info.get_param_dict(name)
             self.add_param(param_dict["name"], param_dict["value"],
@@ -698,11 +826,16 @@ class Info():
             for i, req in enumerate(self.Data.reqs):
                 if len(req.info.meta) > 0:
                     req.info.meta["reqs"] = {}
+                    req.info.meta.pop("metrics", None)
                 reqs_dict["req_" + str(i)] = req.info.get_dict()
         now = datetime.datetime.now().strftime("%Y/%m/%d %H:%M:%S")
         dict = {"version": __version__, "class": fullname(self.Data),
                 "description": self.Data.__class__.__doc__.splitlines()[0],
                 "datetime": now, "path": self.path, "reqs": reqs_dict}
+        if self.fingerprint is not None:
+            dict["fingerprint"] = self.fingerprint
+        if len(self.metrics["steps"]) > 0:
+            dict["metrics"] = self.metrics
         self.meta = dict
 
     def to_json(self):
@@ -726,23 +859,21 @@ class Info():
         This id is used in split file names.
 
         Returns:
-            list of str: List of depth id string. The id format is
-            "D[depth 1 value]D[depth 2 value]...".
+            list of str: List of depth id string sorted by the depth values.
+            The id format is "D[depth 1 value]D[depth 2 value]...".
 
         """
 
         if self.split_depth() == 0:
             return None
-        else:
-            df = self.file_index().iloc[:, :self.split_depth()]
-            numbers = df.drop_duplicates().values
-            depth_ids = []
-            for vals in numbers:
-                depth_id = ""
-                for val in vals:
-                    depth_id = depth_id + "D" + str(int(val))
-                depth_ids.append(depth_id)
-        return depth_ids
+        index = self.file_index()
+        names = index.columns[:self.split_depth()].tolist()
+        keys = hindex.HierIndex.from_frame(index, names).keys(len(names))
+        numbers = keys.astype(np.int64).astype(str)
+        depth_ids = pd.Series([""] * len(numbers), dtype=object)
+        for i in range(numbers.shape[1]):
+            depth_ids = depth_ids + "D" + numbers[:, i]
+        return depth_ids.tolist()
 
     def rename_class_name(self, new_name):
         """Rename class name in meta data and save info.
@@ -755,6 +886,27 @@ class Info():
             json.dump(self.get_dict(), f, indent=2)
 
 
+def make_fingerprint(class_name, param, reqs_fingerprint):
+    """Return a hash string that identifies a task result.
+
+    The fingerprint is made from the class name, the parameter dictionary,
+    the slitflow version and the fingerprints of the required data. If any of
+    them changes, the fingerprint also changes.
+
+    Args:
+        class_name (str): :func:`eval()` executable class name string.
+        param (dict): Parameter dictionary of the task.
+        reqs_fingerprint (list): List of fingerprint items of required data.
+
+    Returns:
+        str: SHA-256 hex digest string
+    """
+    src = json.dumps({"class": class_name, "param": param,
+                      "version": __version__, "reqs": reqs_fingerprint},
+                     sort_keys=True, default=str)
+    return hashlib.sha256(src.encode("utf-8")).hexdigest()
+
+
 def fullname(o):
     """Returns full name of object.
 
@@ -56,7 +56,7 @@ class LocalMax2Xy(Table):
             pandas.DataFrame: X,Y-coordinate of local max pixels
 
         """
-        img = reqs[0].copy()
+        img = reqs[0]
         if img.shape[0] != 1:
             raise Exception(
                 "Input image should be split into a single frame image.")
@@ -162,7 +162,7 @@ class LocalMax2XyWithDoG(Table):
         Returns:
             pandas.DataFrame: X,Y-coordinate of local max pixels
         """
-        img = reqs[0].copy()
+        img = reqs[0]
         img = DifferenceOfGaussian.process(reqs, param)
         img = LocalMax.process([img], param)
         df = LocalMax2Xy.process([img], param)
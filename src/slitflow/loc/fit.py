@@ -91,63 +91,88 @@ class Gauss2D(Table):
         Returns:
             Table: Refined X,Y-coordinate
         """
-        img = reqs[0].copy()
-        df = reqs[1].copy()
+        img = reqs[0]
+        df = reqs[1]
         df = df[param["use_cols"]]
         if img.shape[0] != 1:
             raise Exception(
                 "Input image should be split into a single frame image.")
-        frm = img[0, :, :]
-        xs_ref = df[param["calc_cols"][0]].values
-        ys_ref = df[param["calc_cols"][1]].values
-
-        xs_ref = xs_ref / param["pitch"]
-        ys_ref = ys_ref / param["pitch"]
-
-        vals = np.empty((0, 12), np.float64)
-        for x_ref, y_ref in zip(xs_ref, ys_ref):
-            x_raw_pos = int(np.floor(x_ref))
-            y_raw_pos = int(np.floor(y_ref))
-
-            clip_left = x_raw_pos - param["half_width"]
-            clip_right = x_raw_pos + param["half_width"] + 1
-            clip_bottom = y_raw_pos - param["half_width"]
-            clip_top = y_raw_pos + param["half_width"] + 1
-
-            to_x = (0 <= clip_left) & (clip_right <= frm.shape[1])
-            to_y = (0 <= clip_bottom) & (clip_top <= frm.shape[0])
-            if to_x & to_y:
-                clip = frm[clip_bottom:clip_top,
-                           clip_left:clip_right]
-                res = np.array(fit_gauss_2d(clip, param["half_width"]))
-                x_fit = res[2] + 0.5 + x_raw_pos - param["half_width"]
-                y_fit = res[1] + 0.5 + y_raw_pos - param["half_width"]
-                res[2] = x_fit
-                res[1] = y_fit
-                vals = np.append(vals, [res], axis=0)
-            else:
-                vals = np.append(vals, [np.zeros(12)], axis=0)
-        vals = vals.T
-
-        vals[1] = vals[1] * param["pitch"]
-        vals[2] = vals[2] * param["pitch"]
-        vals[3] = vals[3] * param["pitch"]
-        vals[6] = vals[6] * param["pitch"]
-        vals[7] = vals[7] * param["pitch"]
-        vals[8] = vals[8] * param["pitch"]
-
-        df_val = pd.DataFrame(
-            {param["calc_cols"][0]: vals[2],
-             param["calc_cols"][1]: vals[1], "amp": vals[0],
-             "sigma": vals[3], "back": vals[4], "se_amp": vals[5],
-             "se_x": vals[7], "se_y": vals[6], "se_sigma": vals[8],
-             "se_back": vals[9], "rmsr": vals[10], "rsqr": vals[11]})
-
-        df_index = df.drop(param["calc_cols"], axis=1)
-        df_index = df_index.reset_index(drop=True)
-        df_val = df_val.reset_index(drop=True)
-        df_new = pd.concat([df_index, df_val], axis=1)
-        return df_new
+        vals = fit_frame(img[0, :, :], df, param)
+        return make_fit_table(df, vals, param)
+
+
+def fit_frame(frm, df, param):
+    """Fit all spots in a frame with 2D Gaussian distribution.
+
+    Args:
+        frm (numpy.ndarray): Two-dimensional frame image.
+        df (pandas.DataFrame): Roughly predicted X,Y-coordinate.
+        param (dict): Parameters of :meth:`Gauss2D.process`.
+
+    Returns:
+        numpy.ndarray: Result of :func:`fit_gauss_2d` of each spot in pixel
+        with the shape of (spots, 12). Spots near the edge are zero.
+    """
+    xs_ref = df[param["calc_cols"][0]].values / param["pitch"]
+    ys_ref = df[param["calc_cols"][1]].values / param["pitch"]
+
+    vals = np.zeros((len(xs_ref), 12), np.float64)
+    for i, (x_ref, y_ref) in enumerate(zip(xs_ref, ys_ref)):
+        x_raw_pos = int(np.floor(x_ref))
+        y_raw_pos = int(np.floor(y_ref))
+
+        clip_left = x_raw_pos - param["half_width"]
+        clip_right = x_raw_pos + param["half_width"] + 1
+        clip_bottom = y_raw_pos - param["half_width"]
+        clip_top = y_raw_pos + param["half_width"] + 1
+
+        to_x = (0 <= clip_left) & (clip_right <= frm.shape[1])
+        to_y = (0 <= clip_bottom) & (clip_top <= frm.shape[0])
+        if to_x & to_y:
+            clip = frm[clip_bottom:clip_top,
+                       clip_left:clip_right]
+            res = np.array(fit_gauss_2d(clip, param["half_width"]))
+            x_fit = res[2] + 0.5 + x_raw_pos - param["half_width"]
+            y_fit = res[1] + 0.5 + y_raw_pos - param["half_width"]
+            res[2] = x_fit
+            res[1] = y_fit
+            vals[i] = res
+    return vals
+
+
+def make_fit_table(df, vals, param):
+    """Convert fitting results into the result table of :class:`Gauss2D`.
+
+    Args:
+        df (pandas.DataFrame): Roughly predicted X,Y-coordinate with
+            ``use_cols``.
+        vals (numpy.ndarray): Results of :func:`fit_frame`.
+        param (dict): Parameters of :meth:`Gauss2D.process`.
+
+    Returns:
+        pandas.DataFrame: Refined X,Y-coordinate
+    """
+    vals = vals.T.copy()
+
+    vals[1] = vals[1] * param["pitch"]
+    vals[2] = vals[2] * param["pitch"]
+    vals[3] = vals[3] * param["pitch"]
+    vals[6] = vals[6] * param["pitch"]
+    vals[7] = vals[7] * param["pitch"]
+    vals[8] = vals[8] * param["pitch"]
+
+    df_val = pd.DataFrame(
+        {param["calc_cols"][0]: vals[2],
+         param["calc_cols"][1]: vals[1], "amp": vals[0],
+         "sigma": vals[3], "back": vals[4], "se_amp": vals[5],
+         "se_x": vals[7], "se_y": vals[6], "se_sigma": vals[8],
+         "se_back": vals[9], "rmsr": vals[10], "rsqr": vals[11]})
+
+    df_index = df.drop(param["calc_cols"], axis=1)
+    df_index = df_index.reset_index(drop=True)
+    df_val = df_val.reset_index(drop=True)
+    df_new = pd.concat([df_index, df_val], axis=1)
+    return df_new
 
 
 def fit_gauss_2d(clip, half_width):
@@ -74,8 +74,8 @@ class Value(Table):
         Returns:
             pandas.DataFrame: Table containing mask value column
         """
-        df = reqs[0].copy()
-        img = reqs[1].copy()
+        df = reqs[0].copy(deep=False)
+        img = reqs[1]
         if img.shape[0] > 1:
             raise Exception("Image must be split into single frames.")
         frm = img[0, :, :]
@@ -96,6 +96,53 @@ class Value(Table):
         df = df.drop(del_cols, axis=1)
         return df
 
+    @ staticmethod
+    def process_batch(reqs_list, param):
+        """Create mask value column of multiple frames at once.
+
+        Pixel values of all frames are picked up by one indexing of the
+        stacked frames. If the frame shapes are different,
+        :meth:`process` is used for each frame.
+
+        Args:
+            reqs_list (list of list): List of ``reqs`` of :meth:`process`.
+            param (dict): Parameters of :meth:`process`.
+
+        Returns:
+            list of pandas.DataFrame: Table containing mask value column of
+            each frame
+        """
+        imgs = [reqs[1] for reqs in reqs_list]
+        if len(set([img.shape for img in imgs])) > 1:
+            return [Value.process(reqs, param) for reqs in reqs_list]
+        if imgs[0].shape[0] > 1:
+            raise Exception("Image must be split into single frames.")
+        frms = np.concatenate(imgs, axis=0)
+        dfs = [reqs[0] for reqs in reqs_list]
+        lens = [len(df) for df in dfs]
+        frm_nos = np.repeat(np.arange(len(dfs)), lens)
+        x = np.concatenate([df[param["calc_cols"][0]].values
+                            for df in dfs]) / param["pitch"]
+        y = np.concatenate([df[param["calc_cols"][1]].values
+                            for df in dfs]) / param["pitch"]
+        x_pos = np.floor(x).astype("int")
+        y_pos = np.floor(y).astype("int")
+        is_in = (0 <= x_pos) & (x_pos < frms.shape[2]) & \
+            (0 <= y_pos) & (y_pos < frms.shape[1])
+        vals = np.zeros(len(x_pos), dtype=frms.dtype)
+        vals[is_in] = frms[frm_nos[is_in], y_pos[is_in], x_pos[is_in]]
+
+        use_cols = param["index_cols"] + ["mask_val"]
+        results = []
+        start = 0
+        for df, n in zip(dfs, lens):
+            cols = {col: df[col].values for col in df.columns
+                    if col in use_cols}
+            cols["mask_val"] = vals[start:start + n]
+            results.append(pd.DataFrame(cols, index=df.index))
+            start += n
+        return results
+
 
 class BinaryImage(Table):
     """Select table rows that have coordinates inside the binary mask.
@@ -150,8 +197,8 @@ class BinaryImage(Table):
         Returns:
             pandas.DataFrame: Table rows located inside mask image
         """
-        df = reqs[0].copy()
-        img = reqs[1].copy()
+        df = reqs[0].copy(deep=False)
+        img = reqs[1]
         if img.shape[0] > 1:
             raise Exception("Image must be split into single frames.")
 
@@ -69,7 +69,7 @@ class UniformRect(Table):
         Returns:
             pandas.DataFrame: Expanded table including point no and coordinates
         """
-        df_req = reqs[0].copy()
+        df_req = reqs[0]
         df_list = []
         for _, df in df_req.groupby(rl(df_req.columns.values.tolist())):
             df_cols = []
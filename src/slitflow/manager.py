@@ -2,9 +2,10 @@ import os
 import sys
 import re
 import gc
+import copy
 import shutil
 import json
-import glob
+import concurrent.futures
 
 import numpy as np
 import pandas as pd
@@ -18,7 +19,7 @@ else:
 
 import slitflow as sf  # used in eval
 from . import name as nm
-from . import info, setreqs, data
+from . import info, setreqs, data, pool, budget, metrics, catalog
 from .name import get_obs_names
 from .name import make_info_path as ipath
 
@@ -30,6 +31,9 @@ class Pipeline():
         root_dir (str): File path to the project directory.
         df (pandas.DataFrame): Pipeline table consisting of a series of data
             classes.
+        run_log (pandas.DataFrame): Table of the last :meth:`run` showing
+            whether each task and observation was computed, skipped or
+            failed.
 
     """
 
@@ -37,12 +41,15 @@ class Pipeline():
         self.root_dir = root_dir
         self.init_df()
         self.init_folder()
+        self.run_log = pd.DataFrame(
+            columns=["index", "address", "obs_name", "status", "error"])
 
     def init_df(self):
         """Create a pipeline table.
         """
         cols = ["class_name", "run_mode", "address", "grp_name", "ana_name",
-                "obs_names", "reqs_address", "reqs_split", "param"]
+                "obs_names", "reqs_address", "reqs_split", "param",
+                "obs_workers"]
         self.df = pd.DataFrame(index=[], columns=cols)
 
     def init_folder(self):
@@ -65,6 +72,7 @@ class Pipeline():
         sheet_name = sheet_name + ".csv"
         path = os.path.join(self.root_dir, "g0_config", sheet_name)
         self.df.to_csv(path, index=False, encoding="shift-jis")
+        catalog.add(path)
 
     def load(self, sheet_names):
         """Import pipeline table from the CSV file.
@@ -85,16 +93,18 @@ class Pipeline():
                 self.add(row.class_name, row.run_mode,
                          row.address, row.grp_name, row.ana_name,
                          row.obs_names, row.reqs_address, row.reqs_split,
-                         row.param)
+                         row.param, row.get("obs_workers"))
 
     def add(self, class_name, run_mode, address, grp_name, ana_name, obs_names,
-            reqs_address, reqs_split, param):
+            reqs_address, reqs_split, param, obs_workers=None):
         """Add a task to the pipeline table.
 
         Args:
             class_name (str): Class name string.
             run_mode (int): Run mode (0=single data, single CPU; 1=single data
-                , multi CPU; 2=multi data, multi CPU; 3=multi data, multi CPU).
+                , multi CPU; 2=multi data, multi CPU; 3=multi data, multi CPU;
+                4=single data, single CPU, streaming save; 5=single data,
+                multi thread; 6=multi data, multi thread).
             address (tuple): (group no, analysis no) to save the task.
             grp_name (str): Group name.
             ana_name (str): Analysis name.
@@ -110,6 +120,9 @@ class Pipeline():
                 data_split2], ...] or [load_and_data_split1,
                 load_and_data_split2,...].
             param (dict): Parameter dictionary.
+            obs_workers (int, optional): Number of processes to run
+                observations in parallel. If None, the ``obs_workers``
+                argument of :meth:`run` is used.
         """
         class_name = self.set_class_name(class_name)
         run_mode = self.set_run_mode(run_mode)
@@ -120,9 +133,10 @@ class Pipeline():
         obs_names = self.set_obs_names(obs_names)
         reqs_split = self.set_reqs_split(reqs_split, reqs_address)
         param = self.set_param(param)
+        obs_workers = self.set_obs_workers(obs_workers)
         row = pd.Series([class_name, run_mode, address, grp_name, ana_name,
-                         obs_names, reqs_address, reqs_split, param],
-                        index=self.df.columns)
+                         obs_names, reqs_address, reqs_split, param,
+                         obs_workers], index=self.df.columns)
         self.df.loc[len(self.df)] = row
 
     def set_class_name(self, class_name):
@@ -157,15 +171,18 @@ class Pipeline():
 
         Returns:
             int: Run mode number (0=single data, single CPU; 1=single data,
-            multi CPU; 2=multi data, multi CPU; 3=multi data, multi CPU).
+            multi CPU; 2=multi data, multi CPU; 3=multi data, multi CPU;
+            4=single data, single CPU, streaming save; 5=single data, multi
+            thread; 6=multi data, multi thread).
         """
         if isinstance(run_mode, int):
             pass
         elif isinstance(run_mode, str):
             run_mode = int(run_mode)
-        if run_mode not in range(4):
+        if run_mode not in range(7):
             raise Exception("Set run mode number. (number,data,process)=\
-                (0,s,s),(1,s,m),(2,m,s),(3,m,m). s=single,m=multi.")
+                (0,s,s),(1,s,m),(2,m,s),(3,m,m),(4,s,stream),(5,s,thread),\
+                (6,m,thread). s=single,m=multi.")
         return run_mode
 
     def set_address(self, address):
@@ -209,8 +226,9 @@ class Pipeline():
                 (not isinstance(grp_name, str) and np.isnan(grp_name)):
             grp_id = "g" + str(address[0])
             path = os.path.join(self.root_dir, grp_id + "_*")
-            if len(glob.glob(path)) > 0:
-                grp_dir = glob.glob(path)[0]
+            grp_dirs = catalog.glob(path)
+            if len(grp_dirs) > 0:
+                grp_dir = grp_dirs[0]
                 end_no = re.match(".*" + grp_id + "_", grp_dir).end()
                 grp_name = grp_dir[end_no:]
             else:
@@ -331,83 +349,545 @@ class Pipeline():
         else:
             raise Exception("Set param as dictionary.")
 
-    def run(self, sheet_name=None, indices=None):
+    def set_obs_workers(self, obs_workers):
+        """Check the number of processes for observations.
+
+        Args:
+            obs_workers (int, str or None): Number of processes.
+
+        Returns:
+            int: Number of processes. None if not defined.
+        """
+        if obs_workers is None:
+            return None
+        elif isinstance(obs_workers, str):
+            obs_workers = eval(obs_workers)
+        elif isinstance(obs_workers, float) and np.isnan(obs_workers):
+            return None
+        if obs_workers is None:
+            return None
+        if int(obs_workers) != obs_workers or obs_workers < 1:
+            raise Exception("obs_workers should be a positive integer.")
+        return int(obs_workers)
+
+    def run(self, sheet_name=None, indices=None, force=False,
+            scheduler="serial", max_workers=None, obs_workers=None,
+            pool_size=None):
         """Run selected tasks.
 
+        Each task result records a fingerprint made from the class name,
+        the parameter dictionary, the slitflow version and the fingerprints
+        of the required data. An observation is skipped if the saved
+        fingerprint matches the current one. Because the fingerprint of the
+        required data is a part of the fingerprint, all downstream tasks of a
+        recomputed task are also recomputed. Obs2Depth, Index, Delete and
+        Copy tasks are always executed.
+
+        Paths of groups, analyses and files are looked up from the project
+        catalog during the run. The catalog is saved in the g0_config folder
+        and reused by the next run. See :mod:`slitflow.catalog`.
+
         Args:
             sheet_name (str, optional): Pipeline CSV file name without
                 extension.
             indices (list of int, optional): Task indices to run.
+            force (bool or int or tuple or list, optional): Task indices to
+                recompute even if the result is up to date. True forces all
+                tasks. See :meth:`convert_indices` for the index format.
+                Defaults to False.
+            scheduler (str, optional): How to order the tasks.
+
+                * "serial" : run tasks one by one in the table order.
+                * "dag" : run independent tasks concurrently. See
+                  :meth:`run_dag`.
+
+            max_workers (int, optional): Max number of concurrent tasks of
+                the "dag" scheduler.
+            obs_workers (int, optional): Number of processes to run
+                observations of a task in parallel. This value is used for
+                tasks whose ``obs_workers`` is not defined in :meth:`add`.
+                See :meth:`run_task`.
+            pool_size (int, optional): Number of worker processes of the
+                shared pool used by run mode 1 and 3. The pool is started
+                before the first task and shut down after the last task. See
+                :mod:`slitflow.pool`. If None, a new pool is created for each
+                calculation unless the shared pool has been started by
+                :func:`slitflow.pool.start`.
 
         """
         if sheet_name is not None:
             self.load(sheet_name)
         indices = self.convert_indices(indices)
+        force_indices = self.convert_force(force, indices)
+        if scheduler not in ["serial", "dag"]:
+            raise Exception('scheduler should be "serial" or "dag".')
         print("===== Pipeline start =====")
-        for index, row in self.df.iterrows():
-            if index not in indices:
-                continue
-            class_name = row.class_name
-            run_mode = row.run_mode
-            address = row.address
-            grp_name = row.grp_name
-            ana_name = row.ana_name
-            reqs_address = row.reqs_address
-            obs_names = self.load_obs_names(row.obs_names, reqs_address)
-            reqs_split = row.reqs_split
-            param = row.param
-
-            if class_name in ["sf.tbl.convert.Obs2Depth()",
-                              "sf.img.convert.Obs2Depth()",
-                              "sf.img.convert.Obs2DepthRGB()"]:
-                work_dir = str(address[0]) + "_" + grp_name + \
-                    "/" + str(address[1]) + "_" + ana_name
-                print(work_dir + " - " + class_name + " mode:"
-                      + str(run_mode))
-                self.run_Obs2Depth(
-                    class_name, reqs_split, reqs_address, obs_names, param,
-                    grp_name, ana_name, run_mode, address)
-            elif class_name in ["sf.dev.tbl.convert.Index()"]:
-                work_dir = str(address[0]) + "_" + grp_name + \
-                    "/" + str(address[1]) + "_" + ana_name
-                print(work_dir + " - " + class_name + " mode:"
-                      + str(run_mode))
-                self.run_index(class_name, reqs_address, obs_names, param,
-                               grp_name, ana_name, address)
-            elif class_name == "Delete()":
-                work_dir = str(reqs_address[0][0]) + "_" + grp_name + \
-                    "/" + str(reqs_address[0][1]) + "_" + ana_name
-                print(work_dir + " - " + class_name + " mode:"
-                      + str(run_mode))
-                self.run_delete(reqs_address, obs_names, param)
-            elif class_name == "Copy()":
-                work_dir = str(address[0]) + "_" + grp_name + \
-                    "/" + str(address[1]) + "_" + ana_name
-                print(work_dir + " - " + class_name + " mode:"
-                      + str(run_mode))
-                self.run_copy(address, ana_name, grp_name, reqs_address,
-                              obs_names, param)
+        is_opened = catalog.get(self.root_dir) is not None
+        catalog.start(self.root_dir)
+        if pool_size is not None:
+            pool.start(pool_size)
+        try:
+            if scheduler == "serial":
+                run_log = []
+                for index in self.df.index:
+                    if index not in indices:
+                        continue
+                    run_log.extend(self.run_task(
+                        index, index in force_indices, obs_workers))
+            else:
+                run_log = self.run_dag(
+                    indices, force_indices, max_workers, obs_workers)
+        finally:
+            if pool_size is not None:
+                pool.shutdown()
+            if is_opened:
+                catalog.save(self.root_dir)
+            else:
+                catalog.shutdown(self.root_dir)
+        self.run_log = pd.DataFrame(
+            run_log,
+            columns=["index", "address", "obs_name", "status", "error"])
+        n_computed = (self.run_log["status"] == "computed").sum()
+        n_skipped = (self.run_log["status"] == "skipped").sum()
+        n_failed = (self.run_log["status"] == "failed").sum()
+        print("===== Pipeline end (computed: " + str(n_computed)
+              + ", skipped: " + str(n_skipped) + ", failed: "
+              + str(n_failed) + ") =====")
+
+    def run_task(self, index, force=False, obs_workers=None):
+        """Run a task of the pipeline table.
+
+        If the number of processes for observations is more than one,
+        observations are executed in parallel by
+        :class:`~concurrent.futures.ProcessPoolExecutor`. An error in an
+        observation does not stop the other observations and is recorded as
+        "failed" in the run log.
+
+        Args:
+            index (int): Row index of the task in :attr:`df`.
+            force (bool, optional): Whether to recompute up-to-date
+                observations. Defaults to False.
+            obs_workers (int, optional): Number of processes for
+                observations. The ``obs_workers`` of the task row is used
+                preferentially.
+
+        Returns:
+            list of list: [index, address, obs_name, status, error] of each
+            observation. Status is "computed", "skipped" or "failed".
+        """
+        row = self.df.loc[index]
+        task_log = []
+        class_name = row.class_name
+        run_mode = row.run_mode
+        address = row.address
+        grp_name = row.grp_name
+        ana_name = row.ana_name
+        reqs_address = row.reqs_address
+        obs_names = self.load_obs_names(row.obs_names, reqs_address)
+        reqs_split = row.reqs_split
+        param = row.param
+
+        if class_name in ["sf.tbl.convert.Obs2Depth()",
+                          "sf.img.convert.Obs2Depth()",
+                          "sf.img.convert.Obs2DepthRGB()"]:
+            work_dir = str(address[0]) + "_" + grp_name + \
+                "/" + str(address[1]) + "_" + ana_name
+            print(work_dir + " - " + class_name + " mode:"
+                  + str(run_mode))
+            self.run_Obs2Depth(
+                class_name, reqs_split, reqs_address, obs_names, param,
+                grp_name, ana_name, run_mode, address)
+            task_log.append([index, address, None, "computed", None])
+        elif class_name in ["sf.dev.tbl.convert.Index()"]:
+            work_dir = str(address[0]) + "_" + grp_name + \
+                "/" + str(address[1]) + "_" + ana_name
+            print(work_dir + " - " + class_name + " mode:"
+                  + str(run_mode))
+            self.run_index(class_name, reqs_address, obs_names, param,
+                           grp_name, ana_name, address)
+            task_log.append([index, address, None, "computed", None])
+        elif class_name == "Delete()":
+            work_dir = str(reqs_address[0][0]) + "_" + grp_name + \
+                "/" + str(reqs_address[0][1]) + "_" + ana_name
+            print(work_dir + " - " + class_name + " mode:"
+                  + str(run_mode))
+            self.run_delete(reqs_address, obs_names, param)
+            task_log.append([index, address, None, "computed", None])
+        elif class_name == "Copy()":
+            work_dir = str(address[0]) + "_" + grp_name + \
+                "/" + str(address[1]) + "_" + ana_name
+            print(work_dir + " - " + class_name + " mode:"
+                  + str(run_mode))
+            self.run_copy(address, ana_name, grp_name, reqs_address,
+                          obs_names, param)
+            task_log.append([index, address, None, "computed", None])
+        else:
+            work_dir = str(address[0]) + "_" + grp_name + \
+                "/" + str(address[1]) + "_" + ana_name
+            print(work_dir + " - " + class_name + " mode:"
+                  + str(run_mode))
+            if pd.notna(row.get("obs_workers")):
+                obs_workers = int(row.obs_workers)
+            n_skip = 0
+            run_list = []
+            for obs_name in obs_names:
+                fingerprint = self.make_fingerprint(
+                    class_name, param, reqs_address, obs_name)
+                if not force and self.is_up_to_date(
+                        address, grp_name, ana_name, obs_name,
+                        fingerprint):
+                    task_log.append(
+                        [index, address, obs_name, "skipped", None])
+                    n_skip += 1
+                else:
+                    run_list.append((obs_name, fingerprint))
+            if n_skip > 0:
+                print("Skipped " + str(n_skip) + "/" + str(len(obs_names))
+                      + " up-to-date observations.")
+
+            if obs_workers is None or obs_workers < 2 or len(run_list) < 2:
+                for obs_name, fingerprint in tqdm(run_list, desc="Obs"):
+                    self.run_obs(index, obs_name, fingerprint)
+                    task_log.append(
+                        [index, address, obs_name, "computed", None])
             else:
-                work_dir = str(address[0]) + "_" + grp_name + \
-                    "/" + str(address[1]) + "_" + ana_name
-                print(work_dir + " - " + class_name + " mode:"
-                      + str(run_mode))
-                for obs_name in tqdm(obs_names, desc="Obs"):
-                    if run_mode < 2:
-                        if type(obs_name) == list:
-                            self.run_one_data_multi_obs(
-                                class_name, reqs_split, reqs_address, obs_name,
-                                param, grp_name, ana_name, run_mode, address)
+                with concurrent.futures.ProcessPoolExecutor(
+                        max_workers=obs_workers) as executor:
+                    futures = []
+                    for obs_name, fingerprint in run_list:
+                        futures.append(executor.submit(
+                            run_obs, self.root_dir, self.df.loc[[index]],
+                            obs_name, fingerprint))
+                    for (obs_name, _), future in tqdm(
+                            zip(run_list, futures), total=len(futures),
+                            desc="Obs"):
+                        error = future.exception()
+                        if error is None:
+                            task_log.append(
+                                [index, address, obs_name, "computed", None])
                         else:
-                            self.run_one_data(
-                                class_name, reqs_split, reqs_address, obs_name,
-                                param, grp_name, ana_name, run_mode, address)
+                            print("Failed: " + str(obs_name) + " - "
+                                  + repr(error))
+                            task_log.append([index, address, obs_name,
+                                             "failed", repr(error)])
+                # files saved by the worker processes
+                catalog.refresh(self.root_dir)
+        return task_log
+
+    def run_obs(self, index, obs_name, fingerprint=None):
+        """Run a task for one observation.
+
+        Args:
+            index (int): Row index of the task in :attr:`df`.
+            obs_name (str or list of str): Observation name.
+            fingerprint (str, optional): Task fingerprint saved in meta.
+        """
+        row = self.df.loc[index]
+        # the task parameters are kept as they are to make the fingerprint
+        param = copy.deepcopy(row.param)
+        if row.run_mode not in [2, 3, 6]:
+            if type(obs_name) == list:
+                self.run_one_data_multi_obs(
+                    row.class_name, row.reqs_split, row.reqs_address,
+                    obs_name, param, row.grp_name, row.ana_name,
+                    row.run_mode, row.address, fingerprint)
+            else:
+                self.run_one_data(
+                    row.class_name, row.reqs_split, row.reqs_address,
+                    obs_name, param, row.grp_name, row.ana_name,
+                    row.run_mode, row.address, fingerprint)
+        else:
+            self.run_multi_data(
+                row.class_name, row.reqs_split, row.reqs_address, obs_name,
+                param, row.grp_name, row.ana_name, row.run_mode,
+                row.address, fingerprint)
+        plt.close()
+
+    def run_dag(self, indices, force_indices, max_workers=None,
+                obs_workers=None):
+        """Run tasks concurrently according to the task dependency graph.
+
+        The dependency graph is created by :meth:`make_task_graph`. Each task
+        is executed in a separate process when all tasks it depends on are
+        finished. A new task is not started while the total CPU usage of
+        running tasks exceeds ``os.cpu_count()`` or no memory is left in
+        :class:`slitflow.budget.MemoryBudget`. Tasks of run mode 1, 3, 5 and
+        6 count as the number of CPU used by
+        :meth:`~slitflow.data.Data.run_mp`.
+
+        If a task raises an exception, the task is logged as "failed" and
+        the tasks depending on it are logged as "skipped" without running.
+        The other tasks are executed until all tasks are finished.
+
+        Args:
+            indices (pandas.Index): Task row indices to run.
+            force_indices (pandas.Index): Task row indices to recompute.
+            max_workers (int, optional): Max number of concurrent tasks.
+                Defaults to cpu_count * :data:`slitflow.data.Data.CPU_RATE`.
+            obs_workers (int, optional): Number of processes for
+                observations. See :meth:`run_task`.
+
+        Returns:
+            list of list: Run log of all tasks. See :meth:`run_task`.
+        """
+        graph = self.make_task_graph(indices)
+        n_cpu = os.cpu_count()
+        if max_workers is None:
+            max_workers = np.max(
+                [np.floor(n_cpu * data.Data.CPU_RATE).astype(int), 1])
+        mem = budget.MemoryBudget()
+
+        run_log = []
+        done = []
+        failed = []
+        running = {}
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=max_workers) as executor:
+            while len(done) < len(graph):
+                # required tasks are previous tasks in the graph order
+                for index, reqs in graph.items():
+                    if index not in done and \
+                            any([req in failed for req in reqs]):
+                        run_log.append((index, [[
+                            index, self.df.at[index, "address"], None,
+                            "skipped", "Required task failed."]]))
+                        done.append(index)
+                        failed.append(index)
+                started = [index for index, _ in running.values()]
+                ready = [index for index, reqs in graph.items()
+                         if index not in done and index not in started
+                         and all([req in done for req in reqs])]
+                for index in ready:
+                    cost = self.get_task_cpu(index)
+                    used = sum([cpu for _, cpu in running.values()])
+                    if len(running) > 0:
+                        if len(running) >= max_workers or \
+                                used + cost > n_cpu or \
+                                mem.get_headroom() <= 0:
+                            break
+                    future = executor.submit(
+                        run_task, self.root_dir, self.df.loc[[index]],
+                        index in force_indices, obs_workers)
+                    running[future] = (index, cost)
+                finished, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in finished:
+                    index, _ = running.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        run_log.append((index, future.result()))
                     else:
-                        self.run_multi_data(
-                            class_name, reqs_split, reqs_address, obs_name,
-                            param, grp_name, ana_name, run_mode,
-                            address)
-                    plt.close()
+                        print("Failed: task " + str(index) + " - "
+                              + repr(error))
+                        run_log.append((index, [[
+                            index, self.df.at[index, "address"], None,
+                            "failed", repr(error)]]))
+                        failed.append(index)
+                    done.append(index)
+                if len(finished) > 0:
+                    # files saved by the worker processes
+                    catalog.refresh(self.root_dir)
+        run_log = sorted(run_log, key=lambda x: list(graph).index(x[0]))
+        return [log for _, task_log in run_log for log in task_log]
+
+    def make_task_graph(self, indices=None):
+        """Create the dependency graph of tasks.
+
+        A task depends on a previous task if the task requires or overwrites
+        the result of the previous task, or if the task overwrites or deletes
+        the data required by the previous task. This is the same relation that
+        :meth:`make_flowchart` draws, plus the order of deletion and
+        overwriting.
+
+        Args:
+            indices (pandas.Index, optional): Task row indices. Tasks not in
+                indices are regarded as already finished.
+
+        Returns:
+            dict: Task row index as a key and a list of row indices of the
+            tasks it depends on as a value
+        """
+        if indices is None:
+            indices = self.df.index
+        rw_list = []
+        for index in self.df.index:
+            if index not in indices:
+                continue
+            row = self.df.loc[index]
+            if row.class_name == "Delete()":
+                reads = []
+                writes = list(row.reqs_address)
+            else:
+                reads = list(row.reqs_address)
+                writes = [row.address]
+            rw_list.append((index, reads, writes))
+
+        graph = {}
+        for i, (index, reads, writes) in enumerate(rw_list):
+            graph[index] = []
+            for prev_index, prev_reads, prev_writes in rw_list[:i]:
+                if any([x in reads + writes for x in prev_writes]) or \
+                        any([x in writes for x in prev_reads]):
+                    graph[index].append(prev_index)
+        return graph
+
+    def get_task_cpu(self, index):
+        """Return the number of CPU that a task uses.
+
+        Args:
+            index (int): Row index of the task.
+
+        Returns:
+            int: :attr:`slitflow.data.Data.n_worker` for run mode 1, 3, 5
+            and 6, otherwise 1
+        """
+        if self.df.loc[index, "run_mode"] in [1, 3, 5, 6]:
+            return np.max(
+                [np.floor(os.cpu_count() * data.Data.CPU_RATE).astype(int), 1])
+        return 1
+
+    def convert_force(self, force, indices):
+        """Standardize the force argument of run method.
+
+        Args:
+            force (bool or int or tuple or list): True selects all indices,
+                False or None selects nothing. Other values are converted by
+                :meth:`convert_indices`.
+            indices (pandas.Index): Task row indices to run.
+
+        Returns:
+            pandas.Index: Task row indices to recompute
+        """
+        if force is True:
+            return indices
+        elif force is False or force is None:
+            return pd.Index([])
+        return self.convert_indices(force)
+
+    def make_fingerprint(self, class_name, param, reqs_address, obs_name):
+        """Return the fingerprint of a task for one observation.
+
+        The fingerprint items of each required data are the fingerprint and
+        datetime saved in its info file. The datetime makes downstream tasks
+        recompute when the required data is recomputed or is created without
+        a fingerprint.
+
+        Args:
+            class_name (str): :func:`eval()` executable class name string.
+            param (dict): Parameter dictionary.
+            reqs_address (list of tuple): List of required data address.
+            obs_name (str or list of str): Observation name. If list, each
+                element corresponds to each required data.
+
+        Returns:
+            str: Fingerprint string. None if required data is not found.
+        """
+        if type(obs_name) == list:
+            req_obs_names = obs_name
+        else:
+            req_obs_names = [obs_name] * len(reqs_address)
+        reqs_fingerprint = []
+        for req_address, req_obs_name in zip(reqs_address, req_obs_names):
+            try:
+                info_path = ipath(self.root_dir, req_address[0],
+                                  req_address[1], req_obs_name)
+            except Exception:
+                return None
+            if not os.path.exists(info_path):
+                return None
+            with open(info_path) as f:
+                meta = json.load(f)["meta"]
+            reqs_fingerprint.append(
+                [meta.get("fingerprint"), meta.get("datetime")])
+        return info.make_fingerprint(class_name, param, reqs_fingerprint)
+
+    def is_up_to_date(self, address, grp_name, ana_name, obs_name,
+                      fingerprint):
+        """Return whether the saved result has the same fingerprint.
+
+        The result is not up to date if any data file of the splits in the
+        saved index is missing.
+
+        Args:
+            address (tuple): (group_no, analysis_no) of the result data.
+            grp_name (str): Group name.
+            ana_name (str): Analysis name.
+            obs_name (str or list of str): Observation name. The first
+                element is used if list.
+            fingerprint (str): Fingerprint of the task to run.
+
+        Returns:
+            bool: True if the task can be skipped
+        """
+        if fingerprint is None:
+            return False
+        if type(obs_name) == list:
+            obs_name = obs_name[0]
+        try:
+            info_path = ipath(self.root_dir, address[0], address[1],
+                              obs_name, ana_name, grp_name)
+        except Exception:
+            return False
+        if not os.path.exists(info_path) or \
+                not os.path.exists(info_path + "x"):
+            return False
+        with open(info_path) as f:
+            meta = json.load(f)["meta"]
+        if meta.get("fingerprint") != fingerprint:
+            return False
+        D = eval(nm.get_class_name(info_path))
+        D.info.load(info_path)
+        D.info.set_file_nos(None)
+        return all([os.path.exists(path) for path in D.make_data_paths()])
+
+    def report(self, sheet_name="report"):
+        """Aggregate time and memory usage of tasks into a table.
+
+        The metrics saved in the info files by :mod:`slitflow.metrics` are
+        collected for each task, observation and step. The table is saved as
+        a CSV file in the g0_config folder.
+
+        Args:
+            sheet_name (str, optional): Report CSV file name without
+                extension. Defaults to "report".
+
+        Returns:
+            pandas.DataFrame: Table with one row for each step. Wall time and
+            CPU time are in seconds, and memory and file sizes are in bytes.
+            ``peak_rss`` and ``rss_increase`` are the maximum over the runs
+            of the step.
+        """
+        cols = ["index", "address", "obs_name", "class_name", "step",
+                "wall_time", "cpu_time", "count", "peak_rss", "rss_increase",
+                "bytes_read", "bytes_written", "n_split", "n_cycle"]
+        rows = []
+        for index, row in self.df.iterrows():
+            if not isinstance(row.address, tuple):
+                continue
+            info_paths = catalog.glob(os.path.join(
+                self.root_dir, "g" + str(row.address[0]) + "_*",
+                "a" + str(row.address[1]) + "_" + row.ana_name, "*.sf"))
+            for info_path in sorted(info_paths):
+                with open(info_path) as f:
+                    meta = json.load(f)["meta"]
+                if "metrics" not in meta:
+                    continue
+                metrics_dict = meta["metrics"]
+                obs_name = nm.split_info_path(info_path)[1]
+                for step, record in metrics_dict["steps"].items():
+                    rows.append(
+                        [index, row.address, obs_name, row.class_name, step,
+                         record["wall_time"], record["cpu_time"],
+                         record["count"],
+                         record.get("peak_rss", metrics_dict["peak_rss"]),
+                         record.get("rss_increase", np.nan),
+                         metrics_dict["bytes_read"],
+                         metrics_dict["bytes_written"],
+                         metrics_dict["n_split"], metrics_dict["n_cycle"]])
+        df = pd.DataFrame(rows, columns=cols)
+        path = os.path.join(self.root_dir, "g0_config", sheet_name + ".csv")
+        df.to_csv(path, index=False)
+        return df
 
     def load_obs_names(self, obs_names, reqs_address):
         """Get observation names from saved files if obs_names is empty list.
@@ -480,7 +960,7 @@ class Pipeline():
 
     def run_one_data(self, class_name, reqs_split, reqs_address,
                      obs_name, param, grp_name, ana_name, run_mode,
-                     address):
+                     address, fingerprint=None):
         """Execute a task that is not split into multiple files.
 
         Args:
@@ -491,12 +971,14 @@ class Pipeline():
             param (dict): Parameter dictionary.
             grp_name (str): Group name.
             ana_name (str): Analysis name.
-            run_mode (int): Run mode number. This should be 0 or 1.
+            run_mode (int): Run mode number. This should be 0, 1, 4 or 5.
             address (tuple): (group_no, analysis_no) of the result data.
+            fingerprint (str, optional): Task fingerprint saved in meta.
         """
         D = eval(class_name)
         D.info.set_path(ipath(self.root_dir, address[0], address[1],
                               obs_name, ana_name, grp_name))
+        D.info.fingerprint = fingerprint
         reqs = []
         for req_address, req_split in zip(reqs_address, reqs_split):
             info_path = ipath(
@@ -504,6 +986,7 @@ class Pipeline():
             req_class_name = nm.get_class_name(info_path)
             R = eval(req_class_name)
             R.info.load(info_path)
+            R.info.load_columns = D.get_req_columns(len(reqs), R.info)
 
             if type(req_split) == list:
                 R.info.load_split_depth = req_split[0]
@@ -513,6 +996,7 @@ class Pipeline():
                 R.info.data_split_depth = req_split
             R.load()
             R.split(req_split)
+            metrics.merge(D.info.metrics, R.info.metrics)
             reqs.append(R)
 
         if "split_depth" not in param:
@@ -520,6 +1004,10 @@ class Pipeline():
 
         if run_mode == 1:
             D.run_mp(reqs, param)
+        elif run_mode == 4:
+            D.run_stream(reqs, param)
+        elif run_mode == 5:
+            D.run_thread(reqs, param)
         else:
             D.run(reqs, param)
 
@@ -529,7 +1017,7 @@ class Pipeline():
 
     def run_one_data_multi_obs(self, class_name, reqs_split, reqs_address,
                                obs_names, param, grp_name, ana_name, run_mode,
-                               address):
+                               address, fingerprint=None):
         """Execute a task that is not split into multiple files.
 
         The first element of obs_names is used to the result file name.
@@ -542,12 +1030,14 @@ class Pipeline():
             param (dict): Parameter dictionary.
             grp_name (str): Group name.
             ana_name (str): Analysis name.
-            run_mode (int): Run mode number. This should be 0 or 1.
+            run_mode (int): Run mode number. This should be 0, 1, 4 or 5.
             address (tuple): (group_no, analysis_no) of the result data.
+            fingerprint (str, optional): Task fingerprint saved in meta.
         """
         D = eval(class_name)
         D.info.set_path(ipath(self.root_dir, address[0], address[1],
                               obs_names[0], ana_name, grp_name))
+        D.info.fingerprint = fingerprint
         reqs = []
         for obs_name, req_address, req_split in zip(
                 obs_names, reqs_address, reqs_split):
@@ -556,6 +1046,7 @@ class Pipeline():
             req_class_name = nm.get_class_name(info_path)
             R = eval(req_class_name)
             R.info.load(info_path)
+            R.info.load_columns = D.get_req_columns(len(reqs), R.info)
 
             if type(req_split) == list:
                 R.info.load_split_depth = req_split[0]
@@ -566,9 +1057,14 @@ class Pipeline():
 
             R.load()
             R.split(req_split)
+            metrics.merge(D.info.metrics, R.info.metrics)
             reqs.append(R)
         if run_mode == 1:
             D.run_mp(reqs, param)
+        elif run_mode == 4:
+            D.run_stream(reqs, param)
+        elif run_mode == 5:
+            D.run_thread(reqs, param)
         else:
             D.run(reqs, param)
 
@@ -578,7 +1074,7 @@ class Pipeline():
 
     def run_multi_data(self, class_name, reqs_split, reqs_address,
                        obs_name, param, grp_name, ana_name,
-                       run_mode, address):
+                       run_mode, address, fingerprint=None):
         """Execute a task that is split into multiple files.
 
         Args:
@@ -591,10 +1087,12 @@ class Pipeline():
             ana_name (str): Analysis name.
             run_mode (int): Run mode number. This should be 0 or 1.
             address (tuple): (group_no, analysis_no) of the result data.
+            fingerprint (str, optional): Task fingerprint saved in meta.
         """
         D = eval(class_name)
         D.info.set_path(ipath(self.root_dir, address[0], address[1],
                               obs_name, ana_name, grp_name))
+        D.info.fingerprint = fingerprint
 
         reqs = []
         for req_address, req_split in zip(reqs_address, reqs_split):
@@ -603,6 +1101,7 @@ class Pipeline():
             req_class_name = nm.get_class_name(info_path)
             R = eval(req_class_name)
             R.info.load(info_path)
+            R.info.load_columns = D.get_req_columns(len(reqs), R.info)
             if type(req_split) == list:
                 R.info.load_split_depth = req_split[0]
                 R.info.data_split_depth = req_split[1]
@@ -697,17 +1196,25 @@ class Pipeline():
                     req_class_name = nm.get_class_name(info_path)
                     R = eval(req_class_name)
                     R.info.load(info_path)
-                    for data_path in nm.load_data_paths(R.info, R.EXT):
-                        if os.path.exists(data_path):
+                    data_paths = nm.load_data_paths(R.info, R.get_ext())
+                    for data_path in data_paths:
+                        if os.path.isdir(data_path):
+                            shutil.rmtree(data_path)
+                            catalog.remove(data_path)
+                        elif os.path.exists(data_path):
                             os.remove(data_path)
+                            catalog.remove(data_path)
                     if os.path.exists(info_path + "x"):
                         os.remove(info_path + "x")
+                        catalog.remove(info_path + "x")
                     if param["keep"] in ["folder", "none"]:
                         if os.path.exists(info_path):
                             os.remove(info_path)
+                            catalog.remove(info_path)
                     if param["keep"] == "none":
                         try:
                             os.rmdir(os.path.dirname(info_path))
+                            catalog.remove(os.path.dirname(info_path))
                         except OSError as e:
                             pass  # existing other files
 
@@ -752,18 +1259,25 @@ class Pipeline():
 
         R = eval(src_class_name)
         R.info.load(src_info_path)
-        for src_data_path in nm.load_data_paths(R.info, R.EXT):
+        for src_data_path in nm.load_data_paths(R.info, R.get_ext()):
             src_data_name = os.path.basename(src_data_path)
             # change data file name
             new_data_name = src_data_name.replace(
                 src_grp_name + "_" + src_ana_name, grp_name + "_" + ana_name)
             new_data_name = new_data_name.replace(src_obs_name, new_obs_name)
             new_data_path = os.path.join(new_dir, new_data_name)
-            if os.path.exists(src_data_path):
+            if os.path.isdir(src_data_path):
+                shutil.copytree(src_data_path, new_data_path,
+                                dirs_exist_ok=True)
+                catalog.add(new_data_path)
+            elif os.path.exists(src_data_path):
                 shutil.copy2(src_data_path, new_data_path)
+                catalog.add(new_data_path)
 
         shutil.copy2(src_info_path, new_info_path)
         shutil.copy2(src_info_path + "x", new_info_path + "x")
+        catalog.add(new_info_path)
+        catalog.add(new_info_path + "x")
 
         # rewrite copied info path
         with open(new_info_path) as f:
@@ -961,3 +1475,40 @@ class Pipeline():
             Info = info.Info([], info_path)
             Info.rename_class_name(new_name)
             print("Renamed: " + info_path)
+
+
+def run_task(root_dir, df_task, force=False, obs_workers=None):
+    """Run a task in a new Pipeline object.
+
+    This function is submitted to worker processes by
+    :meth:`Pipeline.run_dag`.
+
+    Args:
+        root_dir (str): File path to the project directory.
+        df_task (pandas.DataFrame): Pipeline table containing only one task.
+        force (bool, optional): Whether to recompute up-to-date observations.
+        obs_workers (int, optional): Number of processes for observations.
+
+    Returns:
+        list of list: Run log of the task. See :meth:`Pipeline.run_task`.
+    """
+    PL = Pipeline(root_dir)
+    PL.df = df_task
+    return PL.run_task(df_task.index[0], force, obs_workers)
+
+
+def run_obs(root_dir, df_task, obs_name, fingerprint=None):
+    """Run a task for one observation in a new Pipeline object.
+
+    This function is submitted to worker processes by
+    :meth:`Pipeline.run_task`.
+
+    Args:
+        root_dir (str): File path to the project directory.
+        df_task (pandas.DataFrame): Pipeline table containing only one task.
+        obs_name (str or list of str): Observation name.
+        fingerprint (str, optional): Task fingerprint saved in meta.
+    """
+    PL = Pipeline(root_dir)
+    PL.df = df_task
+    PL.run_obs(df_task.index[0], obs_name, fingerprint)
@@ -0,0 +1,206 @@
+"""
+This module measures the time and memory of each step of
+:class:`slitflow.data.Data`.
+
+Steps such as ``load``, ``set_reqs``, ``process``, ``post_run``,
+``set_index``, ``split`` and ``save`` are measured by :func:`measure` and
+recorded in :attr:`slitflow.info.Info.metrics`. The metrics are saved in the
+``meta`` of the information file and aggregated by
+:meth:`slitflow.manager.Pipeline.report`.
+
+Custom collectors can be added as hook functions. A hook is called with the
+Data object, the step name and the record of the step every time a step
+finishes.
+
+.. code-block:: python
+
+    def print_step(Data, step, record):
+        print(Data.__class__.__name__, step, record["wall_time"])
+
+    sf.metrics.add_hook(print_step)
+
+"""
+import os
+import time
+import threading
+import contextlib
+
+import psutil
+
+HOOKS = []
+"""list of function: Functions called when a step finishes."""
+
+STEP_KEYS = ["wall_time", "cpu_time", "count"]
+"""list of str: Keys of the record of each step that are summed up."""
+
+SAMPLE_INTERVAL = 0.01
+"""float: Interval in seconds to sample the memory usage during a step."""
+
+
+def add_hook(hook):
+    """Add a collector function called when a step finishes.
+
+    Args:
+        hook (function): Function with (Data, step, record) arguments. The
+            record is a dictionary of ``wall_time`` (s), ``cpu_time`` (s),
+            ``peak_rss`` (bytes) and ``rss_increase`` (bytes) of the step.
+    """
+    if hook not in HOOKS:
+        HOOKS.append(hook)
+
+
+def remove_hook(hook):
+    """Remove a collector function added by :func:`add_hook`.
+
+    Args:
+        hook (function): Function to remove.
+    """
+    if hook in HOOKS:
+        HOOKS.remove(hook)
+
+
+class RSSSampler():
+    """Sample the resident set size of this process in a thread.
+
+    The peak is the maximum of the samples taken every
+    :data:`SAMPLE_INTERVAL` seconds between :meth:`start` and :meth:`stop`.
+    Memory that is allocated and released between two samples is not
+    counted.
+
+    Attributes:
+        start_rss (int): Resident set size at the start in bytes.
+        peak_rss (int): Peak resident set size in bytes.
+    """
+
+    def __init__(self):
+        self.process = psutil.Process()
+        self.start_rss = 0
+        self.peak_rss = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+
+    def start(self):
+        """Start sampling."""
+        self.start_rss = self.process.memory_info().rss
+        self.peak_rss = self.start_rss
+        self.thread.start()
+
+    def stop(self):
+        """Stop sampling and take the last sample.
+
+        Returns:
+            int: Peak resident set size in bytes
+        """
+        self.stop_event.set()
+        self.thread.join()
+        self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+        return self.peak_rss
+
+    def sample(self):
+        while not self.stop_event.wait(SAMPLE_INTERVAL):
+            self.peak_rss = max(self.peak_rss,
+                                self.process.memory_info().rss)
+
+
+def init_metrics():
+    """Return an empty metrics dictionary.
+
+    ``peak_rss`` is the maximum of the peaks of the measured steps, not the
+    peak of the whole process since it started.
+
+    Returns:
+        dict: Dictionary of ``steps``, ``peak_rss``, ``bytes_read``,
+        ``bytes_written``, ``n_split`` and ``n_cycle``
+    """
+    return {"steps": {}, "peak_rss": 0, "bytes_read": 0,
+            "bytes_written": 0, "n_split": 0, "n_cycle": 0}
+
+
+@contextlib.contextmanager
+def measure(Data, step):
+    """Measure wall time, CPU time and peak memory of a step.
+
+    The record is added to ``Data.info.metrics``. ``peak_rss`` is the peak
+    resident set size sampled by :class:`RSSSampler` during the step, and
+    ``rss_increase`` is the increase of the peak over the usage at the start
+    of the step. CPU time and memory are measured for this process only and
+    do not include worker processes of :meth:`~slitflow.data.Data.run_mp`.
+
+    Args:
+        Data (Data): Data object running the step.
+        step (str): Step name.
+    """
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    sampler = RSSSampler()
+    sampler.start()
+    try:
+        yield
+    finally:
+        peak_rss = sampler.stop()
+        record = {"wall_time": time.perf_counter() - wall_start,
+                  "cpu_time": time.process_time() - cpu_start,
+                  "peak_rss": peak_rss,
+                  "rss_increase": peak_rss - sampler.start_rss}
+        metrics = Data.info.metrics
+        steps = metrics["steps"]
+        if step not in steps:
+            steps[step] = {key: 0 for key in STEP_KEYS}
+        steps[step]["wall_time"] += record["wall_time"]
+        steps[step]["cpu_time"] += record["cpu_time"]
+        steps[step]["count"] += 1
+        update_peak(steps[step], record)
+        metrics["peak_rss"] = max(metrics["peak_rss"], record["peak_rss"])
+        for hook in HOOKS:
+            hook(Data, step, record)
+
+
+def merge(metrics, other):
+    """Add metrics of another Data object such as required data.
+
+    Args:
+        metrics (dict): Metrics dictionary to update.
+        other (dict): Metrics dictionary to add.
+    """
+    for step, record in other["steps"].items():
+        if step not in metrics["steps"]:
+            metrics["steps"][step] = {key: 0 for key in STEP_KEYS}
+        for key in STEP_KEYS:
+            metrics["steps"][step][key] += record[key]
+        update_peak(metrics["steps"][step], record)
+    metrics["peak_rss"] = max(metrics["peak_rss"], other["peak_rss"])
+    metrics["bytes_read"] += other["bytes_read"]
+    metrics["bytes_written"] += other["bytes_written"]
+
+
+def update_peak(step_record, record):
+    """Keep the maximum memory usage of a step.
+
+    Args:
+        step_record (dict): Accumulated record of a step to update.
+        record (dict): Record of the step to add. Records without memory
+            usage are ignored.
+    """
+    for key in ["peak_rss", "rss_increase"]:
+        if key in record:
+            step_record[key] = max(step_record.get(key, 0), record[key])
+
+
+def get_file_size(paths):
+    """Return the total size of existing files.
+
+    Args:
+        paths (list of str): File paths. The size of a folder is the total
+            size of the files in it.
+
+    Returns:
+        int: Total bytes
+    """
+    size = 0
+    for path in paths:
+        if os.path.isdir(path):
+            size += sum([entry.stat().st_size for entry in os.scandir(path)
+                         if entry.is_file()])
+        elif os.path.exists(path):
+            size += os.path.getsize(path)
+    return int(size)
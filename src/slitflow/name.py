@@ -4,9 +4,9 @@ This module provides file path processing functions.
 
 import os
 import re
-import glob
 import json
 
+from . import catalog
 from .fun.sort import natural_sort
 
 
@@ -28,7 +28,7 @@ def make_info_path(root_dir, grp_no, ana_no, obs_name,
     grp_id = "g" + str(grp_no)
     if grp_name == "":  # find from folder
         path = os.path.join(root_dir, grp_id + "_*")
-        grp_dir = glob.glob(path)[0]
+        grp_dir = catalog.glob(path)[0]
         end_no = re.match(".*" + grp_id + "_", grp_dir).end()
         grp_name = grp_dir[end_no:]
     else:  # create group folder
@@ -36,7 +36,7 @@ def make_info_path(root_dir, grp_no, ana_no, obs_name,
     ana_id = "a" + str(ana_no)
     if not ana_name:  # find from folder
         path = os.path.join(grp_dir, ana_id + "_*")
-        ana_dirs = glob.glob(path)
+        ana_dirs = catalog.glob(path)
         if len(ana_dirs) == 1:
             ana_dir = ana_dirs[0]
         elif len(ana_dirs) > 1:
@@ -49,6 +49,7 @@ def make_info_path(root_dir, grp_no, ana_no, obs_name,
         ana_dir = os.path.join(grp_dir, ana_id + "_" + ana_name)
         if not os.path.exists(ana_dir):
             os.mkdir(ana_dir)
+            catalog.add(ana_dir)
     return os.path.join(ana_dir, obs_name + "_" + grp_name + "_"
                         + ana_name + ".sf")
 
@@ -96,12 +97,10 @@ def make_data_paths(Info, ext):
         info_path = os.path.splitext(Info.path)[0] + ext
         return [info_path]
     ana_path, obs_name, ana_name, grp_name = split_info_path(Info.path)
-    data_paths = []
-    for depth_id in depth_ids:
-        file_name = obs_name + "_" + depth_id + "_" + grp_name + "_" + \
-            ana_name + ext
-        data_paths.append(os.path.join(ana_path, file_name))
-    return natural_sort(data_paths)
+    prefix = os.path.join(ana_path, obs_name + "_")
+    suffix = "_" + grp_name + "_" + ana_name + ext
+    # depth ids are already in natural order
+    return [prefix + depth_id + suffix for depth_id in depth_ids]
 
 
 def load_data_paths(Info, ext):
@@ -117,7 +116,7 @@ def load_data_paths(Info, ext):
     ana_path, obs_name, ana_name, grp_name = split_info_path(Info.path)
     path = os.path.join(ana_path, obs_name
                         + "_*" + grp_name + "_" + ana_name + ext)
-    data_paths = glob.glob(path)
+    data_paths = catalog.glob(path)
     data_paths = list(set(data_paths) - set([Info.path]))
     return natural_sort(data_paths)
 
@@ -138,10 +137,11 @@ def make_group(root_dir, grp_no, grp_name):
     if os.path.exists(grp_dir):
         return grp_dir
     path_wildcard = os.path.join(root_dir, grp_id + "_*")
-    if len(glob.glob(path_wildcard)) > 0:
+    if len(catalog.glob(path_wildcard)) > 0:
         raise Exception("Group No." + str(grp_no) + " is used as other name.")
     else:
         os.makedirs(grp_dir)
+        catalog.add(grp_dir)
     return grp_dir
 
 
@@ -159,9 +159,9 @@ def get_obs_names(root_dir, req_address):
     grp_no = req_address[0]
     ana_no = req_address[1]
     path_wildcard = os.path.join(root_dir, "g" + str(grp_no) + "_*")
-    grp_path = glob.glob(path_wildcard)[0]
+    grp_path = catalog.glob(path_wildcard)[0]
     path_wildcard = os.path.join(grp_path, "a" + str(ana_no) + "_*")
-    ana_paths = glob.glob(path_wildcard)
+    ana_paths = catalog.glob(path_wildcard)
     if len(ana_paths) == 1:
         ana_path = ana_paths[0]
     elif len(ana_paths) > 1:
@@ -169,7 +169,7 @@ def get_obs_names(root_dir, req_address):
     else:
         return None
     info_path_wildcard = os.path.join(ana_path, "*.sf")
-    info_paths = glob.glob(info_path_wildcard)
+    info_paths = catalog.glob(info_path_wildcard)
     obs_names = []
     for info_path in info_paths:
         _, obs_name, _, _ = split_info_path(info_path)
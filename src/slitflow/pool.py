@@ -0,0 +1,154 @@
+"""
+This module manages a process pool shared by all Data objects.
+
+Creating a :class:`~concurrent.futures.ProcessPoolExecutor` for every
+:meth:`slitflow.data.Data.run_mp` call costs the start-up of worker
+processes and the import of slitflow and its dependencies. If the pool is
+started by :func:`start`, :meth:`~slitflow.data.Data.run_mp` and
+:func:`slitflow.setreqs.run_cycle` reuse it until :func:`shutdown` is
+called. :meth:`slitflow.manager.Pipeline.run` starts and shuts down the pool
+when ``pool_size`` is given.
+
+.. code-block:: python
+
+    sf.pool.start(8)
+    D1.run_mp([R], param1)
+    D2.run_mp([D1], param2)  # the same worker processes are used
+    sf.pool.shutdown()
+
+Worker processes and threads limit the number of threads used by OpenCV and
+BLAS libraries so that the total number of threads does not exceed the
+number of CPU cores. BLAS threads are limited only if :mod:`threadpoolctl` is
+installed.
+
+"""
+import os
+import multiprocessing
+import concurrent.futures
+import contextlib
+import importlib  # for threadpoolctl
+
+import cv2
+
+START_METHOD = "forkserver"
+"""str: Start method of worker processes. If the method is not available on
+the platform, "spawn" is used."""
+
+PRELOAD = ["slitflow"]
+"""list of str: Modules imported by the fork server before forking workers.
+"""
+
+executor = None
+pid = None
+
+
+def start(max_workers=None):
+    """Start the shared process pool.
+
+    If the pool is already running with the same size, it is reused.
+
+    Args:
+        max_workers (int, optional): Number of worker processes. Defaults to
+            cpu_count * :data:`slitflow.data.Data.CPU_RATE`.
+
+    Returns:
+        concurrent.futures.ProcessPoolExecutor: Shared process pool
+    """
+    global executor, pid
+    if max_workers is None:
+        from .data import Data
+        max_workers = max(int(os.cpu_count() * Data.CPU_RATE), 1)
+    if get() is not None:
+        if executor._max_workers == max_workers:
+            return executor
+        shutdown()
+
+    if START_METHOD in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context(START_METHOD)
+    else:
+        context = multiprocessing.get_context("spawn")
+    if context.get_start_method() == "forkserver":
+        context.set_forkserver_preload(PRELOAD)
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=context,
+        initializer=set_native_threads,
+        initargs=(get_native_threads(max_workers),))
+    pid = os.getpid()
+    return executor
+
+
+def get():
+    """Return the shared process pool.
+
+    The pool can be used only in the process that started it.
+
+    Returns:
+        concurrent.futures.ProcessPoolExecutor: Shared process pool. None if
+        the pool is not started.
+    """
+    if executor is None or pid != os.getpid():
+        return None
+    return executor
+
+
+def shutdown(wait=True):
+    """Shut down the shared process pool.
+
+    Args:
+        wait (bool, optional): Whether to wait for running tasks. Defaults to
+            True.
+    """
+    global executor, pid
+    if get() is not None:
+        executor.shutdown(wait=wait)
+    executor = None
+    pid = None
+
+
+def get_native_threads(n_worker):
+    """Return the number of native threads for each worker.
+
+    Args:
+        n_worker (int): Number of worker processes or threads.
+
+    Returns:
+        int: Number of threads of OpenCV and BLAS in each worker
+    """
+    return max(os.cpu_count() // max(int(n_worker), 1), 1)
+
+
+def set_native_threads(n_thread):
+    """Set the number of threads of OpenCV and BLAS in this process.
+
+    This function is used as the initializer of worker processes.
+
+    Args:
+        n_thread (int): Number of threads.
+    """
+    cv2.setNumThreads(n_thread)
+    try:
+        threadpoolctl = importlib.import_module("threadpoolctl")
+    except ModuleNotFoundError:
+        return
+    threadpoolctl.threadpool_limits(n_thread)
+
+
+@contextlib.contextmanager
+def limit_native_threads(n_thread):
+    """Temporarily limit the number of threads of OpenCV and BLAS.
+
+    Args:
+        n_thread (int): Number of threads.
+    """
+    n_cv2 = cv2.getNumThreads()
+    cv2.setNumThreads(n_thread)
+    try:
+        threadpoolctl = importlib.import_module("threadpoolctl")
+        limits = threadpoolctl.threadpool_limits(n_thread)
+    except ModuleNotFoundError:
+        limits = contextlib.nullcontext()
+    try:
+        with limits:
+            yield
+    finally:
+        cv2.setNumThreads(n_cv2)
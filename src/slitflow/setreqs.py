@@ -3,10 +3,16 @@ This module includes functions used in the set_reqs method of the Data class.
 The required data must be sorted to align the correspondence between the data.
 """
 import sys
+import hashlib
+import collections
 
 import numpy as np
 import pandas as pd
 
+from . import metrics
+from . import hindex
+from .fun.misc import reduce_list as rl
+
 if 'ipykernel' in sys.modules:
     from tqdm.notebook import tqdm
 else:
@@ -41,11 +47,154 @@ def allocate_data(reqs, param):
 
 def run_cycle(Data, reqs, param, load_splits, data_splits, run_mode):
 
+    plan = make_cycle_plan(reqs, param, load_splits, data_splits)
+
+    for i, save_no in tqdm(enumerate(plan.save_nos),
+                           total=len(plan.save_nos), desc="Cyc",
+                           leave=False):
+
+        for req_no, req in enumerate(reqs):
+
+            index_data_cycle = plan.get_index(i, req_no)
+            if index_data_cycle is None:
+                req.clear_data()
+                continue
+
+            req.info.load_rows = index_data_cycle
+            try:
+                req.load(plan.file_nos[req_no][i])
+            finally:
+                req.info.load_rows = None
+            index_split = req.info.index
+            index_dest = make_index_dest_cycle(index_split, index_data_cycle)
+            req.split(index=index_dest)
+
+        for req in reqs:
+            metrics.merge(Data.info.metrics, req.info.metrics)
+            req.info.metrics = metrics.init_metrics()
+        Data.info.metrics["n_cycle"] += 1
+        Data.reqs_are_ready = True
+        if run_mode == 2:
+            Data.run(reqs, param)
+        elif run_mode == 6:
+            Data.run_thread(reqs, param)
+        else:
+            Data.run_mp(reqs, param)
+
+        if save_no != 0:
+            Data.split(param["split_depth"])
+            Data.save()
+
+
+class CyclePlan():
+    """Schedule of loading, splitting and saving in :func:`run_cycle`.
+
+    Index rows of each required data are sorted by the cycle number once, so
+    that the rows of each cycle are sliced without filtering all rows.
+
+    Args:
+        index_cycle_list (list of pandas.DataFrame): Index tables of required
+            data with ``_cycle`` and ``_dest`` columns.
+        cycle_nos (list of int): Cycle numbers in the order of execution.
+        save_nos (list of int): Save numbers of each cycle. 0 if the result
+            is not saved after the cycle.
+
+    Attributes:
+        cycle_nos (list of int): Cycle numbers in the order of execution.
+        save_nos (list of int): Save numbers of each cycle.
+        file_nos (list of list): File numbers to load for each required data
+            and each cycle.
+        indexes (list of pandas.DataFrame): Index tables sorted by the cycle
+            number containing the columns to merge and ``_dest``.
+        bounds (list of numpy.ndarray): Start and end rows of each cycle in
+            the sorted index tables.
+    """
+
+    def __init__(self, index_cycle_list, cycle_nos, save_nos):
+        n_cycle = min(len(cycle_nos), len(save_nos))
+        self.cycle_nos = cycle_nos[:n_cycle]
+        self.save_nos = save_nos[:n_cycle]
+        cycle_nos = self.cycle_nos
+        self.file_nos = []
+        self.indexes = []
+        self.bounds = []
+        for index in index_cycle_list:
+            cycles = index["_cycle"].to_numpy(dtype=float)
+            order = np.argsort(cycles, kind="stable")
+            cycles = cycles[order]
+            starts = np.searchsorted(cycles, cycle_nos, side="left")
+            ends = np.searchsorted(cycles, cycle_nos, side="right")
+
+            index = index.iloc[order].reset_index(drop=True)
+            files = pd.DataFrame({"_cycle": cycles,
+                                  "_file": index["_file"].to_numpy()})
+            files = files.iloc[:ends[-1] if len(ends) > 0 else 0]\
+                .drop_duplicates()
+            counts = np.bincount(
+                np.searchsorted(cycle_nos, files["_cycle"].to_numpy()),
+                minlength=len(cycle_nos))
+            file_nos = np.split(files["_file"].to_numpy(),
+                                np.cumsum(counts)[:-1])
+
+            self.indexes.append(index.drop(
+                columns=["_load", "_mrg_id", "_cycle"], errors="ignore"))
+            self.bounds.append(np.column_stack([starts, ends]))
+            self.file_nos.append([nos.tolist() for nos in file_nos])
+
+    def __len__(self):
+        return len(self.cycle_nos)
+
+    def get_index(self, i, req_no):
+        """Return index rows of required data used in a cycle.
+
+        Args:
+            i (int): Order of the cycle starting from 0.
+            req_no (int): Order of the required data.
+
+        Returns:
+            pandas.DataFrame: Index rows of the cycle. None if the required
+            data is not used in the cycle.
+        """
+        start, end = self.bounds[req_no][i]
+        if start == end:
+            return None
+        return self.indexes[req_no].iloc[start:end]
+
+
+PLAN_CACHE = collections.OrderedDict()
+"""collections.OrderedDict: Cycle plans of recently used index tables."""
+
+PLAN_CACHE_SIZE = 8
+"""int: Max number of cycle plans kept in :data:`PLAN_CACHE`."""
+
+
+def make_cycle_plan(reqs, param, load_splits, data_splits):
+    """Make a cycle plan of :func:`run_cycle` or reuse the cached plan.
+
+    The plan is reused if the index tables of required data, the split
+    depths and the save split depth are the same as a recent plan, e.g. when
+    the same analysis is repeated for observations with the same index
+    shape.
+
+    Args:
+        reqs (list of Data): Required data.
+        param (dict): Parameter dictionary containing ``split_depth``.
+        load_splits (list of int): Split depths to load required data.
+        data_splits (list of int): Split depths of required data in each
+            cycle.
+
+    Returns:
+        CyclePlan: Schedule of the cycles
+    """
     index_list = make_index_list(reqs)
     splits_list = make_splits_list(reqs, load_splits, data_splits)
     validate_splits(splits_list)
 
     index_list = add_splits(index_list, splits_list)
+    key = make_plan_key(index_list, splits_list, param["split_depth"])
+    if key in PLAN_CACHE:
+        PLAN_CACHE.move_to_end(key)
+        return PLAN_CACHE[key]
 
     _, index_data_col_list, index_col_max_list = \
         get_index_columns(index_list, splits_list)
@@ -65,37 +214,33 @@ def run_cycle(Data, reqs, param, load_splits, data_splits, run_mode):
 
     save_no_list = make_save_no_list(load_index, merged_index_data)
 
-    for cycle_no, save_no in tqdm(
-            zip(cycle_no_list, save_no_list), total=len(cycle_no_list),
-            desc="Cyc", leave=False):
+    plan = CyclePlan(index_cycle_list, cycle_no_list, save_no_list)
+    PLAN_CACHE[key] = plan
+    while len(PLAN_CACHE) > PLAN_CACHE_SIZE:
+        PLAN_CACHE.popitem(last=False)
+    return plan
 
-        index_data_cycle_list = [
-            df.loc[df['_cycle'] == cycle_no] for df in index_cycle_list]
-
-        for req, index_data_cycle in zip(reqs, index_data_cycle_list):
-
-            if len(index_data_cycle) == 0:
-                req.clear_data()
-                continue
 
-            index_data_cycle_drop = index_data_cycle.drop(
-                columns=['_load', '_cycle'])
-            file_nos = index_data_cycle_drop['_file'].unique().tolist()
+def make_plan_key(index_list, splits_list, save_split):
+    """Return a hash string of the inputs of a cycle plan.
 
-            req.load(file_nos)
-            index_split = req.info.index
-            index_dest = make_index_dest_cycle(index_split, index_data_cycle)
-            req.split(index=index_dest)
-
-        Data.reqs_are_ready = True
-        if run_mode == 2:
-            Data.run(reqs, param)
-        else:
-            Data.run_mp(reqs, param)
+    Args:
+        index_list (list of pandas.DataFrame): Index tables of required data.
+        splits_list (list of tuple): Split depths of required data.
+        save_split (int): Split depth to save the result.
 
-        if save_no != 0:
-            Data.split(param["split_depth"])
-            Data.save()
+    Returns:
+        str: SHA-1 hex digest string
+    """
+    src = hashlib.sha1(repr((splits_list, save_split)).encode("utf-8"))
+    for index in index_list:
+        for col, dtype in index.dtypes.items():
+            if col == "_key":
+                continue  # temporary column added by add_mrg_id()
+            src.update(repr((str(col), str(dtype))).encode("utf-8"))
+            src.update(pd.util.hash_pandas_object(index[col], index=False)
+                       .to_numpy().tobytes())
+    return src.hexdigest()
 
 
 def make_index_list(reqs):
@@ -156,12 +301,8 @@ def add_splits(index_list, splits_list):
             return
         elif split_value == 0:
             index[col_name] = 1
-        elif split_value == 1:
-            index[col_name] = index.groupby(
-                index_cols[0], sort=False).ngroup() + 1
         else:
-            index[col_name] = index.groupby(
-                index_cols[:split_value], sort=False).ngroup() + 1
+            index[col_name] = group_no(index, index_cols[:split_value]) + 1
 
     for index, splits in zip(index_list, splits_list):
         _, file_split, load_split, _ = splits
@@ -271,12 +412,9 @@ def filter_and_merge_index_data(index_list, splits_list, index_col_max,
         merged_index_data["_save"] = 0
     elif save_split == 0:
         merged_index_data["_save"] = 1
-    elif save_split == 1:
-        merged_index_data["_save"] = merged_index_data.groupby(
-            index_col_max[0], sort=False).ngroup() + 1
     else:
-        merged_index_data["_save"] = merged_index_data.groupby(
-            index_col_max[:save_split], sort=False).ngroup() + 1
+        merged_index_data["_save"] = group_no(
+            merged_index_data, index_col_max[:save_split]) + 1
 
     return merged_index_data
 
@@ -431,13 +569,46 @@ def make_index_dest_cycle(index_split, index_data_cycle):
     """
 
     index_data_cycle = index_data_cycle.drop(
-        columns=["_load", '_mrg_id', '_cycle'])
-    merge_cols = index_data_cycle.columns.difference(['_dest']).tolist()
-
-    index_dest = pd.merge(index_split, index_data_cycle, on=merge_cols,
-                          how='left')
-    index_dest['_dest'].fillna(0, inplace=True)
+        columns=["_load", '_mrg_id', '_cycle'], errors="ignore")
+    merge_cols = [col for col in index_data_cycle.columns if col != '_dest']
+
+    left = hindex.HierIndex.from_frame(index_split, merge_cols)
+    right = hindex.HierIndex.from_frame(index_data_cycle, merge_cols)
+    depth = len(merge_cols)
+    if depth == 0 or right.n_group(depth) != len(right) or \
+            any(col.dtype.kind == "f" for col in left.columns):
+        # duplicated or missing keys
+        index_dest = pd.merge(index_split, index_data_cycle, on=merge_cols,
+                              how='left')
+        index_dest['_dest'].fillna(0, inplace=True)
+    else:
+        found = left.join(right, depth)
+        # group numbers of right are not always in the row order
+        rows = np.empty(len(right), dtype=np.int64)
+        rows[right.group_no(depth)] = np.arange(len(right))
+        dests = index_data_cycle['_dest'].to_numpy()[rows]
+        index_dest = index_split.copy()
+        index_dest['_dest'] = np.where(
+            found >= 0, dests[np.maximum(found, 0)], 0)
     index_dest['_dest'] = index_dest['_dest'].astype(int)
     if "_load" in index_dest.columns:
         index_dest = index_dest.drop(columns=["_load"])
     return index_dest
+
+
+def group_no(index, cols):
+    """Return group numbers in the order of appearance.
+
+    The result is the same as ``groupby(cols, sort=False).ngroup()``.
+
+    Args:
+        index (pandas.DataFrame): Index table.
+        cols (list of str): Column names to group rows.
+
+    Returns:
+        numpy.ndarray: Group number of each row starting from 0
+    """
+    hidx = hindex.HierIndex.from_frame(index, cols)
+    if hidx.is_sorted():
+        return hidx.group_no(len(cols))
+    return index.groupby(rl(cols), sort=False).ngroup().to_numpy()
@@ -0,0 +1,259 @@
+"""
+This module provides a shared memory transport for
+:meth:`slitflow.data.Data.run_mp`.
+
+:class:`numpy.ndarray` data and numerical columns of
+:class:`pandas.DataFrame` are copied into
+:class:`multiprocessing.shared_memory.SharedMemory` blocks instead of being
+pickled to worker processes. Workers attach the blocks and receive views of
+the arrays. Results of :meth:`~slitflow.data.Data.process` are returned in
+new blocks in the same way.
+
+.. caution::
+
+    The blocks are copies of the input arrays, and the original arrays are
+    still referred to by the required data. Therefore, the parent process
+    holds the inputs twice until :meth:`~slitflow.data.Data.run_mp`
+    finishes. The copies are estimated by :func:`get_nbytes` and held in
+    :class:`slitflow.budget.MemoryBudget` in addition to the memory of each
+    process estimated by :data:`slitflow.data.Data.PROCESS_MEMORY_RATE`.
+
+    Shared memory blocks are allocated in ``/dev/shm`` on Linux. Please check
+    that the size of ``/dev/shm`` is large enough for the data, e.g. Docker
+    containers limit it to 64 MB by default.
+
+"""
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+MIN_NBYTES = 1024 * 1024
+"""int: Arrays smaller than this size in bytes are pickled as usual."""
+
+
+class SharedArray():
+    """Descriptor of :class:`numpy.ndarray` placed in a shared memory block.
+
+    Args:
+        name (str): Name of the shared memory block.
+        shape (tuple of int): Shape of the array.
+        dtype (str): Array-protocol type string of the array.
+    """
+
+    def __init__(self, name, shape, dtype):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+
+class SharedFrame():
+    """Descriptor of :class:`pandas.DataFrame` with shared columns.
+
+    Args:
+        columns (pandas.Index): Column names of the table.
+        values (list): List of :class:`SharedArray` or column values that are
+            not placed in shared memory.
+        index (pandas.Index): Row index of the table.
+    """
+
+    def __init__(self, columns, values, index):
+        self.columns = columns
+        self.values = values
+        self.index = index
+
+
+def to_shared(obj, blocks, cache=None):
+    """Replace arrays in an object with shared memory descriptors.
+
+    Lists and tuples are converted recursively. Other objects are returned as
+    they are.
+
+    Args:
+        obj (any): Object to share such as an array, a table or a list of
+            them.
+        blocks (list of SharedMemory): List to append created blocks. The
+            caller should release the blocks by :func:`release`.
+        cache (dict, optional): Dictionary to share the same object only
+            once.
+
+    Returns:
+        any: Object containing :class:`SharedArray` and :class:`SharedFrame`
+    """
+    if cache is None:
+        cache = {}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)([to_shared(x, blocks, cache) for x in obj])
+    if not isinstance(obj, (np.ndarray, pd.DataFrame)):
+        return obj
+    if id(obj) in cache:
+        return cache[id(obj)][1]
+
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.hasobject or obj.nbytes < max(MIN_NBYTES, 1):
+            return obj
+        shm = shared_memory.SharedMemory(create=True, size=obj.nbytes)
+        blocks.append(shm)
+        view = np.ndarray(obj.shape, dtype=obj.dtype, buffer=shm.buf)
+        view[...] = obj
+        del view
+        desc = SharedArray(shm.name, obj.shape, obj.dtype.str)
+    else:
+        values = []
+        for i in range(obj.shape[1]):
+            col = obj.iloc[:, i]
+            if isinstance(col.dtype, np.dtype) and col.dtype.kind in "biufc":
+                values.append(to_shared(col.values, blocks, cache))
+            else:
+                values.append(col.values)
+        desc = SharedFrame(obj.columns, values, obj.index)
+    # keep obj in cache so that its id is not reused
+    cache[id(obj)] = (obj, desc)
+    return desc
+
+
+def get_nbytes(obj, cache=None):
+    """Return bytes that :func:`to_shared` copies into shared memory blocks.
+
+    Args:
+        obj (any): Object to share such as an array, a table or a list of
+            them.
+        cache (dict, optional): Cache of :func:`to_shared`. Objects that
+            are already shared are not counted.
+
+    Returns:
+        int: Total bytes of new blocks
+    """
+    counted = set() if cache is None else set(cache)
+    return count_nbytes(obj, counted)
+
+
+def count_nbytes(obj, counted):
+    """Count bytes of new blocks of :func:`get_nbytes` recursively.
+
+    Args:
+        obj (any): Object to share.
+        counted (set of int): Ids of objects that are already counted. Ids
+            of counted objects are added.
+
+    Returns:
+        int: Total bytes of new blocks
+    """
+    if isinstance(obj, (list, tuple)):
+        return int(np.sum([count_nbytes(x, counted) for x in obj]))
+    if id(obj) in counted:
+        return 0
+    nbytes = 0
+    if isinstance(obj, np.ndarray):
+        if not obj.dtype.hasobject and obj.nbytes >= max(MIN_NBYTES, 1):
+            nbytes = obj.nbytes
+    elif isinstance(obj, pd.DataFrame):
+        for i in range(obj.shape[1]):
+            col = obj.iloc[:, i]
+            if isinstance(col.dtype, np.dtype) and col.dtype.kind in "biufc":
+                nbytes += count_nbytes(col.values, counted)
+    counted.add(id(obj))
+    return int(nbytes)
+
+
+def from_shared(obj, blocks, copy=False):
+    """Restore arrays from shared memory descriptors.
+
+    Args:
+        obj (any): Object returned from :func:`to_shared`.
+        blocks (list of SharedMemory): List to append attached blocks. The
+            caller should release the blocks by :func:`release`.
+        copy (bool, optional): Whether to copy arrays from the blocks. If
+            False, arrays are views of the blocks. Defaults to False.
+
+    Returns:
+        any: Object containing :class:`numpy.ndarray` and
+        :class:`pandas.DataFrame`
+    """
+    if isinstance(obj, (list, tuple)):
+        return type(obj)([from_shared(x, blocks, copy) for x in obj])
+    if isinstance(obj, SharedArray):
+        shm = shared_memory.SharedMemory(name=obj.name)
+        blocks.append(shm)
+        arr = np.ndarray(obj.shape, dtype=np.dtype(obj.dtype),
+                         buffer=shm.buf)
+        if copy:
+            arr = arr.copy()
+        return arr
+    if isinstance(obj, SharedFrame):
+        values = [from_shared(x, blocks, copy) for x in obj.values]
+        df = pd.DataFrame(dict(enumerate(values)), index=obj.index,
+                          copy=False)
+        df.columns = obj.columns
+        return df
+    return obj
+
+
+def release(blocks, unlink=False):
+    """Close shared memory blocks.
+
+    Blocks still referred to by arrays are not closed here. They are closed
+    when the arrays are deleted.
+
+    Args:
+        blocks (list of SharedMemory): Blocks to close.
+        unlink (bool, optional): Whether to destroy the blocks. Only the
+            process that owns the data should unlink. Defaults to False.
+    """
+    for shm in blocks:
+        try:
+            shm.close()
+        except BufferError:
+            pass  # exported views still exist
+        if unlink:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+    blocks.clear()
+
+
+def run_process(process, reqs, param):
+    """Execute process function with shared memory inputs and output.
+
+    This function is submitted to worker processes by
+    :meth:`slitflow.data.Data.run_mp`.
+
+    Args:
+        process (function): :meth:`~slitflow.data.Data.process` function.
+        reqs (list): List of required data converted by :func:`to_shared`.
+        param (dict): Parameter dictionary.
+
+    Returns:
+        any: Result converted by :func:`to_shared`. The blocks should be
+        restored by :func:`receive`.
+    """
+    in_blocks = []
+    out_blocks = []
+    try:
+        result = process(from_shared(reqs, in_blocks), param)
+        shared = to_shared(result, out_blocks)
+        del result
+    except BaseException:
+        release(out_blocks, unlink=True)
+        raise
+    finally:
+        release(in_blocks)
+    release(out_blocks)
+    return shared
+
+
+def receive(shared):
+    """Restore a result of :func:`run_process` and destroy its blocks.
+
+    Args:
+        shared (any): Result of :func:`run_process`.
+
+    Returns:
+        any: Restored result copied from the shared memory
+    """
+    blocks = []
+    try:
+        return from_shared(shared, blocks, copy=True)
+    finally:
+        release(blocks, unlink=True)
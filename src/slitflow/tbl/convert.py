@@ -48,7 +48,7 @@ class SortCols(Table):
         Returns:
             pandas.DataFrame: Sorted table
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         df = df[param["new_cols"]]
         df = df.sort_values(param["new_cols"]).reset_index(drop=True)
         return df
@@ -110,7 +110,7 @@ class AddColumn(Table):
         Returns:
             pandas.DataFrame:  The table with the new column.
         """
-        df = reqs[0].copy()
+        df = reqs[0].copy(deep=False)
 
         if isinstance(param["col_name"], list):
             for col_name, col_values in zip(param["col_name"],
@@ -181,7 +181,7 @@ class Obs2Depth(Table):
         cols = list(reqs[0].columns)
         dfs = []
         for i, req in enumerate(reqs):
-            df = req.copy()
+            df = req.copy(deep=False)
             df[param["col_name"]] = i + 1
             dfs.append(df)
         df_mrg = pd.concat(dfs)
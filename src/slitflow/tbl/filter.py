@@ -60,7 +60,7 @@ class CutOffPixelQuantile(Table):
         Returns:
             pandas.DataFrame: Selected table
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         intensity = df[param["calc_col"]].values
         if ("ignore_zero", True) in param.items():
             intensity = intensity[np.nonzero(intensity)]
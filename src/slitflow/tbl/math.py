@@ -81,7 +81,7 @@ class EvalOneCol(Table):
         Returns:
             pandas.DataFrame: Table containing calculated columns
         """
-        df = reqs[0].copy()
+        df = reqs[0].copy(deep=False)
         for calc_col, new_col in zip(param["calc_cols"], param["new_cols"]):
             x = df[calc_col]
             df[new_col] = eval(param["eval"], {}, {"x": x})
@@ -169,8 +169,8 @@ class EvalTwoCols(Table):
         Returns:
             Table: Calculated column data
         """
-        df1 = reqs[0].copy()
-        df2 = reqs[1].copy()
+        df1 = reqs[0]
+        df2 = reqs[1]
         x = df1[param["calc_cols"][0]].values
         y = df2[param["calc_cols"][1]].values
         df = df1[param["index_cols"]]
@@ -217,7 +217,7 @@ class Centering(Table):
             pandas.DataFrame: Table containing shifted columns
 
         """
-        df = reqs[0].copy()
+        df = reqs[0].copy(deep=False)
         if len(param["index_cols"]) > 0:
             grouped = df.groupby(rl(param["index_cols"]), group_keys=False)
             df_new = grouped.apply(lambda x: centering_by_edge(
@@ -295,7 +295,7 @@ class AddGauss(Table):
         Returns:
             numpy.ndarray: Table with Gauss values
         """
-        df = reqs[0].copy()
+        df = reqs[0].copy(deep=False)
         counts = np.round(np.array(param["ratio"]) * len(df)).astype(np.int32)
         rnds = np.empty(0)
         for baseline, sigma, count in zip(param["baselines"], param["sigmas"],
@@ -60,7 +60,7 @@ class MaskFromParam(Table):
         Returns:
             pandas.DataFrame: A table containing the mask column.
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         index_cols = param.get("index_cols")
         mask_col = param.get("mask_col", "mask")
         indexes_list = param.get("index", [])
@@ -94,7 +94,7 @@ class Mean(Table):
             pandas.DataFrame: Summarized table containing average, std, sem
             and count columns
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         col_names = df.columns
         if len(param["index_cols"]) > 0:
             col_names = param["index_cols"] + [param["calc_col"]]
@@ -199,7 +199,7 @@ class Test(Table):
             pandas.DataFrame: Test result table
         """
         sp = importlib.import_module("scikit_posthocs")
-        df = reqs[0].copy()
+        df = reqs[0]
         df = df[[param["sample_col"], param["replicate_col"], param["calc_col"]]]
         grouped = df.groupby(param["sample_col"])
         dfs = list(list(zip(*grouped))[1])
@@ -1,41 +1,293 @@
+import os
+import gzip
+import sqlite3
+import zipfile
+import importlib  # for pyarrow and zstandard
+import contextlib
+
 import numpy as np
 import pandas as pd
 
 from ..data import Data
 from .. import setindex
+from .. import budget
+from .. import metrics
+from .. import catalog
+from .. import name as nm
+from ..hindex import HierIndex
+
+TABLE_EXTS = {"csv": ".csv", "csv.gz": ".csv.gz", "csv.zst": ".csv.zst",
+              "npz": ".npz", "feather": ".feather", "sqlite": ".db"}
+"""dict: File extension of each table format."""
+
+CSV_COMPRESSIONS = {".gz": 6, ".zst": 3}
+"""dict: Compression level of each extension of compressed CSV files.
+".zst" requires the zstandard package."""
+
+CSV_CHUNK_ROWS = 100000
+"""int: Number of rows of each chunk written by :func:`write_csv`."""
+
+MAX_RANGES = 200
+"""int: Max number of index ranges in one SQL query."""
 
 
 class Table(Data):
     """Table Data class using pandas.DataFrame saved as CSV files.
 
+    Tables can also be saved in binary formats that keep the exact values
+    and can be loaded column by column. The format is selected by
+    ``param["table_format"]`` of each task or :attr:`TABLE_FORMAT` for all
+    tasks.
+
+    * ``csv`` : CSV text file. This is the default format.
+    * ``csv.gz`` : gzip-compressed CSV file.
+    * ``csv.zst`` : Zstandard-compressed CSV file. zstandard is required.
+    * ``npz`` : NumPy ``.npz`` file containing one array per column.
+    * ``feather`` : Feather file. pyarrow is required.
+    * ``sqlite`` : One SQLite database for all split files of an
+      observation. Rows are indexed by the index columns, and only the
+      rows of the selected files are read by :meth:`load`.
+
+    The selected format is saved as the ``table_format`` parameter of the
+    info file. Data files are loaded according to the file extension, so
+    that existing CSV files can be loaded regardless of the format.
+
+    CSV files are parsed by the pyarrow engine of :func:`pandas.read_csv`
+    if pyarrow is installed. Float columns are written with the precision
+    of the column type, e.g. float32 columns are written with the shortest
+    digits of float32 values. ``param["float_precision"]`` limits the
+    number of significant digits of all float columns.
+
     See also :class:`~slitflow.data.Data` for properties and methods.
     Concrete subclass is mainly in :mod:`slitflow.tbl`,
     :mod:`slitflow.trj` and :mod:`slitflow.loc`.
 
+    Attributes:
+        TABLE_FORMAT (str): Default table format of tasks without
+            ``param["table_format"]``.
+        FLOAT_PRECISION (int): Default number of significant digits of
+            float values in CSV files of tasks without
+            ``param["float_precision"]``. None for the exact values.
     """
     EXT = ".csv"
+    TABLE_FORMAT = "csv"
+    FLOAT_PRECISION = None
 
     def __init__(self, info_path=None):
         super().__init__(info_path)
 
-    def load_data(self, path):
-        """Load CSV file as :class:`pandas.DataFrame`.
+    def get_ext(self):
+        """Return the file extension of the table format of this data.
+
+        Returns:
+            str: Extension of data files with "."
+        """
+        table_format = self.info.get_param_value("table_format")
+        if table_format is None:
+            return self.EXT
+        return TABLE_EXTS[table_format]
+
+    def set_format(self, param):
+        """Set the table format from ``param["table_format"]``.
+
+        The float precision of CSV files is set from
+        ``param["float_precision"]``.
+
+        Args:
+            param (dict): Parameters of the task.
+        """
+        table_format = param.get("table_format", self.TABLE_FORMAT)
+        if table_format not in TABLE_EXTS:
+            raise Exception("table_format should be one of "
+                            + ", ".join(TABLE_EXTS) + ".")
+        precision = param.get("float_precision", self.FLOAT_PRECISION)
+        if not table_format.startswith("csv") or precision is None:
+            self.info.delete_param("float_precision")
+        elif int(precision) < 1:
+            raise Exception("float_precision should be a positive integer.")
+        else:
+            self.info.add_param("float_precision", int(precision), "int",
+                                "Significant digits of float values")
+        if table_format == "csv":
+            self.info.delete_param("table_format")
+        else:
+            self.info.add_param("table_format", table_format, "str",
+                                "File format of data tables")
+
+    def save(self, clear=True):
+        if self.info.get_param_value("table_format") is None:
+            self.set_format(self.info.get_param_dict())
+        if self.get_ext() != TABLE_EXTS["sqlite"]:
+            super().save(clear)
+            return
+        if len(self.data) == 0:
+            return
+        self.info.data_paths = self.make_data_paths()
+        path = self.info.data_paths[0]
+        with metrics.measure(self, "save"):
+            dfs = [df.set_axis(self.info.get_column_name("all"), axis=1)
+                   for df in self.data if df is not None]
+            if len(dfs) > 0:
+                index_cols = self.info.get_column_name("index")
+                save_db(path, pd.concat(dfs),
+                        index_cols[:self.info.split_depth()], index_cols)
+        catalog.add(path)
+        self.info.metrics["bytes_written"] += metrics.get_file_size([path])
+        self.info.save()
+        if clear:
+            self.clear_data()
+            self.info.index["_split"] = 0
+
+    def find_data_paths(self):
+        """Return paths to the saved data files.
+
+        If no file has the extension of the table format, CSV files with and
+        without compression are searched, so that compressed CSV files are
+        loaded regardless of ``param["table_format"]``.
+
+        Returns:
+            list of str: List of paths to the data files
+        """
+        ext = self.get_ext()
+        paths = nm.load_data_paths(self.info, ext)
+        csv_exts = [TABLE_EXTS[table_format] for table_format in TABLE_EXTS
+                    if table_format.startswith("csv")]
+        if len(paths) > 0 or ext not in csv_exts:
+            return paths
+        for csv_ext in csv_exts:
+            paths = nm.load_data_paths(self.info, csv_ext)
+            if len(paths) > 0:
+                break
+        return paths
+
+    def make_data_paths(self):
+        if self.get_ext() == TABLE_EXTS["sqlite"]:
+            return [self.get_db_path()]
+        return super().make_data_paths()
+
+    def get_db_path(self):
+        """Return the path to the SQLite database of this observation.
+
+        Returns:
+            str: Path to the database file
+        """
+        return os.path.splitext(self.info.path)[0] + TABLE_EXTS["sqlite"]
+
+    def load_from_file(self):
+        if self.get_ext() != TABLE_EXTS["sqlite"]:
+            if not hasattr(self.info, "data_paths"):
+                self.info.data_paths = self.find_data_paths()
+            super().load_from_file()
+            return
+        path = self.get_db_path()
+        self.info.data_paths = [path]
+        index = self.info.index
+        key_cols = self.info.get_column_name("index")[
+            :self.info.split_depth()]
+        if len(index) == 0 or len(key_cols) == 0 or \
+                "_file" not in index.columns:
+            keys = None
+            n_load = n_file = 1
+        else:
+            keys = index.drop_duplicates("_file")
+            n_file = len(keys)
+            keys = keys[keys["_file"].isin(self.info.file_nos())]\
+                .sort_values("_file")[key_cols]
+            n_load = len(keys)
+        nbytes = self.get_file_nbytes(path) * n_load / max(n_file, 1)
+        budget.MemoryBudget(self.memory_limit / 100).check(nbytes)
+        columns = self.info.load_columns
+        if columns is not None:
+            columns = [col for col in self.info.get_column_name("all")
+                       if col in columns or col in key_cols]
+        if os.path.exists(path):
+            self.data = load_db(path, columns, key_cols, keys,
+                                n_load == n_file)
+        else:
+            self.data = []
+        self.data = [df.astype({col: type for col, type
+                                in self.info.get_column_type().items()
+                                if col in df.columns}) for df in self.data]
+        self.info.metrics["bytes_read"] += int(nbytes)
+        self.split(self.info.load_split_depth)
+        self.keep_data()
+
+    def load_data(self, path, columns=None):
+        """Load a data file as :class:`pandas.DataFrame`.
+
+        The file format is selected by the file extension.
+
+        Args:
+            path (str): Path to the data file.
+            columns (list of str, optional): Column names to load. Defaults
+                to :attr:`slitflow.info.Info.load_columns`. All columns are
+                loaded if None.
+
+        Returns:
+            pandas.DataFrame: Loaded table
         """
-        return pd.read_csv(path, dtype=self.info.get_column_type())
+        if columns is None:
+            columns = self.info.load_columns
+        dtype = self.info.get_column_type()
+        if columns is not None:
+            # keep the column order of the file
+            columns = [col for col in self.info.get_column_name("all")
+                       if col in columns]
+            dtype = {col: dtype[col] for col in columns}
+        table_format = get_table_format(path)
+        if table_format == "npz":
+            with np.load(path, allow_pickle=False) as npz:
+                if columns is None:
+                    columns = list(npz.keys())
+                df = pd.DataFrame({col: npz[col] for col in columns},
+                                  columns=columns)
+        elif table_format == "feather":
+            df = pd.read_feather(path, columns=columns)
+        else:
+            return read_csv(path, columns, dtype)
+        return df.astype({col: type for col, type in dtype.items()
+                          if col in df.columns})
 
     def save_data(self, df, path):
-        """Save :class:`pandas.DataFrame` data into CSV file.
+        """Save :class:`pandas.DataFrame` data into a file.
+
+        The file format is selected by the file extension. CSV files are
+        written by :func:`write_csv`.
         """
         df = df.set_axis(self.info.get_column_name("all"), axis=1)
-        df.to_csv(path, index=False)
+        table_format = get_table_format(path)
+        if table_format == "npz":
+            arrays = {}
+            for col in df.columns:
+                arrays[col] = df[col].to_numpy()
+                if arrays[col].dtype == object:
+                    arrays[col] = arrays[col].astype(str)
+            save_npz(path, arrays)
+        elif table_format == "feather":
+            df.reset_index(drop=True).to_feather(path)
+        else:
+            float_format = None
+            precision = self.info.get_param_value("float_precision")
+            if precision is not None:
+                float_format = "%." + str(precision) + "g"
+            write_csv(path, cast_floats(df, self.info.get_column_type()),
+                      float_format)
 
     def split_data(self):
         """Split data table according to info.index.
+
+        Data rows are moved to the destination by row positions calculated
+        from the index columns. See :func:`split_tables`.
         """
         df_index = self.info.index
         index_cols = [col for col in df_index.columns if col not in
                       ["_file", "_split", "_dest", "_keep", "_load"]]
         self.data = [df for df in self.data if df is not None]
+        if len(self.data) > 0:
+            data = split_tables(self.data, df_index, index_cols)
+            if data is not None:
+                self.data = data
+                return
         if len(self.data) == 0:
             # make None list
             dest_abs = df_index["_dest"].abs().values
@@ -76,6 +328,80 @@ class Table(Data):
         setindex.from_data(self)
 
 
+def split_tables(dfs, df_index, index_cols):
+    """Split tables according to the destination of index rows.
+
+    The result is the same as merging the index table with the data table
+    and grouping rows by ``_dest``. Instead, each data row is mapped to the
+    index row once and rows are reordered by one stable sort of integer
+    keys, so that the concatenated table is copied only once. Each result
+    table is a slice of the sorted table. If the data rows are already in
+    the order of the destinations, the tables are just sliced, and the
+    input list is returned if it is already split in the same way.
+
+    Args:
+        dfs (list of pandas.DataFrame): Data tables to split.
+        df_index (pandas.DataFrame): Index table with the ``_dest`` column.
+        index_cols (list of str): Index column names.
+
+    Returns:
+        list of pandas.DataFrame: Split tables. Destinations with negative
+        numbers are None. None if the index has no index column, duplicated
+        rows or rows without data; these cases are split by merging.
+    """
+    if len(index_cols) == 0 or \
+            any([col not in df.columns for df in dfs for col in index_cols]):
+        return None
+    n_depth = len(index_cols)
+    hindex = HierIndex.from_frame(df_index, index_cols)
+    index_groups = hindex.group_no(n_depth)
+    n_group = hindex.n_group(n_depth)
+    if n_group != len(df_index) or np.any(index_groups < 0):
+        return None
+    dests = np.zeros(n_group, dtype=np.int64)
+    dests[index_groups] = df_index["_dest"].to_numpy()
+    data_hindex = HierIndex(index_cols, [
+        np.concatenate([df[col].to_numpy() for df in dfs])
+        for col in index_cols])
+    groups = data_hindex.join(hindex, n_depth)
+    if not np.all(np.isin(np.flatnonzero(dests), groups)):
+        return None  # merging makes rows of missing values
+    row_dests = np.where(groups >= 0, dests[groups], 0)
+
+    # rows are sorted by the destination and the index values
+    sort_keys = np.abs(row_dests) * (n_group + 1) + groups + 1
+    is_sorted = bool(np.all(row_dests != 0)) and \
+        bool(np.all(np.diff(sort_keys) >= 0))
+    edges = np.flatnonzero(np.diff(row_dests)) + 1
+    if is_sorted:
+        lens = np.diff(np.concatenate([[0], edges, [len(row_dests)]]))
+        if len(dfs) == len(lens) and \
+                all([len(df) == n for df, n in zip(dfs, lens)]) and \
+                all([list(df.columns[:n_depth]) == index_cols
+                     for df in dfs]):
+            return [None if dest < 0 else df for df, dest
+                    in zip(dfs, row_dests[np.concatenate([[0], edges])])]
+    df_data = pd.concat(dfs) if len(dfs) > 1 else dfs[0]
+    cols = index_cols + [col for col in df_data.columns
+                         if col not in index_cols]
+    if list(df_data.columns) != cols:
+        df_data = df_data[cols]
+    if not is_sorted:
+        order = np.flatnonzero(row_dests != 0)
+        order = order[np.argsort(sort_keys[order], kind="stable")]
+        df_data = df_data.take(order)
+        row_dests = row_dests[order]
+        edges = np.flatnonzero(np.diff(row_dests)) + 1
+    elif df_data is dfs[0]:
+        df_data = df_data.copy(deep=False)
+    # set row labels without copying columns
+    df_data.index = pd.RangeIndex(len(df_data))
+    starts = np.concatenate([[0], edges]).astype(int)
+    stops = np.concatenate([edges, [len(row_dests)]]).astype(int)
+    return [None if row_dests[start] < 0 else df_data.iloc[start:stop]
+            for start, stop in zip(starts, stops)] if len(row_dests) else []
+
+
 def merge_different_index(self, req_no):
     """Merge the index table to the split result data.
 
@@ -121,3 +447,250 @@ def merge_overlap_index(self, req_no, on_col_name):
         dfs.append(df_mrg.fillna(method="ffill").astype(
             self.info.get_column_type()).reset_index(drop=True))
     self.data = dfs
+
+
+def save_npz(path, arrays):
+    """Save arrays into a NumPy ``.npz`` file.
+
+    The file is the same as :func:`numpy.savez`, but any string can be used
+    as an array name, e.g. "file" that is an argument of
+    :func:`numpy.savez`.
+
+    Args:
+        path (str): Path to the ``.npz`` file.
+        arrays (dict): Array name as a key and :class:`numpy.ndarray` as a
+            value.
+    """
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED,
+                         allowZip64=True) as zf:
+        for name, arr in arrays.items():
+            with zf.open(name + ".npy", "w", force_zip64=True) as f:
+                np.lib.format.write_array(f, np.asanyarray(arr),
+                                          allow_pickle=False)
+
+
+def save_db(path, df, key_cols, index_cols):
+    """Save a table into the SQLite database replacing the same files.
+
+    Rows of the database having the same values of ``key_cols`` as the new
+    table are deleted before the new rows are appended. If the columns are
+    changed, the old table is deleted.
+
+    Args:
+        path (str): Path to the database file.
+        df (pandas.DataFrame): Table to save.
+        key_cols (list of str): Index column names of the split depth.
+        index_cols (list of str): Index column names to create the
+            database index.
+    """
+    with contextlib.closing(sqlite3.connect(path)) as con:
+        with con:
+            cols = [row[1] for row in con.execute(
+                "PRAGMA table_info(data)")]
+            if len(cols) > 0 and cols != list(df.columns):
+                con.execute("DROP TABLE data")
+            elif len(cols) > 0 and len(key_cols) > 0:
+                keys = df[key_cols].drop_duplicates().to_numpy()
+                for where, values in make_range_where(key_cols, keys):
+                    con.execute("DELETE FROM data WHERE " + where, values)
+            elif len(cols) > 0:
+                con.execute("DELETE FROM data")
+        df.to_sql("data", con, if_exists="append", index=False)
+        if len(index_cols) > 0:
+            with con:
+                con.execute("CREATE INDEX IF NOT EXISTS data_index ON data ("
+                            + ", ".join(quote(index_cols)) + ")")
+
+
+def load_db(path, columns, key_cols, keys, is_all):
+    """Load tables of the selected files from the SQLite database.
+
+    Args:
+        path (str): Path to the database file.
+        columns (list of str): Column names to load. All columns are loaded
+            if None.
+        key_cols (list of str): Index column names of the split depth.
+        keys (pandas.DataFrame): Index values of ``key_cols`` of the
+            selected files in the order of file numbers. None if the data is
+            not split.
+        is_all (bool): Whether all files are selected.
+
+    Returns:
+        list of pandas.DataFrame: Table of each selected file
+    """
+    select = "SELECT " + ("*" if columns is None else
+                          ", ".join(quote(columns))) + " FROM data"
+    if keys is not None and len(keys) == 0:
+        return []
+    with contextlib.closing(sqlite3.connect(path)) as con:
+        if is_all or keys is None:
+            df = pd.read_sql_query(select + " ORDER BY rowid", con)
+        else:
+            df = pd.concat([pd.read_sql_query(
+                select + " WHERE " + where + " ORDER BY rowid", con,
+                params=values) for where, values
+                in make_range_where(key_cols, keys.to_numpy())])
+    if keys is None:
+        return [df]
+    groups = {}
+    by = key_cols[0] if len(key_cols) == 1 else key_cols
+    for key, group in df.groupby(by, sort=False):
+        key = key if isinstance(key, tuple) else (key,)
+        groups[key] = group.reset_index(drop=True)
+    empty = df.iloc[:0]
+    return [groups.get(key, empty)
+            for key in keys.itertuples(index=False, name=None)]
+
+
+def make_range_where(cols, keys):
+    """Make SQL conditions selecting rows by ranges of index values.
+
+    Consecutive values of the last column with the same upper values are
+    merged into one ``BETWEEN`` range, so that the database index is used.
+
+    Args:
+        cols (list of str): Index column names.
+        keys (numpy.ndarray): 2D array of index values to select.
+
+    Yields:
+        tuple: WHERE clause string and list of parameter values. A clause
+        contains at most :data:`MAX_RANGES` ranges.
+    """
+    keys = keys[np.lexsort(keys.T[::-1])]
+    if len(keys) == 0:
+        return
+    is_same = np.all(keys[1:, :-1] == keys[:-1, :-1], axis=1) & \
+        (keys[1:, -1] - keys[:-1, -1] == 1)
+    starts = np.concatenate([[0], np.flatnonzero(~is_same) + 1])
+    ends = np.append(starts[1:], len(keys)) - 1
+    names = quote(cols)
+    term = "(" + "".join([name + " = ? AND " for name in names[:-1]]) \
+        + names[-1] + " BETWEEN ? AND ?)"
+    for i in range(0, len(starts), MAX_RANGES):
+        terms = []
+        values = []
+        for start, end in zip(starts[i:i + MAX_RANGES],
+                              ends[i:i + MAX_RANGES]):
+            terms.append(term)
+            values.extend(keys[start].tolist() + [keys[end, -1].item()])
+        yield " OR ".join(terms), values
+
+
+def quote(names):
+    """Return quoted SQL identifiers.
+
+    Args:
+        names (list of str): Column names.
+
+    Returns:
+        list of str: Column names enclosed in double quotes
+    """
+    return ['"' + name.replace('"', '""') + '"' for name in names]
+
+
+def read_csv(path, columns=None, dtype=None, engine=None):
+    """Read a CSV file as :class:`pandas.DataFrame`.
+
+    The pyarrow engine is used if pyarrow is installed. The compression is
+    selected by the extension in :data:`CSV_COMPRESSIONS`.
+
+    Args:
+        path (str): Path to the CSV file.
+        columns (list of str, optional): Column names to load. All columns
+            are loaded if None.
+        dtype (dict, optional): Column types of the table.
+        engine (str, optional): Parser engine of :func:`pandas.read_csv`.
+            Defaults to "pyarrow" if pyarrow is installed, otherwise "c".
+
+    Returns:
+        pandas.DataFrame: Loaded table
+    """
+    if engine is None:
+        try:
+            importlib.import_module("pyarrow")
+            engine = "pyarrow"
+        except ModuleNotFoundError:
+            engine = "c"
+    compression = {".gz": "gzip", ".zst": "zstd"}.get(
+        os.path.splitext(path)[1])
+    return pd.read_csv(path, usecols=columns, dtype=dtype, engine=engine,
+                       compression=compression)
+
+
+def write_csv(path, df, float_format=None, chunk_rows=None):
+    """Write a table into a CSV file.
+
+    Rows are formatted and written chunk by chunk, so that the text of the
+    whole table is not kept in memory. Files with the extensions in
+    :data:`CSV_COMPRESSIONS` are compressed.
+
+    Args:
+        path (str): Path to the CSV file.
+        df (pandas.DataFrame): Table to save.
+        float_format (str, optional): Format string of float values such as
+            "%.6g". Defaults to the exact values.
+        chunk_rows (int, optional): Number of rows of each chunk. Defaults
+            to :data:`CSV_CHUNK_ROWS`.
+    """
+    if chunk_rows is None:
+        chunk_rows = CSV_CHUNK_ROWS
+    ext = os.path.splitext(path)[1]
+    if ext == ".gz":
+        f = gzip.open(path, "wt", compresslevel=CSV_COMPRESSIONS[ext],
+                      newline="")
+    elif ext == ".zst":
+        zstandard = importlib.import_module("zstandard")
+        f = zstandard.open(path, "wt", newline="", cctx=zstandard
+                           .ZstdCompressor(level=CSV_COMPRESSIONS[ext]))
+    else:
+        f = open(path, "w", newline="")
+    with f:
+        df.to_csv(f, index=False, float_format=float_format,
+                  chunksize=chunk_rows)
+
+
+def get_table_format(path):
+    """Return the table format of a data file from the file extension.
+
+    Args:
+        path (str): Path to the data file.
+
+    Returns:
+        str: Key of :data:`TABLE_EXTS`. "csv" if the extension is unknown.
+    """
+    # longer extensions first to find ".csv.gz" before ".gz"
+    for table_format in sorted(TABLE_EXTS, key=lambda x: -len(TABLE_EXTS[x])):
+        if path.endswith(TABLE_EXTS[table_format]):
+            return table_format
+    return "csv"
+
+
+def cast_floats(df, types):
+    """Cast float columns to the float types of the column information.
+
+    Float values are written into CSV files with the precision of the
+    column type, and loaded values are the same as before casting because
+    tables are loaded with the column types.
+
+    Args:
+        df (pandas.DataFrame): Table to save.
+        types (dict): Column types from
+            :meth:`slitflow.info.Info.get_column_type`.
+
+    Returns:
+        pandas.DataFrame: Table with the cast columns. The input table if no
+        column is cast.
+    """
+    casts = {}
+    for col, type in types.items():
+        if col not in df.columns or df[col].dtype.kind != "f":
+            continue
+        try:
+            dtype = np.dtype(type)
+        except TypeError:
+            continue
+        if dtype.kind == "f" and dtype != df[col].dtype:
+            casts[col] = dtype
+    if len(casts) == 0:
+        return df
+    return df.astype(casts)
@@ -40,7 +40,7 @@ class StepAtLeast(Table):
         Returns:
             pandas.DataFrame: Selected trajectory table
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         grouped = df.groupby(rl(param["index_cols"]))
         df = grouped.filter(lambda x: len(x) > param["step"])
         return df.reset_index(drop=True)
@@ -85,7 +85,7 @@ class StepRange(Table):
         Returns:
             pandas.DataFrame: Selected trajectory table
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         grouped = df.groupby(rl(param["index_cols"]))
         df = grouped.filter(lambda x: len(x) > param["step_range"][0])
         grouped = df.groupby(rl(param["index_cols"]))
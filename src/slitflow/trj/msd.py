@@ -62,6 +62,13 @@ class Each(Table):
             "list of str", "MSD calculation columns")
         self.info.set_split_depth(param["split_depth"])
 
+    def get_req_columns(self, req_no, req_info):
+        """Load only index and X,Y-coordinate columns.
+        """
+        length_unit = req_info.get_param_value("length_unit")
+        return req_info.get_column_name("index") + \
+            ["x_" + length_unit, "y_" + length_unit]
+
     @ staticmethod
     def process(reqs, param):
         """Mean Square Displacement of each trajectory.
@@ -76,7 +83,7 @@ class Each(Table):
         Returns:
             pandas.DataFrame: Mean square displacement with time interval
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         grouped = df.groupby(rl(param["index_cols"]), as_index=False,
                              group_keys=False)
         df_new = grouped.apply(lambda x: calc_msd(
@@ -85,6 +92,75 @@ class Each(Table):
         df = pd.concat([df_index, df_new], axis=1)
         return df
 
+    @ staticmethod
+    def process_batch(reqs_list, param):
+        """Mean Square Displacement of trajectories in multiple splits.
+
+        All trajectories are calculated at once by :func:`calc_msd_array`.
+
+        Args:
+            reqs_list (list of list): List of ``reqs`` of :meth:`process`.
+            param (dict): Parameters of :meth:`process`.
+
+        Returns:
+            list of pandas.DataFrame: Mean square displacement with time
+            interval of each split
+        """
+        dfs = [reqs[0] for reqs in reqs_list]
+        lens = [len(df) for df in dfs]
+        df = pd.concat(dfs, ignore_index=True)
+        df["_batch"] = np.repeat(np.arange(len(dfs)), lens)
+        df = df.sort_values(
+            ["_batch"] + param["index_cols"], kind="mergesort")
+        keys = df[["_batch"] + param["index_cols"]].values
+        is_new = np.any(keys[1:] != keys[:-1], axis=1)
+        group_ids = np.concatenate([[0], np.cumsum(is_new)])
+        lags, msds = calc_msd_array(
+            group_ids, df[param["calc_cols"]].values.astype(np.float64))
+
+        results = []
+        start = 0
+        for req_df, n in zip(dfs, lens):
+            cols = {col: req_df[col].values for col in param["index_cols"]}
+            cols["interval"] = lags[start:start + n] * param["interval"]
+            cols["msd"] = msds[start:start + n]
+            results.append(pd.DataFrame(cols))
+            start += n
+        return results
+
+
+def calc_msd_array(group_ids, coords):
+    """Calculate mean square displacements of all trajectories at once.
+
+    Args:
+        group_ids (numpy.ndarray): Trajectory number starting from 0 of each
+            row. Rows of the same trajectory should be contiguous.
+        coords (numpy.ndarray): Coordinates with the shape of (rows,
+            dimensions).
+
+    Returns:
+        Tuple containing
+
+        - lags (numpy.ndarray): Lag step of each row. The i-th row of each
+          trajectory has the lag of i.
+        - msds (numpy.ndarray): Mean square displacement of each lag
+    """
+    n_row = len(group_ids)
+    if n_row == 0:
+        return np.zeros(0), np.zeros(0)
+    lens = np.bincount(group_ids)
+    starts = np.concatenate([[0], np.cumsum(lens)[:-1]])
+    lags = np.arange(n_row) - starts[group_ids]
+    msds = np.zeros(n_row)
+    for lag in range(1, np.max(lens)):
+        pos = np.where(lags < lens[group_ids] - lag)[0]
+        sd = np.sum((coords[pos + lag] - coords[pos])**2, axis=1)
+        sums = np.bincount(group_ids[pos], sd, minlength=len(lens))
+        to_set = lags == lag
+        groups = group_ids[to_set]
+        msds[to_set] = sums[groups] / (lens[groups] - lag)
+    return lags.astype(np.float64), msds
+
 
 def calc_msd(df, param):
     """This function is used in :meth:`pandas.core.groupby.GroupBy.apply`
@@ -164,7 +240,7 @@ class FitAnom(Table):
         Returns:
             pandas.DataFrame: List of fitting parameters
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         if len(param["index_cols"]) > 0:
             grouped = df.groupby(rl(param["index_cols"]))
             df = grouped.apply(lambda x: fit_msd_anom(x, param))
@@ -248,7 +324,7 @@ class ModelAnom(Table):
         Returns:
             pandas.DataFrame: Model curve table
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         if len(param["index_cols"]) > 0:
             dfs = []
             for _, row in df.groupby(rl(param["index_cols"])):
@@ -317,7 +393,7 @@ class FitSimple(Table):
         Returns:
             pandas.DataFrame: List of diffusion coefficient
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         if len(param["index_cols"]) > 0:
             grouped = df.groupby(rl(param["index_cols"]))
             df = grouped.apply(lambda x: fit_msd_simple(x, param))
@@ -419,7 +495,7 @@ class ModelSimple(Table):
             pandas.DataFrame: Model curve Table
 
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         if len(param["index_cols"]) > 0:
             dfs = []
             for _, row in df.groupby(rl(param["index_cols"])):
@@ -489,7 +565,7 @@ class DfromDeltaV(Table):
         Returns:
             pandas.DataFrame: Diffusion coefficient of each trajectory
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         grouped = df.groupby(rl(param["index_cols"]))
         df = grouped.apply(lambda x: calc_delta_v(x, param))
         return df.reset_index()
@@ -568,7 +644,7 @@ class FitConfSaxton(Table):
         Returns:
             pandas.DataFrame: List of fitting parameters
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         if len(param["index_cols"]) > 0:
             grouped = df.groupby(rl(param["index_cols"]))
             df = grouped.apply(lambda x: fit_msd_confs(x, param))
@@ -664,7 +740,7 @@ class ModelConfSaxton(Table):
         Returns:
             pandas.DataFrame: Model curve table
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         if len(param["index_cols"]) > 0:
             dfs = []
             for _, row in df.groupby(rl(param["index_cols"])):
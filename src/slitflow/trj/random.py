@@ -99,7 +99,7 @@ class Walk2DCenter(Table):
             pandas.DataFrame: Expanded table including frame number and
             coordinates
         """
-        dfs_req = reqs[0].copy()
+        dfs_req = reqs[0]
         df_list = []
         for _, df in dfs_req.groupby(rl(dfs_req.columns.values.tolist())):
             df_cols = []
@@ -218,7 +218,7 @@ class WalkRect(Table):
             pandas.DataFrame: Expanded table including frame number and
             coordinates
         """
-        dfs_req = reqs[0].copy()
+        dfs_req = reqs[0]
         df_list = []
         for _, df in dfs_req.groupby(rl(dfs_req.columns.values.tolist())):
             df_cols = []
@@ -342,7 +342,7 @@ class WalkCircle(Table):
             pandas.DataFrame: Expanded table including frame number and 
             coordinates
         """
-        dfs_req = reqs[0].copy()
+        dfs_req = reqs[0]
         n_dim = len(param["calc_cols"])
         frm_no = np.arange(1, param["n_step"] + 2).reshape([-1, 1])
 
@@ -55,7 +55,7 @@ class Subtrajectory(Table):
         Returns:
             Table: Subtrajectory Table.
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         grouped = df.groupby(rl(param["split_cols"]))
         df_new = grouped.apply(lambda x: calc_subtrj(
             x, param)).reset_index(drop=True)
@@ -157,7 +157,7 @@ class JumpLenDist(Table):
             pandas.DataFrame: Jump length distribution table
         """
         fastspt = importlib.import_module("fastspt")
-        df = reqs[0].copy()
+        df = reqs[0]
         cells = to_fastspt_cell(df, param)
         sys.stdout = open(os.devnull, 'w')  # suppress print()
         if param["CDF"]:
@@ -347,7 +347,7 @@ class FitJumpLenDist2comp(Table):
             pandas.DataFrame: Fit parameters
         """
         fastspt = importlib.import_module("fastspt")
-        df = reqs[0].copy()
+        df = reqs[0]
         HistVecJumps, JumpProb, HistVecJumpsCDF, JumpProbCDF = from_hist_df(df)
 
         if param["CDF"]:
@@ -528,7 +528,7 @@ class FitJumpLenDist3comp(Table):
             pandas.DataFrame: Fit parameters
         """
         fastspt = importlib.import_module("fastspt")
-        df = reqs[0].copy()
+        df = reqs[0]
         HistVecJumps, JumpProb, HistVecJumpsCDF, JumpProbCDF = from_hist_df(df)
         if param["CDF"]:
             ModelFit = 2
@@ -670,8 +670,8 @@ class ModelJumpLenDist(Table):
             pandas.DataFrame: Jump length distribution histogram model
         """
         fastspt = importlib.import_module("fastspt")
-        df_hist = reqs[0].copy()
-        df_fit = reqs[1].copy()
+        df_hist = reqs[0]
+        df_fit = reqs[1]
 
         HistVecJumps, JumpProb, HistVecJumpsCDF, JumpProbCDF = \
             from_hist_df(df_hist)
@@ -98,7 +98,7 @@ class Link(Table):
             pandas.DataFrame: Trajectory table
         """
         tp = importlib.import_module("trackpy")
-        df = reqs[0].copy()
+        df = reqs[0]
         tp.quiet()
         df_track = tp.link(
             df, param["search_range"], pos_columns=param["calc_cols"],
@@ -161,8 +161,8 @@ class RefineCoM(Table):
             pandas.DataFrame: Refined X,Y-coordinate
         """
         tp = importlib.import_module("trackpy")
-        img = reqs[0].copy()
-        df = reqs[1].copy()
+        img = reqs[0]
+        df = reqs[1].copy(deep=False)
         width = param["img_size"][0]
         height = param["img_size"][1]
         x_col = param["calc_cols"][0]
@@ -274,7 +274,7 @@ class Locate(Table):
             points
         """
         tp = importlib.import_module("trackpy")
-        img = reqs[0].copy()
+        img = reqs[0]
         tp.quiet()
         frames = []
         for i in range(img.shape[0]):
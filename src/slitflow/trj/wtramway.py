@@ -95,7 +95,7 @@ class Tessellation(Pickle):
             tramway.tessellation.base.Partition: Partition object of TRamWay
         """
         helper = importlib.import_module("tramway.helper")
-        df = reqs[0].copy()
+        df = reqs[0].copy(deep=False)
 
         df_grp = df[["trj_no", param["calc_cols"]
                      [0], param["calc_cols"][1], "frm_no"]]
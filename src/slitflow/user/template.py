@@ -48,7 +48,7 @@ class AddOne(Table):
         Returns:
             pandas.DataFrame: Table containing a calculated column
         """
-        df = reqs[0].copy()
+        df = reqs[0]
         df_result = df[param["index_cols"]].copy()
         df_result[param["calc_col"]] = df[param["calc_col"]].values + 1
         return df_result
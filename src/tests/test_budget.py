@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import slitflow as sf
+from slitflow.name import make_info_path as ipath
+
+
+def test_MemoryBudget():
+    mem = sf.budget.MemoryBudget(nbytes=100)
+    assert mem.get_headroom() <= 100
+    assert mem.fits(100)
+    mem.acquire(60)
+    assert not mem.fits(60)
+    mem.check(60)  # waits for running processes instead of raising
+    mem.release(60)
+    assert mem.in_flight == 0
+    with pytest.raises(Exception) as e:
+        mem.check(101)
+
+    mem = sf.budget.MemoryBudget(limit=0)
+    assert mem.get_headroom() < 0
+
+    mem = sf.budget.MemoryBudget(nbytes=100)
+    mem.acquire(60, held=True)
+    assert mem.get_headroom() <= 40
+    assert not mem.fits(60)
+    with pytest.raises(Exception) as e:
+        mem.check(60)  # fits alone but not with the held data
+    mem.release(60, held=True)
+    mem.check(60)
+
+
+def test_get_nbytes():
+    arr = np.zeros((2, 3), dtype=np.float32)
+    df = pd.DataFrame({"a": np.zeros(4, dtype=np.int64)})
+    assert sf.budget.get_nbytes(arr) == 24
+    assert sf.budget.get_nbytes([arr, [df]]) == \
+        24 + df.memory_usage(index=True).sum()
+    assert sf.budget.get_nbytes([np.nan]) == 0
+    assert sf.budget.get_array_nbytes((2, 3), "uint16") == 12
+
+
+def test_Data_run_mp_budget():
+    R = sf.tbl.create.Index()
+    R.run([], {"index_counts": [4, 1], "type": "trajectory",
+               "split_depth": 0})
+    R.split(1)
+    param = {"diff_coeff": 0.1, "interval": 0.1, "n_step": 2,
+             "dimension": 2, "lims": [[1, 2], [1, 2]],
+             "length_unit": "um", "split_depth": 0}
+    nbytes = sf.budget.get_nbytes([R.data[0]]) * \
+        sf.data.Data.PROCESS_MEMORY_RATE
+    sf.data.Data.MEMORY_BUDGET = nbytes  # one process at a time
+    D = sf.trj.random.WalkRect()
+    D.run_mp([R], param.copy())
+    assert len(D.data[0]) == 12
+
+    sf.data.Data.MEMORY_BUDGET = nbytes - 1  # a split cannot fit
+    D = sf.trj.random.WalkRect()
+    with pytest.raises(Exception) as e:
+        D.run_mp([R], param.copy())
+    sf.data.Data.MEMORY_BUDGET = None
+
+
+def test_Data_load_budget(tmpdir):
+    R = sf.tbl.create.Index(ipath(tmpdir, 1, 1, "test", "ana", "grp"))
+    R.run([], {"index_counts": [3, 100], "type": "trajectory",
+               "split_depth": 1})
+    R.save()
+    nbytes = max([R.get_file_nbytes(path) for path in R.info.data_paths])
+    sf.data.Data.MEMORY_BUDGET = nbytes * 2  # two files at once
+    try:
+        R = sf.tbl.create.Index(ipath(tmpdir, 1, 1, "test", "ana", "grp"))
+        R.load([1, 2])
+        assert len(R.data) == 2
+        with pytest.raises(Exception) as e:
+            R.load()
+    finally:
+        sf.data.Data.MEMORY_BUDGET = None
+    R.load()
+    assert len(R.data) == 3
@@ -0,0 +1,89 @@
+import os
+import glob
+
+import slitflow as sf
+
+
+def make_project(root_dir):
+    for grp_dir, ana_dir in [("g1_trj", "a1_index"), ("g1_trj", "a2_rnd"),
+                             ("g2_img", "a1_image")]:
+        os.makedirs(os.path.join(root_dir, grp_dir, ana_dir))
+    for file_name in ["obs1_trj_index.sf", "obs1_trj_index.sfx",
+                      "obs1_D1_trj_index.csv", "obs1_D2_trj_index.csv",
+                      "obs2_trj_index.sf"]:
+        path = os.path.join(root_dir, "g1_trj", "a1_index", file_name)
+        with open(path, "w") as f:
+            f.write("")
+
+
+def test_Catalog_glob(tmpdir):
+    root_dir = str(tmpdir)
+    make_project(root_dir)
+    sf.catalog.start(root_dir)
+    for pattern in ["g1_*", os.path.join("g*", "a1_*"),
+                    os.path.join("g1_trj", "a1_index", "*.sf"),
+                    os.path.join("g1_trj", "a1_index", "obs1_*trj_index.csv"),
+                    os.path.join("g3_*", "a1_*")]:
+        pattern = os.path.join(root_dir, pattern)
+        assert sf.catalog.glob(pattern) == sorted(glob.glob(pattern))
+    # deeper paths are searched by glob.glob
+    catalog = sf.catalog.get(root_dir)
+    assert catalog.glob(os.path.join(root_dir, "*", "*", "*", "*")) is None
+    sf.catalog.shutdown(root_dir)
+    assert sf.catalog.get(root_dir) is None
+
+
+def test_Catalog_add_remove(tmpdir):
+    root_dir = str(tmpdir)
+    make_project(root_dir)
+    sf.catalog.start(root_dir)
+    ana_dir = os.path.join(root_dir, "g1_trj", "a1_index")
+    path = os.path.join(ana_dir, "obs3_trj_index.sf")
+    with open(path, "w") as f:
+        f.write("")
+    sf.catalog.add(path)
+    pattern = os.path.join(ana_dir, "obs3_*.sf")
+    assert sf.catalog.get(root_dir).glob(pattern) == [path]
+    os.remove(path)
+    sf.catalog.remove(path)
+    assert sf.catalog.get(root_dir).glob(pattern) == []
+    sf.catalog.shutdown(root_dir)
+
+
+def test_Catalog_manifest(tmpdir):
+    root_dir = str(tmpdir)
+    make_project(root_dir)
+    os.makedirs(os.path.join(root_dir, "g0_config"))
+    sf.catalog.start(root_dir)
+    sf.catalog.shutdown(root_dir)
+    assert os.path.exists(os.path.join(root_dir, "g0_config",
+                                       sf.catalog.MANIFEST_NAME))
+
+    # changed by other programs after saving the manifest
+    ana_dir = os.path.join(root_dir, "g1_trj", "a1_index")
+    os.remove(os.path.join(ana_dir, "obs2_trj_index.sf"))
+    os.makedirs(os.path.join(root_dir, "g3_new", "a1_new"))
+    catalog = sf.catalog.start(root_dir)
+    assert catalog.glob(os.path.join(ana_dir, "*.sf")) == \
+        [os.path.join(ana_dir, "obs1_trj_index.sf")]
+    assert catalog.glob(os.path.join(root_dir, "g3_*", "a1_*")) == \
+        [os.path.join(root_dir, "g3_new", "a1_new")]
+    sf.catalog.shutdown(root_dir)
+
+
+def test_Pipeline_catalog(tmpdir):
+    root_dir = str(tmpdir)
+    PL = sf.manager.Pipeline(root_dir)
+    PL.add(sf.tbl.create.Index(), 0, (1, 1), "trj", "index",
+           ["Test1", "Test2"], None, None,
+           {"index_counts": [2, 2], "type": "trajectory", "split_depth": 1})
+    PL.run()
+    assert sf.catalog.get(root_dir) is None
+    assert os.path.exists(os.path.join(root_dir, "g0_config",
+                                       sf.catalog.MANIFEST_NAME))
+    catalog = sf.catalog.start(root_dir)
+    pattern = os.path.join(root_dir, "g1_trj", "a1_index", "*")
+    assert catalog.glob(pattern) == sorted(glob.glob(pattern))
+    assert sorted(sf.name.get_obs_names(root_dir, (1, 1))) == \
+        ["Test1", "Test2"]
+    sf.catalog.shutdown(root_dir)
@@ -0,0 +1,52 @@
+import os
+import json
+
+import numpy as np
+import pytest
+
+import slitflow as sf
+
+
+@pytest.fixture
+def stack():
+    return np.arange(5 * 6 * 7, dtype=np.uint16).reshape(5, 6, 7)
+
+
+def test_save_chunks(tmpdir, stack):
+    path = os.path.join(tmpdir, "test.chunk")
+    store = sf.chunk.save_chunks(path, stack, [2, 4, 4])
+    assert store.shape == (5, 6, 7)
+    assert store.chunk_shape == (2, 4, 4)
+    assert len(os.listdir(path)) == 3 * 2 * 2 + 1
+    with open(os.path.join(path, sf.chunk.MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    assert manifest["dtype"] == stack.dtype.str
+
+    store = sf.chunk.save_chunks(path, stack[:2])
+    assert store.chunk_shape == (sf.chunk.CHUNK_FRAMES, 6, 7)
+    assert len(os.listdir(path)) == 2
+
+    with pytest.raises(Exception) as e:
+        sf.chunk.save_chunks(path, stack[0])
+    with pytest.raises(Exception) as e:
+        sf.chunk.save_chunks(path, stack, [1, 2])
+
+
+def test_ChunkStore_read(tmpdir, stack):
+    path = os.path.join(tmpdir, "test.chunk")
+    sf.chunk.save_chunks(path, stack, [2, 4, 4])
+    store = sf.chunk.ChunkStore(path)
+    assert np.array_equal(store.read(), stack)
+    assert np.array_equal(store.read([4, 0, 3]), stack[[4, 0, 3]])
+    assert np.array_equal(store.read([1, 2], slice(3, 5), slice(2, 7)),
+                          stack[1:3, 3:5, 2:7])
+    assert store.read([]).shape == (0, 6, 7)
+    assert store.get_nbytes(2) == 2 * 6 * 7 * 2
+
+    assert len(store) == 5
+    assert np.array_equal(store[-1], stack[-1])
+    assert np.array_equal(store[1:4, 2:6], stack[1:4, 2:6])
+    assert np.array_equal(store[::2, :, 5], stack[::2, :, 5])
+    assert np.array_equal(store[2, 3], stack[2, 3])
+    with pytest.raises(Exception) as e:
+        store[0, ::2]
@@ -32,6 +32,25 @@ def test_Data_run(df_index):
                   "split_depth": 0})
     assert D.data[0].equals(df_index)
 
+    D = sf.tbl.create.Index()
+    D.run_thread([], {"index_counts": [1, 1], "type": "trajectory",
+                      "split_depth": 0})
+    assert D.data[0].equals(df_index)
+
+
+def test_Data_process_batch():
+    D = sf.data.Data()
+    assert D.process_batch([[1], [2]]) == [1, 2]
+    func, items, is_batch = D.get_process_items([(1,), (2,)])
+    assert items == [[1], [2]] and not is_batch
+
+    D = sf.trj.msd.Each()
+    D.BATCH_SIZE = 2
+    func, items, is_batch = D.get_process_items([(1,), (2,), (3,)])
+    assert items == [[[1], [2]], [[3]]] and is_batch
+    func, items, is_batch = D.get_process_items([(1,), (2,), (3,)], 3)
+    assert items == [[[1]], [[2]], [[3]]]
+
 
 def test_Data_memory_over():
     sf.data.Data.MEMORY_LIMIT = 0
@@ -108,3 +127,131 @@ def test_Pickle_split():
     D = sf.data.Pickle()
     D.data = [None]
     assert not D.split_data()
+
+
+def test_Data_run_stream(tmpdir):
+    R = sf.tbl.create.Index()
+    R.run([], {"index_counts": [2, 3], "type": "trajectory",
+               "split_depth": 0})
+    R1 = sf.trj.random.Walk2DCenter()
+    R1.run([R], {"diff_coeff": 0.1, "interval": 0.1, "n_step": 2,
+                 "length_unit": "um", "seed": 1, "split_depth": 0})
+    R1.split(2)
+    param = {"group_depth": 2, "split_depth": 1}
+    D = sf.trj.msd.Each()
+    with pytest.raises(Exception) as e:
+        D.run_stream([R1], param.copy())
+
+    assert sf.data.get_save_groups(R1, 1, 6) == [[1, 2, 3], [4, 5, 6]]
+    assert sf.data.get_save_groups(R1, 0, 6) == [[1, 2, 3, 4, 5, 6]]
+    assert sf.data.get_save_groups(R1, 4, 6) == [[1], [2], [3], [4], [5],
+                                                 [6]]
+    D.info.set_path(ipath(tmpdir, 1, 1, "test", "ana", "grp"))
+    D.run_stream([R1], param.copy())
+    assert len(D.data) == 0
+    assert len(R1.data) == 6
+    assert R1.info.index["_split"].unique().tolist() == [1, 2, 3, 4, 5, 6]
+
+    D_all = sf.trj.msd.Each()
+    D_all.run([R1], param.copy())
+    D = sf.trj.msd.Each(ipath(tmpdir, 1, 1, "test", "ana", "grp"))
+    D.load()
+    assert len(D.data) == 2
+    assert np.allclose(pd.concat(D.data).values,
+                       pd.concat(D_all.data).values)
+
+
+def test_get_save_groups():
+    R = sf.data.Data()
+    R.info.index = pd.DataFrame({"img_no": [1, 1, 2, 2, 1, 3, 3],
+                                 "trj_no": [1, 2, 1, 2, 3, 1, 2],
+                                 "_split": [1, 2, 2, 3, 4, 6, -6]})
+    R.info.add_column(1, "img_no", "int32", "num", "Image number")
+    R.info.add_column(2, "trj_no", "int32", "num", "Trajectory number")
+    assert sf.data.get_save_groups(R, 1, 6) == [[1, 2, 3, 4], [5], [6]]
+    assert sf.data.get_save_groups(R, 2, 6) == [[1], [2], [3], [4], [5],
+                                                [6]]
+
+
+def test_Data_keep(tmpdir):
+    D = sf.trj.random.Walk2DCenter(ipath(tmpdir, 1, 1, "test", "ana", "grp"))
+    R = sf.tbl.create.Index()
+    R.run([], {"index_counts": [2, 3], "type": "trajectory",
+               "split_depth": 0})
+    D.run([R], {"diff_coeff": 0.1, "interval": 0.1, "n_step": 2,
+                "length_unit": "um", "seed": 1, "split_depth": 1})
+    D.save()
+
+    D = sf.trj.random.Walk2DCenter(ipath(tmpdir, 1, 1, "test", "ana", "grp"))
+    D.load()
+    df = D.data[0]
+    assert np.shares_memory(df["x_um"].values, D.keep[0]["x_um"].values)
+    with pytest.raises(ValueError):
+        df.loc[0, "x_um"] = 1
+    df["y_um"] = 0  # replacing columns does not change kept data
+    D.load()
+    assert D.data[0] is not df
+    assert (D.data[0]["y_um"] != 0).any()
+
+
+def test_freeze():
+    arr = np.zeros(3)
+    view = sf.data.freeze(arr)
+    assert np.shares_memory(arr, view) and not view.flags.writeable
+    assert arr.flags.writeable
+
+    df = pd.DataFrame({"a": [1, 2], "b": [0.1, 0.2], "c": ["x", "y"]})
+    df_view = sf.data.freeze(df)
+    assert np.shares_memory(df["b"].values, df_view["b"].values)
+    with pytest.raises(ValueError):
+        df_view.loc[0, "b"] = 1
+    df_view["a"] = 0
+    assert df.equals(pd.DataFrame({"a": [1, 2], "b": [0.1, 0.2],
+                                   "c": ["x", "y"]}))
+    df.loc[0, "b"] = 1
+
+    obj = {"a": [1]}
+    assert sf.data.freeze(obj) is obj
+    assert sf.data.freeze(obj, True) == obj
+    assert sf.data.freeze(obj, True) is not obj
+    assert sf.data.thaw([view, (df_view,)])[0].flags.writeable
+
+    df = pd.DataFrame([[1.0, 2.0], [3.0, 4.0]], columns=["a", "a"],
+                      index=[5, 6])
+    df_view = sf.data.freeze(df)
+    assert df_view.columns.tolist() == ["a", "a"]
+    assert df_view.index.tolist() == [5, 6]
+    assert np.shares_memory(df.values, df_view.iloc[:, 1].values)
+    df = pd.DataFrame({"a": pd.Categorical(["x", "y"])})
+    assert sf.data.freeze(df)["a"].dtype == "category"
+
+
+def test_freeze_copy_on_write():
+    df = pd.DataFrame({"a": [1, 2], "b": [0.1, 0.2]})
+    with pd.option_context("mode.copy_on_write", True):
+        df_view = sf.data.freeze(df)
+        assert np.shares_memory(df["b"].values, df_view["b"].values)
+        df_view.loc[0, "b"] = 1
+        df_view["a"] = 0
+        assert df_view["b"].tolist() == [1, 0.2]
+    assert df.equals(pd.DataFrame({"a": [1, 2], "b": [0.1, 0.2]}))
+
+
+def test_Data_mutates_inputs():
+    class Add(sf.data.Data):
+        @staticmethod
+        def process(reqs, param):
+            reqs[0] += 1
+            return reqs[0]
+
+    R = sf.data.Data()
+    R.data = [np.zeros(2), np.zeros(3)]
+    D = Add()
+    D.reqs = [R]
+    with pytest.raises(ValueError):
+        func, items, is_batch = D.get_process_items(D.get_reqs_data())
+        func(items[0], {})
+    D.MUTATES_INPUTS = True
+    func, items, is_batch = D.get_process_items(D.get_reqs_data())
+    assert np.array_equal(func(items[0], {}), [1, 1])
+    assert np.array_equal(R.data[0], [0, 0])
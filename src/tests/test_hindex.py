@@ -0,0 +1,59 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+import slitflow as sf
+
+
+@pytest.fixture
+def HIndex():
+    df = pd.DataFrame({"img_no": [1, 1, 1, 2, 2, 2],
+                       "trj_no": [1, 1, 2, 1, 1, 3],
+                       "frm_no": [1, 2, 1, 1, 2, 1],
+                       "_split": [1, 1, 1, 2, 2, 2]})
+    return sf.hindex.HierIndex.from_frame(df)
+
+
+def test_HierIndex(HIndex):
+    assert HIndex.names == ["img_no", "trj_no", "frm_no"]
+    assert HIndex.columns[0].dtype == np.int32
+    assert len(HIndex) == 6
+    assert HIndex.is_sorted()
+    assert HIndex.to_frame().shape == (6, 3)
+
+    assert HIndex.offsets(1).tolist() == [0, 3, 6]
+    assert HIndex.offsets(2).tolist() == [0, 2, 3, 5, 6]
+    assert HIndex.group_no(2).tolist() == [0, 0, 1, 2, 2, 3]
+    assert HIndex.n_group(2) == 4
+    assert HIndex.keys(2).tolist() == [[1, 1], [1, 2], [2, 1], [2, 3]]
+    assert HIndex.split(0).tolist() == [1] * 6
+    assert HIndex.split(1).tolist() == [1, 1, 1, 2, 2, 2]
+    assert HIndex.remap(2, [0, 5, -5, 7]).tolist() == [0, 0, 5, -5, -5, 7]
+    assert HIndex.select(2, [1, 3]).tolist() == [2, 5]
+    assert HIndex.select(2, []).tolist() == []
+
+    other = sf.hindex.HierIndex(["img_no", "trj_no"],
+                                [np.array([2, 2, 3]), np.array([1, 3, 1])])
+    assert HIndex.join(other, 2).tolist() == [-1, -1, -1, 0, 0, 1]
+    assert HIndex.join(other, 0).tolist() == [0] * 6
+
+    with pytest.raises(Exception) as e:
+        sf.hindex.HierIndex(["a"], [])
+    assert str(e.value) == "Number of names and columns must be the same."
+
+
+def test_HierIndex_unsorted():
+    df = pd.DataFrame({"a": [2, 1, 2, np.nan, 1], "b": [1, 3, 1, 1, 2]})
+    hindex = sf.hindex.HierIndex.from_frame(df)
+    assert not hindex.is_sorted()
+    expected = df.groupby(["a", "b"]).ngroup().fillna(-1).tolist()
+    assert hindex.group_no(2).tolist() == expected
+    assert hindex.keys(1).tolist() == [[1], [2]]
+    assert hindex.select(1, [0]).tolist() == [1, 4]
+    assert hindex.join(hindex, 2).tolist() == [2, 1, 2, -1, 0]
+
+
+def test_make_group_no():
+    values = np.array([[1, 1], [1, 1], [1, 2], [2, 1], [2, 1]])
+    assert sf.hindex.make_group_no(values).tolist() == [0, 0, 1, 2, 2]
+    assert sf.hindex.make_group_no(np.zeros((0, 2))).tolist() == []
@@ -62,6 +62,128 @@ def test_Image_memory_error(tmpdir, Index):
         D.load_data(path)
 
 
+def test_Image_memmap(tmpdir, Index):
+    path = os.path.join(tmpdir, "test.tif")
+
+    D = sf.img.create.Black()
+    D.run([Index], {"pitch": 0.1, "img_size": [10, 8], "length_unit": "um",
+                    "split_depth": 0})
+    D.data[0][:, 0, 0] = 1  # bottom left
+    D.save_data(D.data[0], path)
+
+    D.MEMMAP = True
+    stack = D.load_data(path)
+    assert isinstance(stack.base, np.memmap)
+    assert np.array_equal(stack, D.data[0])
+    stack[:, 0, 0] = 2
+    assert np.array_equal(D.load_data(path), D.data[0])
+
+    D.MEMMAP = False
+    stack = D.load_data(path)
+    assert not isinstance(stack.base, np.memmap)
+    assert np.array_equal(stack, D.data[0])
+
+
+def test_Image_overwrite(tmpdir):
+    path = ipath(tmpdir, 1, 1, "test", "black", "grp")
+    param = {"pitch": 0.1, "img_size": [10, 8], "length_unit": "um",
+             "split_depth": 0}
+    index_param = {"index_counts": [3], "type": "image", "split_depth": 0}
+    D0 = sf.tbl.create.Index()
+    D0.run([], index_param)
+    D1 = sf.img.create.Black(path)
+    D1.run([D0], param)
+    D1.save()
+
+    D2 = sf.img.image.Image()
+    D2.info.load(path)
+    D2.load()
+    assert not isinstance(D2.data[0].base, np.memmap)
+
+    # rerun while the loaded data exist
+    D0 = sf.tbl.create.Index()
+    D0.run([], index_param)
+    D1 = sf.img.create.Black()
+    D1.info.set_path(path)
+    D1.run([D0], param)
+    D1.data[0][:, 0, 0] = 1
+    D1.save()
+    assert D2.data[0][0, 0, 0] == 0
+    os.remove(D1.info.data_paths[0])
+    assert D2.data[0].shape == (3, 8, 10)
+
+
+def test_Image_chunk(tmpdir, Index):
+    path = os.path.join(tmpdir, "test.chunk")
+
+    D = sf.img.create.Black()
+    D.run([Index], {"pitch": 0.1, "img_size": [10, 8], "length_unit": "um",
+                    "split_depth": 0, "image_format": "chunk",
+                    "chunk_shape": [2, 5, 5]})
+    assert D.get_ext() == ".chunk"
+    assert D.info.get_param_value("chunk_shape") == [2, 5, 5]
+    D.data[0][:, 0, 0] = 1
+    D.save_data(D.data[0], path)
+    assert os.path.isdir(path)
+    assert np.array_equal(D.load_data(path), D.data[0])
+
+    D.set_format({"image_format": "tif"})
+    assert D.get_ext() == ".tif"
+    assert "chunk_shape" not in D.info.get_param_names()
+    with pytest.raises(Exception) as e:
+        D.set_format({"image_format": "png"})
+
+
+def test_Image_compression(tmpdir, Index):
+    path = os.path.join(tmpdir, "test.tif")
+    path_zlib = os.path.join(tmpdir, "test_zlib.tif")
+
+    D = sf.img.create.Black()
+    D.run([Index], {"pitch": 0.1, "img_size": [10, 8], "length_unit": "um",
+                    "split_depth": 0, "compression": "zlib"})
+    assert D.info.get_param_value("compression") == "zlib"
+    assert D.info.get_param_value("compression_level") == 6
+    D.data[0][:, 0, 0] = 1
+    D.save_data(D.data[0], path_zlib)
+    stack = D.load_data(path_zlib)
+    assert not isinstance(stack.base, np.memmap)
+    assert np.array_equal(stack, D.data[0])
+
+    D.set_format({"compression": "zlib", "compression_level": 9})
+    assert D.info.get_param_value("compression_level") == 9
+    D.set_format({})
+    D.save_data(D.data[0], path)
+    assert os.path.getsize(path_zlib) < os.path.getsize(path)
+    assert "compression" not in D.info.get_param_names()
+    with pytest.raises(Exception) as e:
+        D.set_format({"compression": "jpeg"})
+
+
+def test_Image_split_view():
+    D1 = sf.tbl.create.Index()
+    D1.run([], {"index_counts": [2, 3], "type": "movie", "split_depth": 0})
+    D = sf.img.create.Black()
+    D.run([D1], {"pitch": 0.1, "img_size": [4, 4], "length_unit": "um",
+                 "split_depth": 0})
+    stack = D.data[0].astype(np.uint8)  # the column type
+    D.data = [stack]
+
+    D.set_split(1)
+    assert len(D.data) == 2
+    assert all([np.shares_memory(img, stack) for img in D.data])
+
+    # frames from different stacks are copied
+    D.info.index["_dest"] = [1, 1, 1, 2, 2, 1]
+    D.split_data()
+    assert np.shares_memory(D.data[1], stack)
+    assert not np.shares_memory(D.data[0], stack)
+    assert D.data[0].shape == (4, 4, 4)
+
+    D.info.change_column_item("intensity", "type", "float32")
+    D.set_split(2)
+    assert D.data[0].dtype == np.float32
+
+
 def test_set_img_size(Index):
     D1 = sf.img.create.Black()
     D1.run([Index], {"pitch": 0.1, "img_size": [10, 10], "length_unit": "um",
@@ -90,6 +212,15 @@ def test_RGB(tmpdir, Index):
     assert D.data == []
 
 
+def test_RGB_compression(tmpdir, Index):
+    path = os.path.join(tmpdir, "test.tif")
+    D = sf.img.create.RandomRGB()
+    D.run([Index], {"pitch": 0.1, "img_size": [10, 8], "length_unit": "um",
+                    "split_depth": 0, "seed": 1, "compression": "zlib"})
+    D.save_data(D.data[0], path)
+    assert np.array_equal(D.load_data(path), D.data[0])
+
+
 def test_RGB_memory_error(tmpdir, Index):
     path = os.path.join(tmpdir, "test.tif")
 
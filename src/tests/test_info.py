@@ -2,6 +2,7 @@ import sys
 import os
 
 import pytest
+import numpy as np
 import pandas as pd
 
 import slitflow as sf
@@ -105,6 +106,31 @@ def test_Info_load_index_split(tmpdir):
     assert len(D2.info.index) == 12
 
 
+def test_Info_index_format(tmpdir):
+    D1 = sf.tbl.create.Index(ipath(tmpdir, 1, 1, "test", "index", "grp"))
+    D1.run([], {"index_counts": [2, 3], "type": "trajectory",
+                "split_depth": 1})
+    D1.save()
+    index_path = ipath(tmpdir, 1, 1, "test") + "x"
+    with open(index_path) as f:
+        assert f.read().splitlines()[:2] == ["1,1", ",2"]
+
+    D2 = sf.tbl.create.Index(ipath(tmpdir, 1, 1, "test"))
+    assert D2.info._index_to_load
+    assert len(D2.info.index) == 6
+    assert not D2.info._index_to_load
+    index_csv = D2.info.index.copy()
+
+    # binary format is opt-in
+    D1.INDEX_FORMAT = "npy"
+    D1.info.save_index(load_index=False)
+    with open(index_path, "rb") as f:
+        assert f.read(6) == sf.info.NPY_MAGIC
+    assert np.load(index_path, mmap_mode="r").shape == (6, 2)
+    D3 = sf.tbl.create.Index(ipath(tmpdir, 1, 1, "test"))
+    assert D3.info.index.equals(index_csv)
+
+
 def test_Info_set_file_nos():
     D = sf.tbl.create.Index()
     D.run([], {"index_counts": [2, 2], "type": "trajectory",
@@ -195,3 +221,25 @@ def test_Info_param():
 def test_fullname():
     D2 = sf.data.Data()
     assert sf.info.fullname(D2) == "slitflow.data.Data"
+
+
+def test_make_fingerprint():
+    fp = sf.info.make_fingerprint("sf.tbl.create.Index()", {"a": 1}, [])
+    assert fp == sf.info.make_fingerprint(
+        "sf.tbl.create.Index()", {"a": 1}, [])
+    assert fp != sf.info.make_fingerprint(
+        "sf.tbl.create.Index()", {"a": 2}, [])
+    assert fp != sf.info.make_fingerprint(
+        "sf.tbl.create.Index()", {"a": 1}, [["x", "2024/01/01 00:00:00"]])
+
+
+def test_Info_get_depth_id():
+    D = sf.tbl.create.Index()
+    D.run([], {"index_counts": [2, 12], "type": "trajectory",
+               "split_depth": 2})
+    depth_ids = D.info.get_depth_id()
+    assert len(depth_ids) == 24
+    assert depth_ids[:3] == ["D1D1", "D1D2", "D1D3"]
+    assert depth_ids[11:13] == ["D1D12", "D2D1"]
+    assert D.info.get_group_no(["img_no"]) is \
+        D.info.get_group_no(["img_no"])
@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 
 import slitflow as sf
 
@@ -42,6 +43,19 @@ def test_Value(LocMask):
         D.run([LocMask[0], LocMask[2]], {"split_depth": 0})
 
 
+def test_Value_process_batch(LocMask):
+    D = sf.loc.mask.Value()
+    D.run([LocMask[0], LocMask[1]], {"split_depth": 0})
+    param = D.info.get_param_dict()
+    reqs_list = [[df, img] for df, img in zip(LocMask[0].data,
+                                              LocMask[1].data)]
+    results = sf.loc.mask.Value.process_batch(reqs_list, param)
+    for reqs, result in zip(reqs_list, results):
+        expected = sf.loc.mask.Value.process(reqs, param)
+        assert list(result.columns) == list(expected.columns)
+        assert np.allclose(result.values, expected.values)
+
+
 def test_BinaryImage(LocMask):
 
     D = sf.loc.mask.BinaryImage()
@@ -1,8 +1,11 @@
 import os
+import json
 
+import numpy as np
 import pytest
 
 import slitflow as sf
+from slitflow.name import make_info_path as ipath
 
 
 def test_Pipeline(tmpdir):
@@ -28,7 +31,7 @@ def test_Pipeline_add_error(tmpdir):
                "index_counts": [1, 1], "type": "trajectory", "split_depth": 0})
 
     with pytest.raises(Exception) as e:
-        PL.add(sf.tbl.create.Index(), 5, (1, 1), "trj", "index",
+        PL.add(sf.tbl.create.Index(), 7, (1, 1), "trj", "index",
                ["Test"], None, None, {"split_depth": 0})
 
     with pytest.raises(Exception) as e:
@@ -358,3 +361,300 @@ def test_Pipeline_make_flowchart(tmpdir):
             "length_unit": "um", "split_depth": 0})
     with pytest.raises(Exception) as e:
         PL.make_flowchart("test", "grp_name", is_vertical=True)
+
+
+def test_Pipeline_incremental(tmpdir):
+    PL = sf.manager.Pipeline(tmpdir)
+    PL.add(sf.tbl.create.Index(), 0, (1, 1), "trj1", "index",
+           ["Test1", "Test2"], None, None,
+           {"index_counts": [1, 1], "type": "trajectory", "split_depth": 0})
+    PL.add(sf.trj.random.WalkRect(), 0, (2, 1), "trj2", "random",
+           None, [(1, 1)], [2],
+           {"diff_coeff": 0.1, "interval": 0.1, "n_step": 2,
+            "dimension": 2, "lims": [[1, 2], [1, 2]],
+            "length_unit": "um", "split_depth": 0})
+    PL.run()
+    assert list(PL.run_log["status"]) == ["computed"] * 4
+
+    PL.run()
+    assert list(PL.run_log["status"]) == ["skipped"] * 4
+
+    PL.run(force=1)
+    assert list(PL.run_log["status"]) == \
+        ["skipped", "skipped", "computed", "computed"]
+
+    PL.df.at[0, "param"] = {"index_counts": [2, 1], "type": "trajectory",
+                            "split_depth": 0}
+    PL.run()
+    assert list(PL.run_log["status"]) == ["computed"] * 4
+
+    PL.run(force=True)
+    assert list(PL.run_log["status"]) == ["computed"] * 4
+
+
+@pytest.mark.parametrize("run_mode", [0, 2])
+def test_Pipeline_incremental_default_split(tmpdir, run_mode):
+    PL = sf.manager.Pipeline(tmpdir)
+    PL.add(sf.tbl.create.Index(), 0, (1, 1), "trj1", "index",
+           ["Test"], None, None,
+           {"index_counts": [2, 1], "type": "trajectory", "split_depth": 1})
+    # split_depth is added to the parameters when the task is run
+    PL.add(sf.trj.random.WalkRect(), run_mode, (2, 1), "trj2", "random",
+           None, [(1, 1)], [1],
+           {"diff_coeff": 0.1, "interval": 0.1, "n_step": 2,
+            "dimension": 2, "lims": [[1, 2], [1, 2]], "length_unit": "um"})
+    PL.run()
+    assert list(PL.run_log["status"]) == ["computed"] * 2
+    assert "split_depth" not in PL.df.at[1, "param"]
+
+    PL.run()
+    assert list(PL.run_log["status"]) == ["skipped"] * 2
+
+    # a deleted data file is created again
+    path = os.path.join(tmpdir, "g2_trj2", "a1_random",
+                        "Test_D2_trj2_random.csv")
+    os.remove(path)
+    PL.run()
+    assert list(PL.run_log["status"]) == ["skipped", "computed"]
+    assert os.path.exists(path)
+
+
+def test_Pipeline_cycle_dest(tmpdir):
+    stacks = []
+    for run_mode, reqs_split in [(0, [2]), (2, [[0, 2]])]:
+        root_dir = os.path.join(tmpdir, str(run_mode))
+        PL = sf.manager.Pipeline(root_dir)
+        PL.add(sf.tbl.create.Index(), 0, (1, 1), "img", "index",
+               ["Test"], None, None,
+               {"index_counts": [2, 3], "type": "movie", "split_depth": 1})
+        PL.add(sf.img.create.Black(), 0, (1, 2), None, "black",
+               None, [(1, 1)], [1],
+               {"pitch": 0.1, "img_size": [5, 5], "length_unit": "um",
+                "split_depth": 1})
+        # all frames are different
+        PL.add(sf.img.noise.Gauss(), 0, (1, 3), None, "noise",
+               None, [(1, 2)], [0],
+               {"sigma": 1, "baseline": 0, "seed": 1, "split_depth": 0})
+        PL.add(sf.img.filter.Gauss(), run_mode, (1, 4), None, "filter",
+               None, [(1, 3)], reqs_split,
+               {"kernel_size": 3, "split_depth": 1})
+        PL.run()
+        D = sf.img.image.Image()
+        stacks.append([
+            D.load_data(os.path.join(root_dir, "g1_img", "a4_filter", name))
+            for name in sorted(os.listdir(
+                os.path.join(root_dir, "g1_img", "a4_filter")))
+            if name.endswith(".tif")])
+    assert len(stacks[1]) == 2
+    for stack_0, stack_2 in zip(*stacks):
+        assert np.array_equal(stack_0, stack_2)
+
+
+def test_Pipeline_dag(tmpdir):
+    PL = sf.manager.Pipeline(tmpdir)
+    for i in range(2):
+        PL.add(sf.tbl.create.Index(), 0, (i + 1, 1), "trj" + str(i + 1),
+               "index", ["Test"], None, None,
+               {"index_counts": [1, 1], "type": "trajectory",
+                "split_depth": 0})
+        PL.add(sf.trj.random.WalkRect(), 0, (i + 1, 2), None, "random",
+               None, [(i + 1, 1)], [2],
+               {"diff_coeff": 0.1, "interval": 0.1, "n_step": 2,
+                "dimension": 2, "lims": [[1, 2], [1, 2]],
+                "length_unit": "um", "split_depth": 0})
+    PL.add("Delete()", 0, None, None, "index", ["Test"], [(1, 1)], [0], {})
+    assert PL.make_task_graph() == {0: [], 1: [0], 2: [], 3: [2], 4: [0, 1]}
+
+    PL.run(scheduler="dag", max_workers=2)
+    assert list(PL.run_log["index"]) == [0, 1, 2, 3, 4]
+    assert set(os.listdir(tmpdir)) == {"g0_config", "g1_trj1", "g2_trj2"}
+    assert not os.path.exists(os.path.join(tmpdir, "g1_trj1", "a1_index"))
+
+    with pytest.raises(Exception) as e:
+        PL.run(scheduler="parallel")
+
+
+def test_Pipeline_dag_failure(tmpdir):
+    PL = sf.manager.Pipeline(tmpdir)
+    for i, index_type in enumerate(["trajectory", "unknown"]):
+        PL.add(sf.tbl.create.Index(), 0, (i + 1, 1), "trj" + str(i + 1),
+               "index", ["Test"], None, None,
+               {"index_counts": [1, 1], "type": index_type,
+                "split_depth": 0})
+        PL.add(sf.trj.random.WalkRect(), 0, (i + 1, 2), None, "random",
+               None, [(i + 1, 1)], [2],
+               {"diff_coeff": 0.1, "interval": 0.1, "n_step": 2,
+                "dimension": 2, "lims": [[1, 2], [1, 2]],
+                "length_unit": "um", "split_depth": 0})
+
+    PL.run(scheduler="dag", max_workers=2)
+    assert list(PL.run_log["index"]) == [0, 1, 2, 3]
+    assert list(PL.run_log["status"]) == \
+        ["computed", "computed", "failed", "skipped"]
+    assert "calc_cols" in PL.run_log["error"][2]
+    assert os.path.exists(os.path.join(tmpdir, "g1_trj1", "a2_random"))
+
+
+def test_Pipeline_obs_workers(tmpdir):
+    PL = sf.manager.Pipeline(tmpdir)
+    PL.add(sf.tbl.create.Index(), 0, (1, 1), "trj1", "index",
+           ["Test1", "Test2", "Test3"], None, None,
+           {"index_counts": [1, 1], "type": "trajectory", "split_depth": 0})
+    PL.add(sf.trj.random.WalkRect(), 0, (2, 1), "trj2", "random",
+           None, [(1, 1)], [2],
+           {"diff_coeff": 0.1, "interval": 0.1, "n_step": 2,
+            "dimension": 2, "lims": [[1, 2], [1, 2]],
+            "length_unit": "um", "split_depth": 0}, obs_workers=2)
+    PL.save("pipeline")
+    PL = sf.manager.Pipeline(tmpdir)
+    PL.load("pipeline")
+    assert PL.df.loc[1, "obs_workers"] == 2
+    PL.run(obs_workers=3)
+    assert list(PL.run_log["status"]) == ["computed"] * 6
+    assert len(os.listdir(os.path.join(tmpdir, "g2_trj2", "a1_random"))) == 9
+
+    # an error in one observation does not stop the others
+    info_path = os.path.join(tmpdir, "g1_trj1", "a1_index",
+                             "Test2_trj1_index.sf")
+    with open(info_path) as f:
+        info = json.load(f)
+    info["meta"]["class"] = "slitflow.tbl.create.NotExist"
+    with open(info_path, "w") as f:
+        json.dump(info, f)
+    PL.run(indices=1, force=True)
+    status = dict(zip(PL.run_log["obs_name"], PL.run_log["status"]))
+    assert status == {"Test1": "computed", "Test2": "failed",
+                      "Test3": "computed"}
+
+    with pytest.raises(Exception) as e:
+        PL.set_obs_workers(0)
+
+
+def test_Pipeline_stream(tmpdir):
+    PL = sf.manager.Pipeline(tmpdir)
+    PL.add(sf.tbl.create.Index(), 0, (1, 1), "trj", "index",
+           ["Test"], None, None,
+           {"index_counts": [2, 2], "type": "trajectory", "split_depth": 0})
+    PL.add(sf.trj.random.WalkRect(), 4, (1, 2), None, "random",
+           None, [(1, 1)], [2],
+           {"diff_coeff": 0.1, "interval": 0.1, "n_step": 2,
+            "dimension": 2, "lims": [[1, 2], [1, 2]],
+            "length_unit": "um", "split_depth": 1})
+    PL.run()
+    D = sf.trj.random.WalkRect(
+        ipath(tmpdir, 1, 2, "Test", "random", "trj"))
+    D.load()
+    assert len(D.data) == 2
+    assert len(D.info.index) == 12
+
+
+def test_Pipeline_thread(tmpdir):
+    PL = sf.manager.Pipeline(tmpdir)
+    PL.add(sf.tbl.create.Index(), 0, (1, 1), "trj", "index",
+           ["Test"], None, None,
+           {"index_counts": [2, 2], "type": "trajectory", "split_depth": 1})
+    for i, run_mode in enumerate([5, 6], 2):
+        PL.add(sf.trj.random.WalkRect(), run_mode, (1, i), None, "random",
+               None, [(1, 1)], [2],
+               {"diff_coeff": 0.1, "interval": 0.1, "n_step": 2,
+                "dimension": 2, "lims": [[1, 2], [1, 2]],
+                "length_unit": "um", "split_depth": 1})
+    PL.run()
+    for i in [2, 3]:
+        D = sf.trj.random.WalkRect(
+            ipath(tmpdir, 1, i, "Test", "random", "trj"))
+        D.load()
+        assert len(D.data) == 2
+        assert len(D.info.index) == 12
+
+
+def test_Pipeline_report(tmpdir):
+    PL = sf.manager.Pipeline(tmpdir)
+    PL.add(sf.tbl.create.Index(), 0, (1, 1), "trj", "index",
+           ["Test"], None, None,
+           {"index_counts": [2, 2], "type": "trajectory", "split_depth": 1})
+    PL.add(sf.trj.random.WalkRect(), 2, (1, 2), None, "random",
+           None, [(1, 1)], [1],
+           {"diff_coeff": 0.1, "interval": 0.1, "n_step": 2,
+            "dimension": 2, "lims": [[1, 2], [1, 2]],
+            "length_unit": "um", "split_depth": 1})
+    PL.run()
+    df = PL.report()
+    assert os.path.exists(os.path.join(tmpdir, "g0_config", "report.csv"))
+    df_load = df[(df["index"] == 1) & (df["step"] == "load")]
+    assert df_load["count"].values[0] == 2
+    assert df_load["n_cycle"].values[0] == 2
+    assert df_load["bytes_read"].values[0] > 0
+    assert set(df["step"]) == {"load", "set_reqs", "process", "post_run",
+                               "set_index", "split", "save"}
+
+
+def test_Pipeline_table_format(tmpdir):
+    PL = sf.manager.Pipeline(tmpdir)
+    PL.add(sf.tbl.create.Index(), 0, (1, 1), "trj1", "index",
+           ["Test"], None, None,
+           {"index_counts": [1, 2], "type": "trajectory", "split_depth": 1})
+    PL.add(sf.trj.random.Walk2DCenter(), 0, (2, 1), "trj2", "random",
+           None, [(1, 1)], [1],
+           {"diff_coeff": 0.1, "interval": 0.1, "n_step": 2,
+            "length_unit": "um", "split_depth": 1, "table_format": "npz"})
+    PL.add(sf.trj.msd.Each(), 0, (3, 1), "trj3", "msd",
+           None, [(2, 1)], [1], {"group_depth": 2, "split_depth": 1})
+    PL.add(sf.trj.random.Walk2DCenter(), 0, (4, 1), "trj4", "random",
+           None, [(1, 1)], [2],
+           {"diff_coeff": 0.1, "interval": 0.1, "n_step": 2,
+            "length_unit": "um", "split_depth": 2, "table_format": "sqlite"})
+    PL.add(sf.trj.msd.Each(), 2, (5, 1), "trj5", "msd",
+           None, [(4, 1)], [2], {"group_depth": 2, "split_depth": 2})
+    PL.run()
+    ana_dir = os.path.join(tmpdir, "g2_trj2", "a1_random")
+    assert os.path.exists(os.path.join(ana_dir, "Test_D1_trj2_random.npz"))
+    D = sf.trj.msd.Each(ipath(tmpdir, 3, 1, "Test"))
+    D.load()
+    assert len(D.data[0]) == 6
+    ana_dir = os.path.join(tmpdir, "g4_trj4", "a1_random")
+    assert sorted(os.listdir(ana_dir)) == ["Test_trj4_random.db",
+                                           "Test_trj4_random.sf",
+                                           "Test_trj4_random.sfx"]
+    D = sf.trj.msd.Each(ipath(tmpdir, 5, 1, "Test"))
+    D.load()
+    assert len(D.data) == 2
+
+
+def test_Pipeline_image_format(tmpdir):
+    PL = sf.manager.Pipeline(tmpdir)
+    PL.add(sf.tbl.create.Index(), 0, (1, 1), "img1", "index",
+           ["Test"], None, None,
+           {"index_counts": [2, 5], "type": "movie", "split_depth": 1})
+    for i, image_format in [(2, "tif"), (4, "chunk")]:
+        PL.add(sf.img.create.Black(), 0, (i, 1), "img" + str(i), "black",
+               None, [(1, 1)], [1],
+               {"pitch": 0.1, "img_size": [6, 6], "length_unit": "um",
+                "split_depth": 0, "image_format": image_format,
+                "chunk_shape": [2]})
+        # each cycle reads only the frames of one image from one file
+        PL.add(sf.img.noise.Gauss(), 2, (i + 1, 1), "img" + str(i + 1),
+               "noise", None, [(i, 1)], [[1, 1]],
+               {"sigma": 1, "baseline": 1, "seed": 1, "split_depth": 1})
+    PL.run()
+    ana_dir = os.path.join(tmpdir, "g4_img4", "a1_black")
+    assert os.path.exists(os.path.join(
+        ana_dir, "Test_img4_black.chunk", "manifest.json"))
+    D1 = sf.img.noise.Gauss(ipath(tmpdir, 3, 1, "Test"))
+    D1.load()
+    D2 = sf.img.noise.Gauss(ipath(tmpdir, 5, 1, "Test"))
+    D2.load()
+    for img1, img2 in zip(D1.data, D2.data):
+        assert np.array_equal(img1, img2)
+
+    PL = sf.manager.Pipeline(tmpdir)
+    PL.add("Copy", 0, (6, 1), "img6", "copy", ["Test"], [(4, 1)], [0], {})
+    PL.run()
+    chunk_path = os.path.join(tmpdir, "g6_img6", "a1_copy",
+                              "Test_img6_copy.chunk")
+    assert os.path.isdir(chunk_path)
+    PL = sf.manager.Pipeline(tmpdir)
+    PL.add("Delete()", 0, None, None, "copy", ["Test"], [(6, 1)], [0],
+           {"keep": "info"})
+    PL.run()
+    assert not os.path.exists(chunk_path)
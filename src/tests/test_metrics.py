@@ -0,0 +1,60 @@
+import types
+
+import numpy as np
+
+import slitflow as sf
+
+
+def test_measure():
+    records = []
+
+    def collect(Data, step, record):
+        records.append((step, record))
+
+    sf.metrics.add_hook(collect)
+    sf.metrics.add_hook(collect)
+    D = sf.tbl.create.Index()
+    D.run([], {"index_counts": [2, 2], "type": "trajectory",
+               "split_depth": 0})
+    sf.metrics.remove_hook(collect)
+    assert sf.metrics.HOOKS == []
+
+    steps = D.info.metrics["steps"]
+    assert list(steps) == ["set_reqs", "process", "post_run", "set_index",
+                           "split"]
+    assert steps["process"]["count"] == 1
+    assert steps["process"]["wall_time"] >= 0
+    assert D.info.metrics["n_split"] == 1
+    assert D.info.metrics["peak_rss"] > 0
+    assert steps["process"]["peak_rss"] > 0
+    assert all(["rss_increase" in record for _, record in records])
+    assert [step for step, _ in records] == list(steps)
+    assert "metrics" in D.info.meta
+
+
+def test_measure_step_rss():
+    D = types.SimpleNamespace(
+        info=types.SimpleNamespace(metrics=sf.metrics.init_metrics()))
+    size = 200 * 1024**2
+    with sf.metrics.measure(D, "large"):
+        arr = np.ones(size, dtype=np.uint8)
+    del arr
+    with sf.metrics.measure(D, "small"):
+        pass
+    steps = D.info.metrics["steps"]
+    assert steps["large"]["rss_increase"] >= size * 0.9
+    assert steps["small"]["rss_increase"] < size * 0.5
+    assert D.info.metrics["peak_rss"] == steps["large"]["peak_rss"]
+
+
+def test_merge():
+    metrics = sf.metrics.init_metrics()
+    other = sf.metrics.init_metrics()
+    other["steps"]["load"] = {"wall_time": 1, "cpu_time": 2, "count": 1}
+    other["bytes_read"] = 10
+    sf.metrics.merge(metrics, other)
+    sf.metrics.merge(metrics, other)
+    assert metrics["steps"]["load"] == {"wall_time": 2, "cpu_time": 4,
+                                        "count": 2}
+    assert metrics["bytes_read"] == 20
+    assert "peak_rss" not in metrics["steps"]["load"]
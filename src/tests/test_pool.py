@@ -0,0 +1,52 @@
+import os
+
+import cv2
+
+import slitflow as sf
+
+
+def test_pool():
+    assert sf.pool.get() is None
+    executor = sf.pool.start(2)
+    assert sf.pool.get() is executor
+    assert sf.pool.start(2) is executor
+
+    D = sf.tbl.create.Index()
+    D.run_mp([], {"index_counts": [1, 1], "type": "trajectory",
+                  "split_depth": 0})
+    assert len(D.data[0]) == 1
+    assert sf.pool.get() is executor
+
+    assert sf.pool.start(1) is not executor
+    sf.pool.shutdown()
+    assert sf.pool.get() is None
+
+
+def test_Pipeline_pool_size(tmpdir):
+    PL = sf.manager.Pipeline(tmpdir)
+    PL.add(sf.tbl.create.Index(), 0, (1, 1), "trj1", "index",
+           ["Test"], None, None,
+           {"index_counts": [2, 2], "type": "trajectory", "split_depth": 1})
+    PL.add(sf.trj.random.WalkRect(), 1, (2, 1), "trj2", "random",
+           None, [(1, 1)], [2],
+           {"diff_coeff": 0.1, "interval": 0.1, "n_step": 2,
+            "dimension": 2, "lims": [[1, 2], [1, 2]],
+            "length_unit": "um", "split_depth": 0})
+    PL.add(sf.trj.random.WalkRect(), 3, (3, 1), "trj3", "random",
+           None, [(1, 1)], [2],
+           {"diff_coeff": 0.1, "interval": 0.1, "n_step": 2,
+            "dimension": 2, "lims": [[1, 2], [1, 2]],
+            "length_unit": "um", "split_depth": 1})
+    PL.run(pool_size=2)
+    assert sf.pool.get() is None
+    assert set(os.listdir(tmpdir)) == \
+        {"g0_config", "g1_trj1", "g2_trj2", "g3_trj3"}
+
+
+def test_limit_native_threads():
+    assert sf.pool.get_native_threads(os.cpu_count() * 2) == 1
+    assert sf.pool.get_native_threads(1) == os.cpu_count()
+    n_thread = cv2.getNumThreads()
+    with sf.pool.limit_native_threads(1):
+        assert cv2.getNumThreads() == 1
+    assert cv2.getNumThreads() == n_thread
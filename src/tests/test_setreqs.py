@@ -1,7 +1,91 @@
 import pytest
 import numpy as np
+import pandas as pd
 
 import slitflow as sf
+from slitflow.name import make_info_path as ipath
 
 
 # TODO: make test for setreqs
+
+
+@pytest.fixture
+def Reqs():
+    reqs = []
+    for _ in range(2):
+        D = sf.tbl.create.Index()
+        D.run([], {"index_counts": [2, 3], "type": "trajectory",
+                   "split_depth": 2})
+        D.info.load_split_depth = 2
+        D.info.data_split_depth = 2
+        reqs.append(D)
+    return reqs
+
+
+def test_make_cycle_plan(Reqs):
+    sf.setreqs.PLAN_CACHE.clear()
+    plan = sf.setreqs.make_cycle_plan(Reqs, {"split_depth": 1}, [2, 2],
+                                      [2, 2])
+    assert len(plan) == 6
+    assert plan.save_nos == [0, 0, 1, 0, 0, 2]
+    assert plan.file_nos[0] == [[1], [2], [3], [4], [5], [6]]
+    index = plan.get_index(4, 1)
+    assert index[["img_no", "trj_no", "_dest"]].values.tolist() == \
+        [[2, 2, 1]]
+
+    # the same plan is used for the same index tables
+    assert sf.setreqs.make_cycle_plan(
+        Reqs, {"split_depth": 1}, [2, 2], [2, 2]) is plan
+    assert sf.setreqs.make_cycle_plan(
+        Reqs, {"split_depth": 0}, [2, 2], [2, 2]) is not plan
+
+
+def test_make_index_dest_cycle():
+    index_split = pd.DataFrame({"img_no": [1, 1, 2], "trj_no": [1, 2, 1],
+                                "_file": [1, 1, 2]})
+    index_data_cycle = pd.DataFrame({"img_no": [1, 2], "trj_no": [2, 1],
+                                     "_file": [1, 2], "_dest": [1, 2]})
+    index_dest = sf.setreqs.make_index_dest_cycle(
+        index_split, index_data_cycle)
+    assert index_dest["_dest"].tolist() == [0, 1, 2]
+
+    # duplicated keys are merged by pandas
+    index_data_cycle = pd.concat([index_data_cycle, index_data_cycle])
+    index_dest = sf.setreqs.make_index_dest_cycle(
+        index_split, index_data_cycle)
+    assert index_dest["_dest"].tolist() == [0, 1, 1, 2, 2]
+
+    # group numbers in a different order from the rows
+    index_split = pd.DataFrame({"img_no": np.repeat([1, 2], 3),
+                                "frm_no": np.tile([1, 2, 3], 2),
+                                "_file": np.repeat([1, 2], 3)})
+    index_data_cycle = index_split.iloc[::-1].reset_index(drop=True)
+    index_data_cycle["_dest"] = [6, 5, 4, 3, 2, 1]
+    index_dest = sf.setreqs.make_index_dest_cycle(
+        index_split, index_data_cycle)
+    expected = pd.merge(index_split, index_data_cycle, how="left")
+    assert index_dest["_dest"].tolist() == expected["_dest"].tolist() == \
+        [1, 2, 3, 4, 5, 6]
+    index_dest = sf.setreqs.make_index_dest_cycle(
+        index_split.iloc[1:], index_data_cycle.iloc[::-1])
+    assert index_dest["_dest"].tolist() == [2, 3, 4, 5, 6]
+
+
+def test_run_cycle_load_rows(tmpdir):
+    I = sf.tbl.create.Index()
+    I.run([], {"index_counts": [2, 3], "type": "movie", "split_depth": 1})
+    R = sf.img.create.Black(ipath(tmpdir, 1, 1, "test", "black", "img"))
+    R.run([I], {"pitch": 0.1, "img_size": [4, 4], "length_unit": "um",
+                "split_depth": 1, "image_format": "chunk"})
+    R.save()
+    R = sf.img.create.Black()
+    R.info.load(ipath(tmpdir, 1, 1, "test", "black", "img"))
+    R.info.load_split_depth = 1
+    R.info.data_split_depth = 2
+    D = sf.img.filter.Gauss()
+    D.info.set_path(ipath(tmpdir, 1, 2, "test", "filter", "img"))
+    sf.setreqs.run_cycle(D, [R], {"kernel_size": 3, "split_depth": 1},
+                         [1], [2], 2)
+    assert R.info.load_rows is None
+    R.load()  # all frames after the cycles
+    assert [img.shape for img in R.data] == [(3, 4, 4), (3, 4, 4)]
@@ -0,0 +1,98 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+import slitflow as sf
+
+
+@pytest.fixture
+def min_nbytes():
+    sf.shmem.MIN_NBYTES = 1
+    yield
+    sf.shmem.MIN_NBYTES = 1024 * 1024
+
+
+def test_shared_roundtrip(min_nbytes):
+    img = np.arange(24, dtype=np.uint16).reshape(2, 3, 4)
+    df = pd.DataFrame({"img_no": [1, 1, 2], "x_um": [0.1, 0.2, 0.3],
+                       "name": ["a", "b", "c"]})
+    blocks = []
+    shared = sf.shmem.to_shared([img, df, img, None], blocks)
+    assert isinstance(shared[0], sf.shmem.SharedArray)
+    assert isinstance(shared[1], sf.shmem.SharedFrame)
+    assert shared[0] is shared[2]
+    assert len(blocks) == 3
+
+    attached = []
+    restored = sf.shmem.from_shared(shared, attached)
+    assert np.array_equal(restored[0], img)
+    assert restored[0].dtype == np.uint16
+    assert restored[1].equals(df)
+    assert restored[3] is None
+    del restored
+    sf.shmem.release(attached)
+    assert sf.shmem.get_nbytes([img, df, img, None]) == img.nbytes + 48
+    assert sf.shmem.get_nbytes([img, df], {id(img): None}) == 48
+    assert sf.shmem.get_nbytes([img, df]) == \
+        sum([shm.size for shm in blocks])
+    sf.shmem.release(blocks, unlink=True)
+    assert len(blocks) == 0
+
+
+def test_run_process(min_nbytes):
+    img = np.ones((1, 4, 4), dtype=np.float32)
+    blocks = []
+    shared = sf.shmem.to_shared([img], blocks)
+    result = sf.shmem.run_process(
+        sf.img.filter.Gauss.process, shared, {"kernel_size": 3})
+    sf.shmem.release(blocks, unlink=True)
+    result = sf.shmem.receive(result)
+    assert np.allclose(result, img)
+
+
+def test_Data_run_mp_shared_memory(min_nbytes, monkeypatch):
+    sf.data.Data.SHARED_MEMORY = True
+    D = sf.tbl.create.Index()
+    D.run_mp([], {"index_counts": [2, 3], "type": "trajectory",
+                  "split_depth": 0})
+    sf.data.Data.SHARED_MEMORY = False
+    assert len(D.data[0]) == 6
+
+    R = sf.tbl.create.Index()
+    R.run([], {"index_counts": [2], "type": "image", "split_depth": 1})
+    D = sf.img.create.Black()
+    D.SHARED_MEMORY = True  # the switch of each instance is used
+    shared = []
+    to_shared = sf.shmem.to_shared
+    monkeypatch.setattr(sf.shmem, "to_shared", lambda *args: shared.append(
+        1) or to_shared(*args))
+    D.run_mp([R], {"pitch": 0.1, "img_size": [5, 5], "length_unit": "um",
+                   "split_depth": 1})
+    assert len(shared) > 0
+    assert len(D.data) == 2
+    assert D.data[0].shape == (1, 5, 5)
+
+
+def test_Data_run_mp_shared_budget(min_nbytes):
+    R = sf.tbl.create.Index()
+    R.run([], {"index_counts": [4, 1], "type": "trajectory",
+               "split_depth": 0})
+    R.split(1)
+    param = {"diff_coeff": 0.1, "interval": 0.1, "n_step": 2,
+             "dimension": 2, "lims": [[1, 2], [1, 2]],
+             "length_unit": "um", "split_depth": 0}
+    nbytes = sf.budget.get_nbytes([R.data[0]]) * \
+        sf.data.Data.PROCESS_MEMORY_RATE
+    # one process fits with two copies, but the copies of all inputs do not
+    sf.data.Data.MEMORY_BUDGET = nbytes + \
+        sf.shmem.get_nbytes([R.data[0]]) * 2
+    try:
+        D = sf.trj.random.WalkRect()
+        D.run_mp([R], param.copy())
+        assert len(D.data[0]) == 12
+        D = sf.trj.random.WalkRect()
+        D.SHARED_MEMORY = True
+        with pytest.raises(Exception) as e:
+            D.run_mp([R], param.copy())
+    finally:
+        sf.data.Data.MEMORY_BUDGET = None
@@ -1,4 +1,7 @@
+import os
+
 import pytest
+import numpy as np
 import pandas as pd
 
 import slitflow as sf
@@ -33,3 +36,246 @@ def test_Table(tmpdir):
 
 
 # merge_different_index() is tested in loc.convert.LocalMax2Xy
+
+
+@pytest.mark.parametrize("table_format", ["csv", "npz", "sqlite"])
+def test_Table_format(tmpdir, table_format):
+    D1 = sf.tbl.create.Index()
+    D1.run([], {"index_counts": [2, 3], "type": "trajectory",
+                "split_depth": 0})
+    D2 = sf.trj.random.Walk2DCenter(ipath(tmpdir, 1, 1, "test", "ana", "grp"))
+    D2.run([D1], {"diff_coeff": 0.1, "interval": 0.1, "n_step": 3,
+                  "length_unit": "um", "split_depth": 1,
+                  "table_format": table_format})
+    df = pd.concat(D2.data).reset_index(drop=True)
+    D2.save()
+    assert os.path.splitext(D2.info.data_paths[0])[1] == \
+        sf.tbl.table.TABLE_EXTS[table_format]
+
+    D3 = sf.trj.random.Walk2DCenter()
+    D3.info.load(D2.info.path)
+    D3.load()
+    # binary formats keep the exact values
+    pd.testing.assert_frame_equal(
+        pd.concat(D3.data).reset_index(drop=True), df, check_dtype=False,
+        check_exact=table_format != "csv")
+
+    D4 = sf.trj.random.Walk2DCenter()
+    D4.info.load(D2.info.path)
+    D4.info.load_columns = ["img_no", "trj_no", "x_um"]
+    D4.load()
+    assert list(D4.data[0].columns) == ["img_no", "trj_no", "x_um"]
+
+
+def test_Table_sqlite(tmpdir):
+    D1 = sf.tbl.create.Index()
+    D1.run([], {"index_counts": [3, 4], "type": "trajectory",
+                "split_depth": 0})
+    D2 = sf.trj.random.Walk2DCenter(ipath(tmpdir, 1, 1, "test", "ana", "grp"))
+    param = {"diff_coeff": 0.1, "interval": 0.1, "n_step": 3,
+             "length_unit": "um", "split_depth": 2, "table_format": "sqlite"}
+    D2.run([D1], param)
+    D2.save()
+    D2.run([D1], param)
+    df = pd.concat(D2.data).reset_index(drop=True)
+    D2.save()  # rows of the same files are replaced
+    assert sorted(os.listdir(os.path.dirname(D2.info.path))) == \
+        ["test_grp_ana.db", "test_grp_ana.sf", "test_grp_ana.sfx"]
+    assert D2.make_data_paths() == [
+        os.path.join(os.path.dirname(D2.info.path), "test_grp_ana.db")]
+
+    D3 = sf.trj.random.Walk2DCenter()
+    D3.info.load(D2.info.path)
+    D3.load()
+    pd.testing.assert_frame_equal(
+        pd.concat(D3.data).reset_index(drop=True), df, check_dtype=False)
+
+    D3 = sf.trj.random.Walk2DCenter()
+    D3.info.load(D2.info.path)
+    D3.load([2, 3, 4, 9])
+    assert len(D3.data) == 4
+    assert [(df_split["img_no"][0], df_split["trj_no"][0])
+            for df_split in D3.data] == [(1, 2), (1, 3), (1, 4), (3, 1)]
+    pd.testing.assert_frame_equal(
+        D3.data[3], df[(df["img_no"] == 3) & (df["trj_no"] == 1)]
+        .reset_index(drop=True), check_dtype=False)
+
+
+def test_Table_format_not_copied():
+    D1 = sf.tbl.create.Index()
+    D1.run([], {"index_counts": [2, 3], "type": "trajectory",
+                "split_depth": 0, "table_format": "npz"})
+    assert D1.info.get_param_value("table_format") == "npz"
+    D2 = sf.trj.random.Walk2DCenter()
+    D2.set_reqs([D1], {})
+    D2.set_info({"diff_coeff": 0.1, "interval": 0.1, "n_step": 3,
+                 "length_unit": "um", "split_depth": 0})
+    assert "table_format" not in D2.info.get_param_names()
+    assert D2.get_ext() == ".csv"
+
+    D2.info.copy_req_params(0, ["table_format"])
+    assert D2.get_ext() == ".npz"
+
+
+def test_save_npz(tmpdir):
+    path = os.path.join(tmpdir, "test.npz")
+    arrays = {"file": np.arange(3), "x": np.array(["a", "b", "c"])}
+    sf.tbl.table.save_npz(path, arrays)
+    with np.load(path, allow_pickle=False) as npz:
+        assert list(npz.keys()) == ["file", "x"]
+        assert np.array_equal(npz["file"], arrays["file"])
+        assert np.array_equal(npz["x"], arrays["x"])
+
+
+def test_make_range_where():
+    keys = np.array([[1, 2], [1, 3], [1, 4], [3, 1]])
+    where, values = list(sf.tbl.table.make_range_where(["a", "b"], keys))[0]
+    assert where == '("a" = ? AND "b" BETWEEN ? AND ?) OR ' \
+        '("a" = ? AND "b" BETWEEN ? AND ?)'
+    assert values == [1, 2, 4, 3, 1, 1]
+
+
+def test_Table_format_error():
+    D = sf.tbl.create.Index()
+    with pytest.raises(Exception, match="table_format"):
+        D.run([], {"index_counts": [1, 1], "type": "trajectory",
+                   "split_depth": 0, "table_format": "xlsx"})
+
+
+def test_split_tables():
+    df = pd.DataFrame({"img_no": [1, 1, 1, 2, 2], "trj_no": [1, 1, 2, 1, 1],
+                       "x": np.arange(5.0)})
+    index = pd.DataFrame({"img_no": [1, 1, 2], "trj_no": [1, 2, 1],
+                          "_dest": [1, 1, 2]})
+    dfs = [df.iloc[:3], df.iloc[3:]]
+    # already split in the same way
+    result = sf.tbl.table.split_tables(dfs, index, ["img_no", "trj_no"])
+    assert result[0] is dfs[0] and result[1] is dfs[1]
+
+    index["_dest"] = [1, 2, 3]
+    result = sf.tbl.table.split_tables(dfs, index, ["img_no", "trj_no"])
+    assert [list(df_split["x"]) for df_split in result] == \
+        [[0, 1], [2], [3, 4]]
+
+    # unsorted data, negative and zero destinations
+    index["_dest"] = [-2, 0, 1]
+    result = sf.tbl.table.split_tables(
+        [df.iloc[::-1]], index, ["img_no", "trj_no"])
+    assert list(result[0]["x"]) == [4, 3]
+    assert result[1] is None
+    assert len(result) == 2
+
+    # index rows without data are split by merging
+    index = pd.DataFrame({"img_no": [1, 3], "trj_no": [1, 1],
+                          "_dest": [1, 1]})
+    assert sf.tbl.table.split_tables(
+        dfs, index, ["img_no", "trj_no"]) is None
+
+
+def test_Table_csv_compression(tmpdir):
+    D1 = sf.tbl.create.Index()
+    D1.run([], {"index_counts": [2, 3], "type": "trajectory",
+                "split_depth": 0})
+    D2 = sf.trj.random.Walk2DCenter(ipath(tmpdir, 1, 1, "test", "ana", "grp"))
+    D2.run([D1], {"diff_coeff": 0.1, "interval": 0.1, "n_step": 3,
+                  "length_unit": "um", "split_depth": 1,
+                  "table_format": "csv.gz", "float_precision": 4})
+    assert D2.info.get_param_value("float_precision") == 4
+    df = pd.concat(D2.data).reset_index(drop=True)
+    D2.save()
+    assert D2.info.data_paths[0].endswith(".csv.gz")
+    with open(D2.info.data_paths[0], "rb") as f:
+        assert f.read(2) == b"\x1f\x8b"
+
+    D3 = sf.trj.random.Walk2DCenter()
+    D3.info.load(D2.info.path)
+    D3.load()
+    pd.testing.assert_frame_equal(
+        pd.concat(D3.data).reset_index(drop=True), df, check_dtype=False,
+        rtol=1e-3)
+
+    with pytest.raises(Exception, match="float_precision"):
+        D2.set_format({"float_precision": 0})
+    D2.set_format({"table_format": "npz", "float_precision": 4})
+    assert "float_precision" not in D2.info.get_param_names()
+
+
+def test_write_csv(tmpdir):
+    path = os.path.join(tmpdir, "test.csv")
+    df = pd.DataFrame({"img_no": np.arange(10), "x": np.arange(10) / 3,
+                       "s": list("abcdefghij")})
+    sf.tbl.table.write_csv(path, df, chunk_rows=3)
+    with open(path, newline="") as f:
+        assert f.read() == df.to_csv(index=False)
+
+    df_cast = sf.tbl.table.cast_floats(df, {"x": "float32", "s": "str"})
+    assert df_cast["x"].dtype == np.float32
+    sf.tbl.table.write_csv(path, df_cast)
+    df_load = sf.tbl.table.read_csv(path, dtype={"x": "float32"})
+    assert np.array_equal(df_load["x"], df["x"].astype(np.float32))
+    assert sf.tbl.table.cast_floats(df, {"x": "float64"}) is df
+
+
+@pytest.mark.parametrize("engine", ["c", "pyarrow"])
+def test_read_csv(tmpdir, engine):
+    if engine == "pyarrow":
+        pytest.importorskip("pyarrow")
+    path = os.path.join(tmpdir, "test.csv.gz")
+    df = pd.DataFrame({"img_no": [1, 1, 2], "x": [0.5, 1.5, 2.5],
+                       "y": [1.0, 2.0, 3.0]})
+    sf.tbl.table.write_csv(path, df)
+    df_load = sf.tbl.table.read_csv(path, ["img_no", "x"],
+                                    {"img_no": "int32", "x": "float32"},
+                                    engine)
+    assert list(df_load.columns) == ["img_no", "x"]
+    assert df_load["img_no"].dtype == np.int32
+    assert df_load["x"].dtype == np.float32
+    assert df_load["x"].tolist() == [0.5, 1.5, 2.5]
+
+
+def test_Table_float_precision(tmpdir):
+    D1 = sf.tbl.create.Index()
+    D1.run([], {"index_counts": [2, 3], "type": "trajectory",
+                "split_depth": 0})
+    D2 = sf.trj.random.Walk2DCenter(ipath(tmpdir, 1, 1, "test", "ana", "grp"))
+    D2.run([D1], {"diff_coeff": 0.1, "interval": 0.1, "n_step": 3,
+                  "length_unit": "um", "split_depth": 0,
+                  "float_precision": 3})
+    df = pd.concat(D2.data).reset_index(drop=True)
+    D2.save()
+    assert D2.info.data_paths[0].endswith(".csv")
+
+    D3 = sf.trj.random.Walk2DCenter()
+    D3.info.load(D2.info.path)
+    assert D3.info.get_param_value("float_precision") == 3
+    D3.load()
+    df_load = pd.concat(D3.data).reset_index(drop=True)
+    for col in ["x_um", "y_um"]:
+        assert df_load[col].tolist() == \
+            [float("%.3g" % x) for x in df[col]]
+
+
+def test_Table_find_data_paths(tmpdir):
+    D1 = sf.tbl.create.Index()
+    D1.run([], {"index_counts": [2, 3], "type": "trajectory",
+                "split_depth": 0})
+    D2 = sf.trj.random.Walk2DCenter(ipath(tmpdir, 1, 1, "test", "ana", "grp"))
+    D2.run([D1], {"diff_coeff": 0.1, "interval": 0.1, "n_step": 3,
+                  "length_unit": "um", "split_depth": 1,
+                  "table_format": "csv.gz"})
+    df = pd.concat(D2.data).reset_index(drop=True)
+    D2.save()
+
+    # the compressed files are found without the table_format parameter
+    D3 = sf.trj.random.Walk2DCenter()
+    D3.info.load(D2.info.path)
+    D3.info.delete_param("table_format")
+    assert D3.get_ext() == ".csv"
+    D3.load()
+    assert D3.info.data_paths[0].endswith(".csv.gz")
+    pd.testing.assert_frame_equal(
+        pd.concat(D3.data).reset_index(drop=True), df, check_dtype=False)
+
+    assert sf.tbl.table.get_table_format("a.csv.gz") == "csv.gz"
+    assert sf.tbl.table.get_table_format("a.npz") == "npz"
+    assert sf.tbl.table.get_table_format("a.txt") == "csv"
@@ -59,6 +59,19 @@ def test_Each(Walk2DCenter):
     assert D.data[0].shape == (18, 4)
 
 
+def test_Each_process_batch(Walk2DCenter):
+    D = sf.trj.msd.Each()
+    D.run([Walk2DCenter], {"group_depth": 2, "split_depth": 0})
+    param = D.info.get_param_dict()
+    Walk2DCenter.split(2)
+    reqs_list = [[df] for df in Walk2DCenter.data]
+    results = sf.trj.msd.Each.process_batch(reqs_list, param)
+    for reqs, result in zip(reqs_list, results):
+        expected = sf.trj.msd.Each.process(reqs, param)
+        assert list(result.columns) == list(expected.columns)
+        assert np.allclose(result.values, expected.values)
+
+
 def test_FitAnom(MeanMSD, EachMSD):
 
     D1 = sf.trj.msd.FitAnom()